@@ -1,80 +1,161 @@
-from flask import Flask, render_template, jsonify
-import pandas as pd
+from __future__ import annotations
+
+from flask import Flask, render_template, jsonify, request, Response
+from flask.json.provider import DefaultJSONProvider
 import os
-import ast
-import re
+import gc
+import gzip
+import json
+import hashlib
+import hmac
+import pickle
+import signal
+import itertools
+import threading
+import time
+
+from lazy import lazy_import
+
+# numpy / pandas (~0.5 s d'import) ne sont réellement importés que par le
+# thread de chargement des données (voir STARTUP) : le serveur démarre en
+# quelques ms. Avant tout autre import qui en dépend.
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+try:
+    import brotli
+except ImportError:  # optionnel : sans brotli on ne sert que gzip / identity
+    brotli = None
+
+from normalize import to_bool_series, to_float_series, to_list_series
+from compact import CompactFrame
+from fulltext import FullTextIndex, TITLE_WEIGHT
+from spatial import SpatialIndex, MAX_ZOOM
+from cubes import TimeSeriesCubes, GRANULARITIES
+from sketches import SalarySketches
+from cooccurrence import SkillMatrix
+from facets import FacetIndex, bitmap_from_positions
+from pgstore import PoolBusy, PostgresStore
+from metrics import (
+    MetricsMiddleware, REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, ROUTE_KEY,
+    LOADS_TOTAL, DATASET_ROWS, phase, load_step,
+)
+from profiling import ProfilingMiddleware
 
 # APP CONFIG
 app = Flask(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "data")
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(BASE_DIR, "data"))  # surchargeable (benchmarks)
+
+# "memory" : CSV chargés en mémoire ; "postgres" : tables de import_csv.py
+# (voir DATABASE BACKEND)
+DATA_BACKEND = os.environ.get("DATA_BACKEND", "memory")
 
 STATS_PATH = os.path.join(DATA_DIR, "job_data_clean.csv")
 D3_PATH = os.path.join(DATA_DIR, "jobs_for_d3.csv")
 
-# PARSERS
-_SPLIT_RE = re.compile(r"[;,\|]") 
+# Cache des datasets normalisés (invalidé si le CSV change)
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+CACHE_VERSION = 2  # à incrémenter si la normalisation change
 
-def to_bool(v):
-    if v is None or (isinstance(v, float) and pd.isna(v)):
-        return False
-    if isinstance(v, bool):
-        return v
-    s = str(v).strip().lower()
-    return s in {"true", "1", "yes", "y", "oui"}
+# PARSERS
+def ensure_id(df: pd.DataFrame) -> pd.DataFrame:
+    if "id" not in df.columns:
+        df = df.copy()
+        df["id"] = range(1, len(df) + 1)
+    return df
 
 
-def to_float(v):
-    try:
-        if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
-            return None
-        return float(v)
-    except Exception:
-        return None
+# CACHE
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
 
-def to_list(v):
+def load_cached(path: str, parse):
     """
-    Transforme en liste Python :
-    - déjà liste => ok
-    - "['a','b']" / "[]" => ast.literal_eval
-    - "a;b;c" => split
-    - NaN/None/"" => []
+    Renvoie le dataset normalisé de `path` depuis data/.cache/ si le CSV
+    n'a pas changé (mtime, taille et sha256), sinon appelle parse() et
+    réécrit le cache.
     """
-    if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
-        return []
-    if isinstance(v, list):
-        return [str(x).strip() for x in v if str(x).strip()]
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(CACHE_DIR, f"{name}.pkl")
+    meta_path = os.path.join(CACHE_DIR, f"{name}.meta.json")
+    st = os.stat(path)
 
-    s = str(v).strip()
-    if not s or s == "[]":
-        return []
-    if (s.startswith("[") and s.endswith("]")) or (s.startswith("(") and s.endswith(")")):
-        try:
-            parsed = ast.literal_eval(s)
-            if isinstance(parsed, (list, tuple)):
-                return [str(x).strip() for x in parsed if str(x).strip()]
-        except Exception:
-            pass
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
 
-    # Split classique
-    parts = [p.strip().strip("'").strip('"') for p in _SPLIT_RE.split(s)]
-    return [p for p in parts if p]
+    if (
+        meta.get("version") == CACHE_VERSION
+        and meta.get("mtime_ns") == st.st_mtime_ns
+        and meta.get("size") == st.st_size
+        and meta.get("sha256") == _sha256(path)
+    ):
+        # Le GC n'a rien à collecter ici mais se déclencherait sur chaque
+        # liste recréée : on le suspend le temps du chargement
+        gc.disable()
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Cache ignored ({cache_path}): {e}")
+        finally:
+            gc.enable()
 
+    df = parse()
 
-def ensure_id(df: pd.DataFrame) -> pd.DataFrame:
-    if "id" not in df.columns:
-        df = df.copy()
-        df["id"] = range(1, len(df) + 1)
+    meta = {
+        "version": CACHE_VERSION,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": _sha256(path),
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # écriture atomique : un autre worker ne lit jamais un fichier partiel
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+    except OSError as e:
+        print(f"Cache not written ({cache_path}): {e}")
     return df
 
 
 # DATA LOADING 
-def load_stats_df() -> pd.DataFrame:
+STATS_LIST_COLS = [
+    "technical_skills", "tools_used", "soft_skills", "tasks",
+    "domains", "benefits", "tone_culture", "eeo_terms"
+]
+# peu de valeurs distinctes, beaucoup de lignes
+STATS_CATEGORY_COLS = ["country", "seniority_level", "source", "salary_currency"]
+
+
+def load_stats_df() -> CompactFrame:
     if not os.path.exists(STATS_PATH):
         raise FileNotFoundError(f"Stats file not found: {STATS_PATH}")
+    return load_cached(STATS_PATH, _parse_stats_csv)
+
+
+def _parse_stats_csv() -> CompactFrame:
+    df = _read_stats_csv()
+    return CompactFrame.from_frame(df, STATS_LIST_COLS, STATS_CATEGORY_COLS)
+
 
+def _read_stats_csv() -> pd.DataFrame:
+    """CSV -> DataFrame normalisé (listes Python, floats avec NaN)."""
     df = pd.read_csv(
         STATS_PATH,
      sep=",",                 
@@ -103,29 +184,25 @@ def load_stats_df() -> pd.DataFrame:
             df[col] = ""
 
     # Normalisation types
-    df["salary_value"] = df["salary_value"].apply(to_float)
-    df["experience_years"] = df["experience_years"].apply(to_float)
+    df["salary_value"] = to_float_series(df["salary_value"])
+    df["experience_years"] = to_float_series(df["experience_years"])
 
-    df["hybrid_policy"] = df["hybrid_policy"].apply(to_bool)
-    df["visa_sponsorship"] = df["visa_sponsorship"].apply(to_bool)
+    df["hybrid_policy"] = to_bool_series(df["hybrid_policy"])
+    df["visa_sponsorship"] = to_bool_series(df["visa_sponsorship"])
 
     # Normalisation lists
-    list_cols = [
-        "technical_skills", "tools_used", "soft_skills", "tasks",
-        "domains", "benefits", "tone_culture", "eeo_terms"
-    ]
-    for c in list_cols:
-        df[c] = df[c].apply(to_list)
-
-    # cleaning NA
-    df = df.fillna("")
+    for c in STATS_LIST_COLS:
+        df[c] = to_list_series(df[c])
     return df
 
 
 def load_d3_df() -> pd.DataFrame:
     if not os.path.exists(D3_PATH):
         raise FileNotFoundError(f"D3 file not found: {D3_PATH}")
+    return load_cached(D3_PATH, _parse_d3_csv)
+
 
+def _parse_d3_csv() -> pd.DataFrame:
     df = pd.read_csv(
         D3_PATH,
         sep=",",
@@ -143,15 +220,1125 @@ def load_d3_df() -> pd.DataFrame:
             df[c] = pd.to_numeric(df[c], errors="coerce")
 
     if "domains" in df.columns:
-        df["domains"] = df["domains"].apply(to_list)
+        df["domains"] = to_list_series(df["domains"])
 
     return df.fillna("")
 
 
-STATS_DF = load_stats_df()
-D3_DF = load_d3_df()
-print(f"Stats dataset charged : {len(STATS_DF)} lignes")
-print(f"D3 dataset charged : {len(D3_DF)} lignes")
+# INDEXES
+# Inverted indexes : valeur -> positions (triées) des lignes de stats.
+# Une requête coûte la taille des listes intersectées, pas un scan complet.
+INDEXED_LIST_COLS = ["technical_skills", "domains"]
+INDEXED_VALUE_COLS = ["country", "seniority_level"]
+INDEXED_BOOL_COLS = ["hybrid_policy", "visa_sponsorship"]
+# Recherche texte (BM25, voir fulltext.py) : colonne -> poids
+FULLTEXT_FIELDS = {"title": TITLE_WEIGHT, "description_sans_html": 1}
+
+
+def _postings(values: pd.Series, positions: np.ndarray) -> dict:
+    """Regroupe des paires (valeur, position) en {valeur: positions triées}."""
+    if len(positions) == 0:
+        return {}
+    codes, uniques = pd.factorize(values, sort=False)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+    groups = np.split(positions[order], bounds)
+    return {str(v): g for v, g in zip(uniques, groups)}
+
+
+def _list_postings(lc) -> dict:
+    """Même chose pour une colonne-liste CSR : les codes sont déjà là."""
+    if len(lc.codes) == 0:
+        return {}
+    order = np.argsort(lc.codes, kind="stable")
+    bounds = np.cumsum(np.bincount(lc.codes, minlength=len(lc.vocab)))[:-1]
+    groups = np.split(lc.row_ids()[order], bounds)
+    return {str(v): g for v, g in zip(lc.vocab, groups)}
+
+
+def build_stats_index(stats: CompactFrame) -> dict:
+    df = stats.frame
+    positions = np.arange(len(df), dtype=np.int64)
+    index = {}
+
+    for c in INDEXED_LIST_COLS:
+        index[c] = _list_postings(stats.lists[c])
+
+    for c in INDEXED_VALUE_COLS:
+        values = df[c].astype(str).str.strip()
+        keep = (values != "").to_numpy()
+        index[c] = _postings(values[keep], positions[keep])
+
+    for c in INDEXED_BOOL_COLS:
+        index[c] = np.flatnonzero(df[c].to_numpy(dtype=bool))
+
+    # Salaire : positions triées par valeur => ">= x" est un searchsorted
+    salary = df["salary_value"].to_numpy(dtype=float)
+    known = np.flatnonzero(~np.isnan(salary))
+    order = known[np.argsort(salary[known], kind="stable")]
+    index["salary"] = salary
+    index["salary_order"] = order
+    index["salary_sorted"] = salary[order]
+
+    index["id"] = _build_id_index(df["id"])
+    index["text"] = FullTextIndex.build(
+        {c: (df[c], w) for c, w in FULLTEXT_FIELDS.items()}
+    )
+    index["n_rows"] = len(df)
+    return index
+
+
+def _build_id_index(ids: pd.Series):
+    """
+    id -> position. Ids denses (cas normal, 1..N) : un simple tableau numpy,
+    sinon une table de hachage pandas. En cas de doublon, la 1re ligne gagne
+    (comme l'ancien STATS_DF[STATS_DF["id"] == job_id].iloc[0]).
+    """
+    ids = pd.to_numeric(ids, errors="coerce")
+    first = (ids.notna() & ~ids.duplicated()).to_numpy()
+    keys = ids.to_numpy()[first].astype(np.int64)
+    positions = np.flatnonzero(first)
+
+    if len(keys) and keys.min() >= 0 and keys.max() <= 4 * len(keys) + 1024:
+        table = np.full(int(keys.max()) + 1, -1, dtype=np.int64)
+        table[keys] = positions
+        return table
+    return pd.Series(positions, index=pd.Index(keys))
+
+
+_INT64 = np.iinfo(np.int64)
+
+
+@phase("query")
+def lookup_positions(index: dict, job_ids) -> np.ndarray:
+    """Positions des ids demandés (-1 si inconnu), dans le même ordre."""
+    table = index["id"]
+    job_ids = list(job_ids)
+    out = np.full(len(job_ids), -1, dtype=np.int64)
+    # un id hors int64 n'est dans aucun CSV : inconnu (le cast lèverait OverflowError)
+    valid = np.flatnonzero([_INT64.min <= i <= _INT64.max for i in job_ids])
+    ids = np.array([job_ids[i] for i in valid], dtype=np.int64)
+    if isinstance(table, np.ndarray):
+        inside = (ids >= 0) & (ids < len(table))
+        out[valid[inside]] = table[ids[inside]]
+    else:
+        out[valid] = table.reindex(ids).fillna(-1).to_numpy(dtype=np.int64)
+    return out
+
+
+# MAP TILES
+# Carte UMAP (tendances) : quadtree sur x_umap / y_umap (voir spatial.py).
+# Une tuile renvoie ses points s'il y en a peu, sinon des agrégats
+# (centroïde, nombre de jobs, un job représentant) : la carte ne télécharge
+# que ce qui est visible, au niveau de détail du zoom.
+MAP_POINT_COLS = [
+    "id", "x_umap", "y_umap", "topic_filtered", "topic_name",
+    "title", "company", "country", "seniority_level",
+]
+
+
+def build_map_index(d3_df: pd.DataFrame) -> SpatialIndex:
+    empty = pd.Series(dtype=float)
+    return SpatialIndex.build(d3_df.get("x_umap", empty), d3_df.get("y_umap", empty))
+
+
+def map_tile(d3_df: pd.DataFrame, map_index: SpatialIndex, z: int, x: int, y: int,
+             offset: int = 0) -> dict:
+    with phase("query"):
+        count, rows, cells = map_index.tile(z, x, y, offset)
+    out = {"z": z, "x": x, "y": y, "count": int(count)}
+    if rows is not None:
+        cols = [c for c in MAP_POINT_COLS if c in d3_df.columns]
+        with phase("records"):
+            out["points"] = d3_df.iloc[rows][cols].to_dict(orient="records")
+        # zoom max : page suivante de points, None si c'était la dernière
+        end = min(max(offset, 0), count) + len(rows)
+        out["next_offset"] = end if end < count else None
+        return out
+
+    with phase("records"):
+        reps = d3_df.iloc[cells["rows"]]
+        ids = reps["id"].tolist()
+        topics = reps["topic_filtered"].tolist() if "topic_filtered" in reps else [""] * len(ids)
+        out["clusters"] = [
+            {"x": cx, "y": cy, "count": n, "id": i, "topic_filtered": t}
+            for cx, cy, n, i, t in zip(
+                cells["x"].tolist(), cells["y"].tolist(), cells["count"].tolist(), ids, topics
+            )
+        ]
+    return out
+
+
+# AGGREGATES
+# Pré-calcul des KPIs / charts de la Big Picture (page1) et des Insights
+# (page3) : les pages ne téléchargent plus que quelques Ko.
+AGG_TOP_N = 20
+AGG_COUNT_COLS = {
+    "technical_skills": True, "tools_used": True, "domains": True,
+    "country": False, "seniority_level": False, "source": False,
+    "title": False, "company": False,
+}
+# mêmes classes que l'ancien comptage du client (page1-dashboard.js) : une
+# valeur vide y devenait un libellé compté, et title / company étaient
+# comptés tels quels (ni espaces retirés, ni "Not specified" exclu)
+AGG_MISSING_LABELS = {"source": "N/A", "title": "Untitled", "company": "Unknown"}
+AGG_RAW_COLS = {"title", "company"}
+SENIORITY_ORDER = ["entry", "junior", "mid", "senior", "lead", "principal", "executive"]
+
+
+def _tick_increment(start: float, stop: float, count: int) -> float:
+    """Port de d3.tickIncrement (pas > 0, ou inverse négatif si < 1)."""
+    step = (stop - start) / max(0, count)
+    power = np.floor(np.log10(step))
+    error = step / 10 ** power
+    factor = 10 if error >= np.sqrt(50) else 5 if error >= np.sqrt(10) else 2 if error >= np.sqrt(2) else 1
+    if power >= 0:
+        return factor * 10 ** power
+    return -(10 ** -power) / factor
+
+
+def _nice_domain(start: float, stop: float, count: int = 10):
+    """Équivalent de d3.scaleLinear().domain([start, stop]).nice()."""
+    prestep = None
+    for _ in range(10):
+        step = _tick_increment(start, stop, count)
+        if step == prestep or step == 0 or not np.isfinite(step):
+            break
+        if step > 0:
+            start, stop = np.floor(start / step) * step, np.ceil(stop / step) * step
+        else:
+            start, stop = np.ceil(start * step) / step, np.floor(stop * step) / step
+        prestep = step
+    return float(start), float(stop)
+
+
+def _ticks(start: float, stop: float, count: int) -> list:
+    """Équivalent de d3.ticks(start, stop, count)."""
+    inc = _tick_increment(start, stop, count)
+    if inc > 0:
+        i0, i1 = np.ceil(start / inc), np.floor(stop / inc)
+        return [float(i * inc) for i in np.arange(i0, i1 + 1)]
+    i0, i1 = np.ceil(start * -inc), np.floor(stop * -inc)
+    return [float(i / -inc) for i in np.arange(i0, i1 + 1)]
+
+
+def _value_counts(stats: CompactFrame, column: str, is_list: bool) -> dict:
+    if is_list:
+        lc = stats.lists[column]
+        counts = pd.Series(np.bincount(lc.codes, minlength=len(lc.vocab)), index=lc.vocab)
+    else:
+        values = stats.frame[column].astype(str)
+        if column in AGG_MISSING_LABELS:
+            values = values.where(values != "", AGG_MISSING_LABELS[column])
+        if column not in AGG_RAW_COLS:
+            values = values.str.strip()
+        counts = values.value_counts(sort=False)
+    if column not in AGG_RAW_COLS:
+        counts = counts[(counts.index != "") & (counts.index != "Not specified")]
+    counts = counts[counts > 0]
+    # ex aequo : ordre de 1re apparition (vocab / sort=False), comme l'ancien
+    # comptage du client
+    counts = counts.sort_values(ascending=False, kind="stable")
+    return {
+        "total": int(counts.sum()),
+        "items": [{"name": k, "count": int(v)} for k, v in counts.head(AGG_TOP_N).items()],
+    }
+
+
+def _salary_histogram(salaries: np.ndarray) -> list:
+    """Même découpage que d3.bin().domain(x.domain()).thresholds(x.ticks(20))."""
+    if len(salaries) == 0:
+        return []
+    lo, hi = _nice_domain(float(salaries.min()), float(salaries.max()))
+    if lo == hi:
+        return [{"x0": lo, "x1": hi, "count": int(len(salaries))}]
+    inner = [t for t in _ticks(lo, hi, 20) if lo < t < hi]
+    edges = np.array([lo] + inner + [hi])
+    counts, _ = np.histogram(salaries, bins=edges)
+    return [
+        {"x0": float(a), "x1": float(b), "count": int(c)}
+        for a, b, c in zip(edges[:-1], edges[1:], counts)
+    ]
+
+
+def build_aggregates(stats: CompactFrame) -> dict:
+    df = stats.frame
+    salary = df["salary_value"]
+    usd_annual = (df["salary_type"] == "annual") & (df["salary_currency"] == "USD")
+
+    kpi_salaries = salary[usd_annual & (salary > 1000)]
+    median = kpi_salaries.median()
+    kpis = {
+        "total_jobs": int(len(df)),
+        "total_companies": int(df["company"].replace("", np.nan).nunique()),
+        "median_salary": None if pd.isna(median) else float(median),
+    }
+
+    counts = {c: _value_counts(stats, c, is_list) for c, is_list in AGG_COUNT_COLS.items()}
+
+    policies = {}
+    for c in ["hybrid_policy", "visa_sponsorship"]:
+        n_true = int(df[c].sum())
+        policies[c] = {"true": n_true, "false": int(len(df) - n_true)}
+
+    hist_salaries = salary[usd_annual & (salary > 20000) & (salary < 500000)]
+    histogram = _salary_histogram(hist_salaries.to_numpy(dtype=float))
+
+    # Skills : nombre de mentions vs salaire moyen (>= 5 mentions)
+    paid = (usd_annual & (salary > 20000)).to_numpy()
+    lc = stats.lists["technical_skills"]
+    keep = paid[lc.row_ids()]
+    exploded = pd.DataFrame({
+        "skill": lc.vocab[lc.codes[keep]],
+        "salary": salary.to_numpy()[lc.row_ids()[keep]],
+    })
+    skill_stats = exploded.groupby("skill")["salary"].agg(["mean", "count"])
+    skill_stats = skill_stats[skill_stats["count"] >= 5]
+    skills_salary = {
+        "skills": [
+            {"skill": k, "avgSalary": float(r["mean"]), "mentions": int(r["count"])}
+            for k, r in skill_stats.iterrows()
+        ],
+        "median_mentions": float(skill_stats["count"].median()) if len(skill_stats) else None,
+        "median_salary": float(skill_stats["mean"].median()) if len(skill_stats) else None,
+    }
+
+    # Médiane de salaire par séniorité (>= 5 offres)
+    ladder = usd_annual & (salary > 10000)
+    levels = df.loc[ladder, "seniority_level"].astype(str).str.lower()
+    grouped = salary[ladder].groupby(levels).agg(["median", "count"])
+    seniority_salary = [
+        {"level": lvl, "median": float(grouped.loc[lvl, "median"])}
+        for lvl in SENIORITY_ORDER
+        if lvl in grouped.index and grouped.loc[lvl, "count"] >= 5
+    ]
+
+    return {
+        "kpis": kpis,
+        "counts": counts,
+        "policies": policies,
+        "salary-histogram": histogram,
+        "skills-salary": skills_salary,
+        "seniority-salary": seniority_salary,
+    }
+
+
+# TIME SERIES
+# Cubes jobs / skills par jour, semaine, mois x pays x séniorité (voir
+# cubes.py) : /api/timeseries répond à n'importe quel filtre en sommant des
+# cellules, sans repasser sur les jobs.
+TIMESERIES_SKILL_COL = "technical_skills"
+TIMESERIES_MAX_TOP_SKILLS = 50
+
+
+def build_timeseries(stats: CompactFrame) -> TimeSeriesCubes:
+    df = stats.frame
+    return TimeSeriesCubes.build(
+        df["date_posted"], df["country"], df["seniority_level"],
+        stats.lists[TIMESERIES_SKILL_COL],
+    )
+
+
+# SALARY SKETCHES
+# Sketches de quantiles de salary_value par (séniorité, pays, skill) (voir
+# sketches.py) : l'estimation "My Market Worth" fusionne quelques cellules
+# au lieu de relire tous les salaires.
+SKETCH_SKILL_COL = "technical_skills"
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def build_salary_sketches(stats: CompactFrame) -> SalarySketches:
+    df = stats.frame
+    # salaires comparables seulement (annuels, USD), comme les KPIs
+    usd_annual = (df["salary_type"] == "annual") & (df["salary_currency"] == "USD")
+    return SalarySketches.build(
+        df["salary_value"].where(usd_annual), df["seniority_level"], df["country"],
+        stats.lists[SKETCH_SKILL_COL],
+    )
+
+
+# SKILL MATRIX
+# Co-occurrences, lift et salaires par skill (voir cooccurrence.py), sur
+# technical_skills + tools_used. Même définition de salaire comparable que
+# skills-salary : annuel, USD, > 20k.
+SKILL_MATRIX_COLS = ["technical_skills", "tools_used"]
+COOCCURRENCE_MAX_TOP = 1000
+
+
+def build_skill_matrix(stats: CompactFrame) -> SkillMatrix:
+    df = stats.frame
+    salary = df["salary_value"].to_numpy(dtype=float)
+    comparable = (
+        (df["salary_type"] == "annual") & (df["salary_currency"] == "USD")
+    ).to_numpy() & (salary > 20000)
+    return SkillMatrix.build(
+        [stats.lists[c] for c in SKILL_MATRIX_COLS],
+        np.where(comparable, salary, np.nan),
+    )
+
+
+# FACETS
+# Comptes live du panneau de filtres de l'explorer (voir facets.py) : un
+# bitmap par valeur de facette, construit à partir des postings de
+# stats_index. Mêmes sémantiques que search_jobs : skills en ET, le reste
+# en OU.
+FACET_MODES = {
+    "country": "or", "seniority_level": "or", "technical_skills": "and",
+    "domains": "or", "hybrid_policy": "or", "visa_sponsorship": "or",
+}
+# facette -> paramètre de search_jobs (voir _search_filters)
+FACET_FILTERS = {
+    "country": "countries", "seniority_level": "seniorities", "technical_skills": "skills",
+    "domains": "domains", "hybrid_policy": "hybrid", "visa_sponsorship": "visa",
+}
+FACET_EXCLUDED = {"", "Not specified"}  # comme les listes de l'explorer
+
+
+def build_facet_index(index: dict) -> FacetIndex:
+    postings = {}
+    for c in FACET_MODES:
+        if c in INDEXED_BOOL_COLS:
+            postings[c] = {"true": index[c]}
+        else:
+            postings[c] = {v: p for v, p in index[c].items() if v not in FACET_EXCLUDED}
+    return FacetIndex.build(postings, FACET_MODES, index["n_rows"])
+
+
+def facet_counts(stats: CompactFrame, index: dict, facets: FacetIndex, filters: dict, top=None) -> dict:
+    """filters : paramètres de search_jobs ; voir FacetIndex.counts."""
+    selected = {}
+    for c, arg in FACET_FILTERS.items():
+        value = filters.get(arg)
+        selected[c] = (["true"] if value else []) if c in INDEXED_BOOL_COLS else value or []
+    base = None
+    if filters.get("text") or filters.get("min_salary"):
+        rows = search_jobs(stats, index, text=filters.get("text", ""),
+                           min_salary=filters.get("min_salary", 0.0))
+        base = bitmap_from_positions(rows, index["n_rows"])
+    with phase("query"):  # search_jobs compte déjà sa propre phase
+        return facets.counts(selected, base, top)
+
+
+# DATABASE BACKEND
+# DATA_BACKEND=postgres : rien n'est chargé en mémoire, les jobs sont lus
+# dans les tables de import_csv.py via un pool de connexions (voir
+# pgstore.py). /api/job, /api/jobs/by-ids et /api/jobs/search sont des
+# requêtes SQL, les gros endpoints sont streamés depuis un curseur serveur,
+# et les agrégats sont recalculés en SQL à chaque (re)chargement.
+# Les endpoints qui reposent sur des index en mémoire (cubes, sketches,
+# matrice de skills, carte) répondent 501.
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))  # par processus (>= threads gunicorn)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "10000"))
+# attente max d'une connexion libre avant de répondre 503
+DB_ACQUIRE_TIMEOUT_S = float(os.environ.get("DB_ACQUIRE_TIMEOUT_S", "5"))
+MEMORY_ONLY_ENDPOINTS = {
+    "api_timeseries", "api_salary_estimate", "api_skills_cooccurrence",
+    "api_map_meta", "api_map_tile", "api_facets",
+}
+USD_ANNUAL_SQL = "salary_type = 'annual' AND salary_currency = 'USD'"
+
+_DB_STORE = None
+_DB_STORE_LOCK = threading.Lock()
+
+
+def get_db_store() -> PostgresStore:
+    """Store du processus, créé à la 1re demande (partagé par les rechargements)."""
+    global _DB_STORE
+    with _DB_STORE_LOCK:
+        if _DB_STORE is None:
+            if not DATABASE_URL:
+                raise RuntimeError("DATA_BACKEND=postgres requires DATABASE_URL")
+            _DB_STORE = PostgresStore.build(
+                DATABASE_URL, DB_POOL_SIZE, DB_STATEMENT_TIMEOUT_MS, DB_ACQUIRE_TIMEOUT_S
+            )
+        return _DB_STORE
+
+
+def _db_value_counts(store: PostgresStore, column: str, is_list: bool) -> dict:
+    # ex aequo : 1re apparition (id, puis rang dans la liste), comme _value_counts
+    if is_list:
+        source = f"jobs, jsonb_array_elements_text({column}) WITH ORDINALITY AS v(v, pos)"
+        value, first = "v", "min(ARRAY[id, pos])"
+    else:
+        source, value, first = "jobs", f"coalesce({column}, '')", "min(ARRAY[id, 0])"
+        if column in AGG_MISSING_LABELS:
+            value = f"coalesce(nullif({column}, ''), '{AGG_MISSING_LABELS[column]}')"
+        if column not in AGG_RAW_COLS:
+            value = f"btrim({value})"
+    where = "" if column in AGG_RAW_COLS else "WHERE value NOT IN ('', 'Not specified')"
+    rows = store.fetchall(
+        f"SELECT value, n, sum(n) OVER () FROM ("
+        f" SELECT {value} AS value, count(*) AS n, {first} AS first FROM {source} GROUP BY 1"
+        f") c {where} ORDER BY n DESC, first LIMIT %s",
+        (AGG_TOP_N,),
+    )
+    return {
+        "total": int(rows[0][2]) if rows else 0,
+        "items": [{"name": v, "count": int(n)} for v, n, _ in rows],
+    }
+
+
+def _db_salary_histogram(store: PostgresStore) -> list:
+    """Mêmes classes que _salary_histogram, comptées par width_bucket."""
+    where = f"{USD_ANNUAL_SQL} AND salary_value > 20000 AND salary_value < 500000"
+    lo, hi, n = store.fetchall(f"SELECT min(salary_value), max(salary_value), count(*) FROM jobs WHERE {where}")[0]
+    if not n:
+        return []
+    lo, hi = _nice_domain(float(lo), float(hi))
+    if lo == hi:
+        return [{"x0": lo, "x1": hi, "count": int(n)}]
+    edges = [lo] + [t for t in _ticks(lo, hi, 20) if lo < t < hi] + [hi]
+    counts = [0] * (len(edges) - 1)
+    for bucket, c in store.fetchall(
+        f"SELECT width_bucket(salary_value, %s::float8[]), count(*) FROM jobs WHERE {where} GROUP BY 1",
+        (edges,),
+    ):
+        # comme np.histogram, la dernière classe inclut sa borne haute
+        counts[min(bucket, len(counts)) - 1] += int(c)
+    return [
+        {"x0": float(a), "x1": float(b), "count": c}
+        for a, b, c in zip(edges[:-1], edges[1:], counts)
+    ]
+
+
+def build_db_aggregates(store: PostgresStore) -> dict:
+    """Même contenu que build_aggregates, calculé par PostgreSQL."""
+    total, companies, median, n_hybrid, n_visa = store.fetchall(
+        f"SELECT count(*), count(DISTINCT NULLIF(company, '')),"
+        f" percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_value)"
+        f"  FILTER (WHERE {USD_ANNUAL_SQL} AND salary_value > 1000),"
+        f" count(*) FILTER (WHERE hybrid_policy), count(*) FILTER (WHERE visa_sponsorship)"
+        f" FROM jobs"
+    )[0]
+    kpis = {
+        "total_jobs": int(total),
+        "total_companies": int(companies),
+        "median_salary": None if median is None else float(median),
+    }
+
+    counts = {c: _db_value_counts(store, c, is_list) for c, is_list in AGG_COUNT_COLS.items()}
+    policies = {
+        c: {"true": int(n), "false": int(total - n)}
+        for c, n in (("hybrid_policy", n_hybrid), ("visa_sponsorship", n_visa))
+    }
+
+    skill_rows = sorted(store.fetchall(
+        f"SELECT v, avg(salary_value), count(*)"
+        f" FROM jobs, jsonb_array_elements_text(technical_skills) AS v"
+        f" WHERE {USD_ANNUAL_SQL} AND salary_value > 20000 GROUP BY v HAVING count(*) >= 5"
+    ))
+    skills_salary = {
+        "skills": [{"skill": k, "avgSalary": float(m), "mentions": int(c)} for k, m, c in skill_rows],
+        "median_mentions": float(np.median([r[2] for r in skill_rows])) if skill_rows else None,
+        "median_salary": float(np.median([r[1] for r in skill_rows])) if skill_rows else None,
+    }
+
+    ladder = {
+        lvl: (med, c) for lvl, med, c in store.fetchall(
+            f"SELECT lower(seniority_level), percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_value), count(*)"
+            f" FROM jobs WHERE {USD_ANNUAL_SQL} AND salary_value > 10000 GROUP BY 1"
+        )
+    }
+    seniority_salary = [
+        {"level": lvl, "median": float(ladder[lvl][0])}
+        for lvl in SENIORITY_ORDER
+        if lvl in ladder and ladder[lvl][1] >= 5
+    ]
+
+    return {
+        "kpis": kpis,
+        "counts": counts,
+        "policies": policies,
+        "salary-histogram": _db_salary_histogram(store),
+        "skills-salary": skills_salary,
+        "seniority-salary": seniority_salary,
+    }
+
+
+# DATASET
+class Dataset:
+    """
+    Snapshot complet des données servies : frames, index, agrégats et
+    payloads pré-sérialisés. Rien n'est modifié après construction (hormis le
+    cache de payloads, rempli à la demande) : un rechargement construit un
+    nouveau Dataset à côté et remplace DATA en une seule affectation.
+    """
+    backend = "memory"
+
+    def __init__(self, stats: CompactFrame, d3_df: pd.DataFrame, signature=None):
+        self.signature = signature  # (mtime, taille) des CSV lus
+        self.stats = stats
+        self.d3_df = d3_df
+        self.rows = {"stats": len(stats), "d3": len(d3_df)}
+        with load_step("stats_index"):
+            self.stats_index = build_stats_index(stats)
+        with load_step("facets"):
+            self.facets = build_facet_index(self.stats_index)
+        with load_step("map_index"):
+            self.map_index = build_map_index(d3_df)
+        with load_step("aggregates"):
+            self.aggregates = build_aggregates(stats)
+        with load_step("timeseries"):
+            self.timeseries = build_timeseries(stats)
+        with load_step("salary_sketches"):
+            self.salary_sketches = build_salary_sketches(stats)
+        with load_step("skill_matrix"):
+            self.skill_matrix = build_skill_matrix(stats)
+        self.payloads = {}
+        self.payloads_lock = threading.Lock()
+        self.loaded_at = time.time()
+
+
+class DbDataset:
+    """
+    Snapshot du backend postgres (voir DATABASE BACKEND) : le store, partagé
+    d'un snapshot à l'autre, et les agrégats, recalculés à chaque chargement.
+    """
+    backend = "postgres"
+    signature = None
+
+    def __init__(self, store: PostgresStore):
+        self.store = store
+        with load_step("aggregates"):
+            self.aggregates = build_db_aggregates(store)
+        self.rows = {"stats": store.count("jobs"), "d3": store.count("d3_data")}
+        self.loaded_at = time.time()
+
+
+def _files_signature() -> tuple:
+    sig = []
+    for path in (STATS_PATH, D3_PATH):
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def load_dataset() -> Dataset | DbDataset:
+    if DATA_BACKEND == "postgres":
+        with load_step("total"):
+            data = DbDataset(get_db_store())
+    else:
+        # signature prise avant la lecture : une écriture pendant le
+        # chargement sera vue par le watcher
+        signature = _files_signature()
+        with load_step("total"):
+            with load_step("stats_df"):
+                stats = load_stats_df()
+            with load_step("d3_df"):
+                d3_df = load_d3_df()
+            data = Dataset(stats, d3_df, signature)
+    LOADS_TOTAL.inc()
+    for name, n in data.rows.items():
+        DATASET_ROWS.set(n, dataset=name)
+    print(f"Stats dataset charged : {data.rows['stats']} lignes")
+    print(f"D3 dataset charged : {data.rows['d3']} lignes")
+    return data
+
+
+# STARTUP
+# Les données se chargent dans un thread : le serveur accepte les
+# connexions tout de suite. /healthz répond dès le démarrage ; /readyz et
+# les endpoints /api/ répondent 503 "warming_up" tant que DATA est None.
+# En cas d'échec (fichier absent, ...), nouvel essai toutes les
+# LOAD_RETRY_SECONDS. LOAD_DATA=0 : import sans chargement ni watcher (scripts
+# qui n'utilisent que les fonctions de lecture, ex. bench_memory.py).
+LOAD_RETRY_SECONDS = 10
+LOAD_DATA = os.environ.get("LOAD_DATA", "1") != "0"
+
+DATA = None
+LOAD_ERROR = None  # dernière erreur du chargement initial
+_ready_callbacks = []
+_ready_lock = threading.Lock()
+
+
+def _initial_load():
+    global DATA, LOAD_ERROR
+    while True:
+        try:
+            data = load_dataset()
+            break
+        except Exception as e:
+            LOAD_ERROR = f"{type(e).__name__}: {e}"
+            print(f"Data load failed, retrying in {LOAD_RETRY_SECONDS}s: {LOAD_ERROR}")
+            time.sleep(LOAD_RETRY_SECONDS)
+    with _ready_lock:
+        DATA, LOAD_ERROR = data, None
+        callbacks = list(_ready_callbacks)
+    for callback in callbacks:
+        callback()
+
+
+def call_when_ready(callback):
+    """callback() une fois les données chargées (tout de suite si c'est fait)."""
+    with _ready_lock:
+        if DATA is None:
+            _ready_callbacks.append(callback)
+            return
+    callback()
+
+
+def start_loading():
+    threading.Thread(target=_initial_load, name="data-load", daemon=True).start()
+
+
+if LOAD_DATA:
+    start_loading()
+
+
+# QUERY ENGINE
+def _intersect(current, other):
+    if current is None:
+        return other
+    return np.intersect1d(current, other, assume_unique=True)
+
+
+def _union(postings: dict, values) -> np.ndarray:
+    arrays = [postings[v] for v in values if v in postings]
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.unique(np.concatenate(arrays))
+
+
+@phase("query")
+def search_jobs(stats: CompactFrame, index: dict, text="", min_salary=0.0,
+                hybrid=False, visa=False, countries=(), seniorities=(),
+                skills=(), domains=()) -> np.ndarray:
+    """
+    Mêmes filtres que l'explorer (page2) : renvoie les positions des lignes
+    qui matchent, dans l'ordre du fichier, ou par pertinence (BM25) si
+    `text` est donné.
+    - skills : toutes doivent matcher (AND)
+    - countries / seniorities / domains : au moins une (OR)
+    - text : chaque mot est un préfixe, tous doivent matcher (AND)
+    """
+    empty = np.empty(0, dtype=np.int64)
+    lists = [index["technical_skills"].get(skill, empty) for skill in skills]
+    if countries:
+        lists.append(_union(index["country"], countries))
+    if seniorities:
+        lists.append(_union(index["seniority_level"], seniorities))
+    if domains:
+        lists.append(_union(index["domains"], domains))
+    if hybrid:
+        lists.append(index["hybrid_policy"])
+    if visa:
+        lists.append(index["visa_sponsorship"])
+
+    # Les listes les plus sélectives d'abord : chaque intersection reste petite
+    rows = None
+    for postings in sorted(lists, key=len):
+        rows = _intersect(rows, postings)
+
+    if min_salary and min_salary > 0:
+        if rows is None:
+            start = np.searchsorted(index["salary_sorted"], min_salary, side="left")
+            rows = np.sort(index["salary_order"][start:])
+        else:
+            rows = rows[index["salary"][rows] >= min_salary]
+
+    if text and (rows is None or len(rows)):
+        ranked = index["text"].search(text, candidates=rows)
+        if ranked is not None:
+            return ranked[0]
+
+    if rows is None:
+        rows = np.arange(index["n_rows"], dtype=np.int64)
+    return rows
+
+
+def _arg_list(name: str) -> list:
+    """?skills=a&skills=b ou ?skills=a,b"""
+    out = []
+    for raw in request.args.getlist(name):
+        out.extend(p.strip() for p in raw.split(",") if p.strip())
+    return out
+
+
+def _search_filters() -> dict:
+    """Paramètres de filtre communs (mêmes noms que l'explorer) -> search_jobs."""
+    return {
+        "text": request.args.get("text", "").strip(),
+        "min_salary": request.args.get("salary", 0, type=float),
+        "hybrid": request.args.get("hybrid", "").lower() in {"true", "1", "yes"},
+        "visa": request.args.get("visa", "").lower() in {"true", "1", "yes"},
+        "countries": _arg_list("country"),
+        "seniorities": _arg_list("seniority"),
+        "skills": _arg_list("skills"),
+        "domains": _arg_list("domains"),
+    }
+
+
+# PRE-SERIALIZED PAYLOADS
+# Les gros endpoints JSON ne changent qu'au rechargement des fichiers :
+# sérialisés une seule fois, stockés bruts + gzip + brotli, servis avec un
+# ETag fort (304 si le client est à jour).
+LIGHT_COLS = [
+    "id", "title", "company", "country", "location", "seniority_level",
+    "salary_value", "salary_currency", "hybrid_policy", "visa_sponsorship",
+]
+
+PAYLOAD_BUILDERS = {
+    "jobs": lambda d: d.stats.records(),
+    "jobs-light": lambda d: d.stats.records(columns=LIGHT_COLS),
+    "d3": lambda d: d.d3_df.to_dict(orient="records"),
+}
+
+
+def _build_payload(data: Dataset, name: str) -> dict:
+    with phase("records"):
+        records = PAYLOAD_BUILDERS[name](data)
+    body = app.json.dumps(records, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    with phase("compress"):
+        payload = {
+            "digest": digest,
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=6),
+        }
+        if brotli is not None:
+            payload["br"] = brotli.compress(body, quality=5)
+    return payload
+
+
+def get_payload(data: Dataset, name: str) -> dict:
+    payload = data.payloads.get(name)
+    if payload is None:
+        with data.payloads_lock:
+            # un seul thread sérialise, les autres attendent le résultat
+            payload = data.payloads.get(name)
+            if payload is None:
+                payload = data.payloads[name] = _build_payload(data, name)
+    return payload
+
+
+def _pick_encoding(payload: dict) -> str:
+    accepted = request.accept_encodings
+    for enc in ("br", "gzip"):
+        if enc in payload and accepted[enc] > 0:
+            return enc
+    return "identity"
+
+
+def serve_payload(data: Dataset, name: str) -> Response:
+    payload = get_payload(data, name)
+    encoding = _pick_encoding(payload)
+
+    # un ETag fort par représentation, mais n'importe laquelle prouve que le
+    # client a la version courante. If-None-Match se compare en faible
+    # (RFC 7232) : un proxy qui recompresse renvoie W/"..." (nginx)
+    digest = payload["digest"]
+    etag = digest if encoding == "identity" else f"{digest}-{encoding}"
+    known = request.if_none_match
+    fresh = any(known.contains_weak(digest if e == "identity" else f"{digest}-{e}")
+                for e in ("identity", "gzip", "br"))
+
+    if fresh:
+        resp = Response(status=304)
+    else:
+        resp = Response(payload[encoding], mimetype="application/json")
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+    resp.set_etag(etag)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"  # toujours revalider via l'ETag
+    return resp
+
+
+# STREAMING
+# Mode streaming des endpoints "full dataset" : les lignes sont sérialisées
+# par lots dans un générateur, la mémoire reste bornée par STREAM_BATCH_ROWS
+# et les premiers octets partent tout de suite.
+#   ?stream=ndjson  (ou Accept: application/x-ndjson) -> une ligne JSON par job
+#   ?stream=json                                     -> tableau JSON chunké
+STREAM_BATCH_ROWS = 1000
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+# payload -> (attribut du Dataset, table postgres, colonnes)
+STREAM_SOURCES = {
+    "jobs": ("stats", "jobs", None),
+    "jobs-light": ("stats", "jobs", LIGHT_COLS),
+    "d3": ("d3_df", "d3_data", None),
+}
+
+
+@phase("records")
+def _batch_records(table, start: int, stop: int, columns=None) -> list:
+    if isinstance(table, CompactFrame):
+        return table.records(np.arange(start, min(stop, len(table))), columns=columns)
+    return table.iloc[start:stop].to_dict(orient="records")
+
+
+def _table_batches(table, columns=None):
+    for start in range(0, len(table), STREAM_BATCH_ROWS):
+        yield _batch_records(table, start, start + STREAM_BATCH_ROWS, columns)
+
+
+def _dataset_batches(data, name: str):
+    attr, table, columns = STREAM_SOURCES[name]
+    if data.backend == "postgres":
+        batches = data.store.iter_batches(table, STREAM_BATCH_ROWS, columns)
+        # 1er lot lu avant la réponse : un pool saturé donne un 503, pas un
+        # flux coupé après un 200
+        first = next(batches, None)
+        return itertools.chain([] if first is None else [first], batches)
+    return _table_batches(getattr(data, attr), columns)
+
+
+def _iter_row_json(batches):
+    """Un lot de lignes JSON (déjà encodées) par itération."""
+    for batch in batches:
+        yield [app.json.dumps(r, separators=(",", ":")) for r in batch]
+
+
+def _stream_ndjson(batches):
+    for rows in _iter_row_json(batches):
+        yield ("\n".join(rows) + "\n").encode("utf-8")
+
+
+def _stream_json_array(batches):
+    yield b"["
+    sep = ""
+    for rows in _iter_row_json(batches):
+        yield (sep + ",".join(rows)).encode("utf-8")
+        sep = ","
+    yield b"]"
+
+
+def _stream_mode():
+    mode = request.args.get("stream", "").lower()
+    if mode in {"ndjson", "json"}:
+        return mode
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return "ndjson"
+    return None
+
+
+def serve_dataset(data, name: str) -> Response:
+    """
+    Payload pré-sérialisé par défaut, streaming si demandé. Backend postgres :
+    toujours streamé (pas de payload en mémoire).
+    """
+    mode = _stream_mode()
+    if mode is None and data.backend == "postgres":
+        mode = "json"
+    if mode == "ndjson":
+        return Response(_stream_ndjson(_dataset_batches(data, name)), mimetype=NDJSON_MIMETYPE)
+    if mode == "json":
+        return Response(_stream_json_array(_dataset_batches(data, name)), mimetype="application/json")
+    return serve_payload(data, name)
+
+
+# HOT RELOAD
+# Un thread surveille les CSV de DATA_DIR (ou POST /api/admin/reload) :
+# le nouveau Dataset est construit en arrière-plan pendant que l'ancien
+# continue de servir, puis DATA est remplacé d'un coup. Une requête en cours
+# garde le snapshot qu'elle a lu au début.
+WATCH_DATA_FILES = os.environ.get("WATCH_DATA_FILES", "1") != "0"
+RELOAD_POLL_SECONDS = 10
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+_RELOAD_LOCK = threading.Lock()
+
+
+def admin_token_ok(sent: str | None) -> bool:
+    """X-Admin-Token valide. Comparaison à temps constant (hmac)."""
+    if not ADMIN_TOKEN or sent is None:
+        return False
+    return hmac.compare_digest(sent.encode(), ADMIN_TOKEN.encode())
+
+
+def reload_data() -> bool:
+    """
+    Recharge les fichiers et échange DATA. False si déjà en cours, en échec
+    ou si le chargement initial n'est pas terminé.
+    """
+    global DATA
+    if DATA is None or not _RELOAD_LOCK.acquire(blocking=False):
+        return False
+    try:
+        # swap atomique : l'ancien snapshot part avec ses dernières requêtes
+        DATA = load_dataset()
+        return True
+    except Exception as e:
+        print(f"Reload failed, keeping current data: {e}")
+        return False
+    finally:
+        _RELOAD_LOCK.release()
+
+
+def request_reload() -> bool:
+    """
+    Recharge dans ce processus, ou en mode multi-workers demande au master
+    (SIGHUP, voir PRODUCTION). True si les données ont été rechargées ici.
+    """
+    if MASTER_PID is None:
+        return reload_data()
+    os.kill(MASTER_PID, signal.SIGHUP)
+    return False
+
+
+def _watch_data_files():
+    pending = None
+    failed = None
+    while True:
+        time.sleep(RELOAD_POLL_SECONDS)
+        sig = _files_signature()
+        data = DATA
+        if data is None or sig == data.signature or sig == failed or None in sig:
+            pending = None
+            continue
+        # le pipeline est peut-être encore en train d'écrire : on attend que
+        # la signature soit stable sur deux passages
+        if sig != pending:
+            pending = sig
+            continue
+        pending = None
+        if not request_reload():
+            failed = sig  # pas de nouvel essai avant la prochaine écriture
+
+
+def start_watcher():
+    threading.Thread(target=_watch_data_files, name="data-watcher", daemon=True).start()
+
+
+if LOAD_DATA and WATCH_DATA_FILES and DATA_BACKEND == "memory":
+    start_watcher()
+
+
+# PRODUCTION (multi-workers)
+# gunicorn -c gunicorn.conf.py app:app : le master importe app.py (données
+# chargées une seule fois), appelle prepare_for_fork(), puis forke les
+# workers. Les pages mémoire sont partagées en copy-on-write : les tableaux
+# numpy (index, cubes, sketches, CSR) ne sont jamais réécrits, et gc.freeze()
+# empêche le GC de toucher les en-têtes des objets Python hérités.
+# Rechargement : le watcher du master, POST /api/admin/reload ou
+# kill -HUP <master> -> le master recharge (les anciens workers servent
+# encore), puis gunicorn remplace les workers par des forks à jour.
+MASTER_PID = None  # pid du master gunicorn, None hors mode multi-workers
+FORKED_DATA = None  # snapshot passé aux workers au dernier prepare_for_fork
+
+
+def needs_reload() -> bool:
+    """
+    SIGHUP dans le master : faut-il relire les fichiers ? Non si le snapshot
+    courant n'a pas encore été passé aux workers (le chargement initial
+    vient de finir) : l'état vit ici et pas dans gunicorn.conf.py, que
+    gunicorn ré-exécute à chaque HUP.
+    """
+    return DATA is not None and DATA is FORKED_DATA
+
+
+def prepare_for_fork(warm_payloads: bool = True):
+    """À appeler dans le master, après le chargement et avant de forker."""
+    global MASTER_PID, FORKED_DATA
+    MASTER_PID = os.getpid()
+    FORKED_DATA = DATA
+    if DATA is not None and DATA.backend == "postgres":
+        DATA.store.close()  # les connexions ne se partagent pas : un pool par worker
+    elif warm_payloads and DATA is not None:
+        # sinon chaque worker sérialiserait sa propre copie à la 1re requête
+        for name in PAYLOAD_BUILDERS:
+            get_payload(DATA, name)
+    gc.unfreeze()  # l'éventuel snapshot précédent redevient collectable
+    gc.collect()
+    gc.freeze()
+
+
+# INSTRUMENTATION
+# GET /metrics (format Prometheus, voir metrics.py) : latence, taille des
+# réponses et temps par phase pour chaque route, durées du dernier
+# chargement des données. Profil d'une requête (voir profiling.py) :
+# PROFILING=1 puis ?profile=cprofile ou ?profile=sample avec X-Admin-Token.
+# Sans ADMIN_TOKEN, PROFILING=1 est ignoré : n'importe qui pourrait lancer
+# des profils (requêtes ralenties, fichiers écrits dans data/.profiles/).
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+if PROFILING and not ADMIN_TOKEN:
+    print("PROFILING=1 ignored: set ADMIN_TOKEN to enable profiling")
+    PROFILING = False
+PROFILE_DIR = os.path.join(DATA_DIR, ".profiles")
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """jsonify / app.json.dumps : temps compté dans la phase "serialize"."""
+
+    def dumps(self, obj, **kwargs):
+        with phase("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+app.json = TimedJSONProvider(app)
+
+
+@app.before_request
+def _tag_route():
+    # label de route = règle Flask ("/api/job/<int:job_id>"), pas l'URL
+    request.environ[ROUTE_KEY] = request.url_rule.rule if request.url_rule else None
+
+
+def _profiling_allowed(environ) -> bool:
+    return admin_token_ok(environ.get("HTTP_X_ADMIN_TOKEN"))
+
+
+app.wsgi_app = MetricsMiddleware(
+    ProfilingMiddleware(app.wsgi_app, PROFILING, PROFILE_DIR, check=_profiling_allowed)
+)
+
+
+@app.before_request
+def _warming_up():
+    if DATA is None and request.path.startswith("/api/"):
+        resp = jsonify({"status": "warming_up", "error": LOAD_ERROR})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = str(LOAD_RETRY_SECONDS // 2)
+        return resp
+    return None
+
+
+@app.errorhandler(PoolBusy)
+def _pool_busy(e):
+    resp = jsonify({"error": "database busy, retry later"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "1"
+    return resp
+
+
+@app.before_request
+def _memory_only():
+    if DATA_BACKEND != "memory" and request.endpoint in MEMORY_ONLY_ENDPOINTS:
+        return jsonify({"error": f"not available with DATA_BACKEND={DATA_BACKEND}"}), 501
+    return None
+
+
+@app.route("/healthz")
+def healthz():
+    """Liveness : le processus répond, données chargées ou non."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz")
+def readyz():
+    """Readiness : 200 une fois les données chargées, 503 avant."""
+    data = DATA
+    if data is None:
+        return jsonify({"status": "warming_up", "error": LOAD_ERROR}), 503
+    return jsonify({
+        "status": "ready",
+        "loaded_at": data.loaded_at,
+        "backend": data.backend,
+        "rows": data.rows,
+    })
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 
 # HTML ROUTES
@@ -194,27 +1381,249 @@ def methodology():
 
 @app.route("/api/jobs")
 def api_jobs():
-    return jsonify(STATS_DF.to_dict(orient="records"))
+    return serve_dataset(DATA, "jobs")
+
+
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_IDS_PAGE_SIZE = 5000
+
+
+@app.route("/api/jobs/search")
+def api_jobs_search():
+    """
+    Filtres de l'explorer côté serveur. Avec ?text=, résultats classés par
+    pertinence. ?ids_only=1 : seulement les ids (pages jusqu'à 5000), à
+    compléter avec /api/jobs/by-ids.
+    """
+    data = DATA
+    ids_only = request.args.get("ids_only", "").lower() in {"true", "1", "yes"}
+    max_size = MAX_SEARCH_IDS_PAGE_SIZE if ids_only else MAX_SEARCH_PAGE_SIZE
+    page = max(request.args.get("page", 1, type=int), 1)
+    page_size = min(max(request.args.get("page_size", 10, type=int), 1), max_size)
+    start = (page - 1) * page_size
+
+    if data.backend == "postgres":
+        with phase("query"):
+            total, results = data.store.search(
+                **_search_filters(), offset=start, limit=page_size, ids_only=ids_only,
+            )
+        out = {"total": total, "page": page, "page_size": page_size}
+        out["ids" if ids_only else "results"] = results
+        return jsonify(out)
+
+    rows = search_jobs(data.stats, data.stats_index, **_search_filters())
+    page_rows = rows[start:start + page_size]
+    out = {"total": int(len(rows)), "page": page, "page_size": page_size}
+    if ids_only:
+        out["ids"] = data.stats.frame["id"].to_numpy()[page_rows].tolist()
+    else:
+        with phase("records"):
+            out["results"] = data.stats.records(page_rows)
+    return jsonify(out)
 
 
 @app.route("/api/job/<int:job_id>")
 def api_job(job_id: int):
-    row = STATS_DF[STATS_DF["id"] == job_id]
-    if row.empty:
+    data = DATA
+    if data.backend == "postgres":
+        with phase("query"):
+            results, _ = data.store.jobs_by_ids([job_id])
+        if not results:
+            return jsonify({"error": "job not found"}), 404
+        return jsonify(results[0])
+    pos = lookup_positions(data.stats_index, [job_id])[0]
+    if pos < 0:
         return jsonify({"error": "job not found"}), 404
-    return jsonify(row.iloc[0].to_dict())
+    with phase("records"):
+        record = data.stats.records([pos])[0]
+    return jsonify(record)
+
+
+MAX_IDS_PER_BATCH = 200
+
+
+@app.route("/api/jobs/by-ids")
+def api_jobs_by_ids():
+    """?ids=1,2,3 : plusieurs jobs en un aller-retour (préchargement des cards)."""
+    try:
+        ids = [int(x) for x in _arg_list("ids")]
+    except ValueError:
+        return jsonify({"error": "ids must be integers"}), 400
+    if len(ids) > MAX_IDS_PER_BATCH:
+        return jsonify({"error": f"at most {MAX_IDS_PER_BATCH} ids per request"}), 400
+
+    data = DATA
+    if data.backend == "postgres":
+        with phase("query"):
+            results, missing = data.store.jobs_by_ids(ids)
+        return jsonify({"results": results, "missing": missing})
+
+    positions = lookup_positions(data.stats_index, ids)
+    found = positions >= 0
+    with phase("records"):
+        results = data.stats.records(positions[found])
+    return jsonify({
+        "results": results,
+        "missing": [i for i, ok in zip(ids, found) if not ok],
+    })
 
 
 @app.route("/api/jobs/light")
 def api_jobs_light():
-    cols = ["id", "title", "company", "country", "location", "seniority_level", "salary_value", "salary_currency", "hybrid_policy", "visa_sponsorship"]
-    cols = [c for c in cols if c in STATS_DF.columns]
-    return jsonify(STATS_DF[cols].to_dict(orient="records"))
+    return serve_dataset(DATA, "jobs-light")
 
 
 @app.route("/api/d3-data")
 def api_d3_data():
-    return jsonify(D3_DF.to_dict(orient="records"))
+    return serve_dataset(DATA, "d3")
+
+
+@app.route("/api/timeseries")
+def api_timeseries():
+    """
+    ?granularity=day|week|month (month par défaut), ?country=, ?seniority=
+    (répétables ou séparés par des virgules), ?start= / ?end= (YYYY-MM-DD),
+    ?skills=python,sql et/ou ?top_skills=N.
+    """
+    granularity = request.args.get("granularity", "month")
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of {', '.join(GRANULARITIES)}"}), 400
+    try:
+        start, end = (
+            pd.Timestamp(request.args[k]) if request.args.get(k) else None
+            for k in ("start", "end")
+        )
+    except ValueError:
+        start = end = pd.NaT
+    if start is pd.NaT or end is pd.NaT:  # illisible, ou "nat"
+        return jsonify({"error": "start / end must be dates (YYYY-MM-DD)"}), 400
+    top_skills = min(max(request.args.get("top_skills", 0, type=int), 0), TIMESERIES_MAX_TOP_SKILLS)
+
+    with phase("query"):
+        out = DATA.timeseries.query(
+            granularity,
+            countries=_arg_list("country"),
+            seniorities=_arg_list("seniority"),
+            start=start, end=end,
+            skills=_arg_list("skills"),
+            top_skills=top_skills,
+        )
+    return jsonify(out)
+
+
+@app.route("/api/salary/estimate")
+def api_salary_estimate():
+    """
+    ?seniority=, ?country=, ?skills= (répétables ou séparés par des
+    virgules, vide = tous) et ?q=0.25,0.5,0.75. Quantiles à 1 % près, sur
+    les salaires annuels en USD.
+    """
+    try:
+        quantiles = [float(q) for q in _arg_list("q")] or list(DEFAULT_QUANTILES)
+    except ValueError:
+        return jsonify({"error": "q must be numbers between 0 and 1"}), 400
+    if not all(0 <= q <= 1 for q in quantiles):
+        return jsonify({"error": "q must be numbers between 0 and 1"}), 400
+
+    with phase("query"):
+        out = DATA.salary_sketches.estimate(
+            seniorities=_arg_list("seniority"),
+            countries=_arg_list("country"),
+            skills=_arg_list("skills"),
+            quantiles=quantiles,
+        )
+    return jsonify(out)
+
+
+@app.route("/api/skills/cooccurrence")
+def api_skills_cooccurrence():
+    """
+    Skills citées ensemble + salaire par skill, sur les jobs qui passent les
+    filtres de /api/jobs/search (aucun filtre = tout le dataset, précalculé).
+    ?skill=python : voisins de python seulement. ?sort=count|lift,
+    ?min_count= (2 par défaut), ?top= (100 par défaut).
+    """
+    data = DATA
+    sort = request.args.get("sort", "count")
+    if sort not in {"count", "lift"}:
+        return jsonify({"error": "sort must be count or lift"}), 400
+    min_count = max(request.args.get("min_count", 2, type=int), 1)
+    top = min(max(request.args.get("top", 100, type=int), 1), COOCCURRENCE_MAX_TOP)
+
+    rows = search_jobs(data.stats, data.stats_index, **_search_filters())
+    matrix = data.skill_matrix
+    with phase("query"):
+        summary = matrix.summarize(None if len(rows) == data.stats_index["n_rows"] else np.sort(rows))
+        out = {
+            "jobs": int(summary["n_jobs"]),
+            "skills": matrix.skill_stats(summary, min_count)[:top],
+            "pairs": matrix.pairs(
+                summary, min_count=min_count, top=top, sort=sort,
+                skill=request.args.get("skill") or None,
+            ),
+        }
+    return jsonify(out)
+
+
+MAX_FACET_TOP = 1000
+
+
+@app.route("/api/facets")
+def api_facets():
+    """
+    Comptes du panneau de filtres pour les filtres de /api/jobs/search : pour
+    chaque valeur, nombre de jobs si on la coche (facettes en OU : sans leur
+    propre filtre). Valeurs de la plus fréquente à la moins fréquente du
+    dataset ; ?top=N : les N premières de chaque facette.
+    """
+    top = request.args.get("top", type=int)
+    if top is not None:
+        top = min(max(top, 0), MAX_FACET_TOP)
+    data = DATA
+    return jsonify(facet_counts(data.stats, data.stats_index, data.facets, _search_filters(), top))
+
+
+@app.route("/api/map/meta")
+def api_map_meta():
+    return jsonify(DATA.map_index.meta())
+
+
+@app.route("/api/map/tiles/<int:z>/<int:x>/<int:y>")
+def api_map_tile(z: int, x: int, y: int):
+    """
+    Tuile (z, x, y) de la carte UMAP ; (0, 0) = coin x_umap / y_umap minimal.
+    ?offset= : page suivante des points d'une tuile (voir next_offset).
+    """
+    if not 0 <= z <= MAX_ZOOM:
+        return jsonify({"error": f"zoom must be between 0 and {MAX_ZOOM}"}), 400
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": "tile out of range"}), 400
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    data = DATA
+    return jsonify(map_tile(data.d3_df, data.map_index, z, x, y, offset))
+
+
+@app.route("/api/aggregates")
+def api_aggregates():
+    return jsonify(DATA.aggregates)
+
+
+@app.route("/api/aggregates/<name>")
+def api_aggregate(name: str):
+    aggregates = DATA.aggregates
+    if name not in aggregates:
+        return jsonify({"error": "unknown aggregate"}), 404
+    return jsonify(aggregates[name])
+
+
+@app.route("/api/admin/reload", methods=["POST"])
+def api_admin_reload():
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "reload trigger disabled (ADMIN_TOKEN not set)"}), 403
+    if not admin_token_ok(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "invalid token"}), 403
+    threading.Thread(target=request_reload, name="data-reload", daemon=True).start()
+    return jsonify({"status": "reloading", "current_loaded_at": DATA.loaded_at}), 202
 
 
 # --- Backward-compat endpoints  ---
@@ -0,0 +1,78 @@
+# ====================================================
+# BENCH_MEMORY.PY
+# Mémoire occupée par le dataset stats : ancienne représentation
+# (DataFrame + listes Python + fillna("")) vs CompactFrame
+#
+#   python bench_memory.py                        # data/job_data_clean.csv
+#   python bench_memory.py path/to/job_data_clean.csv
+# ====================================================
+
+import gc
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+
+# app.py sans son chargement en arrière-plan ni watcher : seules les
+# fonctions de lecture servent, et tracemalloc ne doit voir que la mesure
+os.environ["LOAD_DATA"] = "0"
+os.environ["WATCH_DATA_FILES"] = "0"
+import app  # noqa: E402
+
+
+def _retained(build):
+    """Octets encore alloués (tracemalloc) une fois build() terminé."""
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    return obj, tracemalloc.get_traced_memory()[0] - base
+
+
+def _column_bytes(series: pd.Series) -> int:
+    """
+    Taille d'une colonne : buffers numpy + objets Python référencés (listes
+    et chaînes, un objet partagé n'est compté qu'une fois).
+    """
+    if not (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)):
+        return int(series.memory_usage(deep=True, index=False))
+    seen = set()
+    total = len(series) * 8  # tableau de pointeurs
+    for v in series:
+        for obj in (v if isinstance(v, list) else []) + [v]:
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def main(path=None):
+    if path:
+        app.STATS_PATH = path
+    print(f"Dataset : {app.STATS_PATH}")
+
+    tracemalloc.start()
+    old, old_bytes = _retained(lambda: app._read_stats_csv().fillna(""))
+    old_cols = {c: _column_bytes(old[c]) for c in old.columns}
+    n_rows = len(old)
+    del old
+
+    compact, new_bytes = _retained(app._parse_stats_csv)
+    new_cols = {c: _column_bytes(compact.frame[c]) for c in compact.frame.columns}
+    new_cols.update({c: lc.nbytes for c, lc in compact.lists.items()})
+    tracemalloc.stop()
+
+    print(f"{n_rows} lignes\n")
+    print(f"{'column':<24}{'before (MB)':>12}{'after (MB)':>12}{'ratio':>8}")
+    for c in compact.columns:
+        before, after = old_cols.get(c, 0), new_cols.get(c, 0)
+        ratio = f"{before / after:.1f}x" if after else "-"
+        print(f"{c:<24}{before / 1e6:>12.2f}{after / 1e6:>12.2f}{ratio:>8}")
+    print()
+    print(f"{'retained (tracemalloc)':<24}{old_bytes / 1e6:>12.2f}{new_bytes / 1e6:>12.2f}"
+          f"{old_bytes / max(new_bytes, 1):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
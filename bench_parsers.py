@@ -0,0 +1,100 @@
+# ====================================================
+# BENCH_PARSERS.PY
+# Compare la normalisation cellule par cellule (.apply(to_xxx))
+# à la normalisation par colonne (to_xxx_series) de normalize.py
+#
+#   python bench_parsers.py                 # 10k, 100k, 1M lignes
+#   python bench_parsers.py 50000 200000
+# ====================================================
+
+import sys
+import time
+import random
+
+import numpy as np
+import pandas as pd
+
+from normalize import (
+    to_bool, to_float, to_list,
+    to_bool_series, to_float_series, to_list_series,
+)
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+SKILLS = [
+    "python", "sql", "r", "spark", "tableau", "power bi", "excel", "aws",
+    "airflow", "dbt", "java", "scala", "looker", "snowflake", "kafka",
+]
+
+
+def make_columns(n: int, seed: int = 42) -> dict:
+    """Colonnes synthétiques avec les encodages vus dans job_data_clean.csv."""
+    rng = random.Random(seed)
+
+    def skills_cell():
+        items = rng.sample(SKILLS, rng.randint(0, 6))
+        r = rng.random()
+        if r < 0.6:
+            return str(items)                 # "['a', 'b']"
+        if r < 0.9:
+            return ", ".join(items)           # "a, b"
+        return None
+
+    def tasks_cell():
+        # phrases quasi uniques, séparées par " | "
+        k = rng.randint(0, 3)
+        return " | ".join(f"build report {rng.randint(0, 10**6)}" for _ in range(k))
+
+    return {
+        "technical_skills": pd.Series([skills_cell() for _ in range(n)], dtype=object),
+        "tasks": pd.Series([tasks_cell() for _ in range(n)], dtype=object),
+        "hybrid_policy": pd.Series(
+            [rng.choice(["True", "False", "yes", "", None, "oui"]) for _ in range(n)],
+            dtype=object,
+        ),
+        "salary_value": pd.Series(
+            [rng.choice([str(rng.randint(20, 200) * 1000), "", None]) for _ in range(n)],
+            dtype=object,
+        ),
+    }
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def bench(n: int) -> list:
+    cols = make_columns(n)
+    cases = [
+        ("technical_skills", to_list, to_list_series),
+        ("tasks", to_list, to_list_series),
+        ("hybrid_policy", to_bool, to_bool_series),
+        ("salary_value", to_float, to_float_series),
+    ]
+    rows = []
+    for col, scalar, vectorized in cases:
+        s = cols[col]
+        old, t_old = timed(s.apply, scalar)
+        new, t_new = timed(vectorized, s)
+        if scalar is to_float:
+            same = old.astype(float).equals(new)
+        elif scalar is to_bool:
+            same = old.astype(bool).equals(new)
+        else:
+            same = old.tolist() == new.tolist()
+        rows.append((n, col, t_old, t_new, same))
+    return rows
+
+
+def main(sizes):
+    print(f"{'rows':>9}  {'column':<18}{'apply (s)':>10}{'series (s)':>11}{'speedup':>9}  same")
+    for n in sizes:
+        for n_rows, col, t_old, t_new, same in bench(n):
+            speedup = t_old / t_new if t_new else np.inf
+            print(f"{n_rows:>9}  {col:<18}{t_old:>10.3f}{t_new:>11.3f}{speedup:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,332 @@
+# ====================================================
+# BENCH_SUITE.PY
+# Benchmark de bout en bout sur les jeux de gen_dataset.py, une taille à
+# la fois, chaque mesure dans un processus neuf (RSS max non faussé) :
+#   load      chargement sans cache puis avec cache (durée de chaque étape,
+#             RSS max), latence et taille de réponse de chaque endpoint
+#   pipeline  data.enrich_linkedin_dataset sur l'export brut du scraper
+#             (lignes / s, RSS max), puis pipeline_chunked : le mode
+#             streaming (RSS max du parent et du plus gros worker)
+#   upload    import_csv.upload_data, seulement si BENCH_DATABASE_URL est
+#             défini (base PostgreSQL jetable : les tables sont recréées),
+#             puis load_postgres : endpoints servis par DATA_BACKEND=postgres
+# Résultats en JSON ; --baseline compare à un run précédent et sort en
+# erreur si une mesure régresse de plus de --tolerance.
+#
+#   python gen_dataset.py 1000 10000 100000
+#   python bench_suite.py                                  # tout bench_data/
+#   python bench_suite.py 1000 10000 --out new.json --baseline old.json
+# ====================================================
+
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_DATA = "bench_data"
+DEFAULT_OUT = "bench_results.json"
+PIPELINE_MAX_ROWS = 100_000  # data.py : ~1700 lignes / s et par coeur
+RESULT_PREFIX = "BENCH_RESULT "
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (nom, URL, répétitions) ; {mid} / {ids} : ids de jobs existants
+ENDPOINTS = [
+    ("jobs", "/api/jobs", 3),
+    ("jobs_light", "/api/jobs/light", 3),
+    ("jobs_ndjson", "/api/jobs?stream=ndjson", 2),
+    ("d3", "/api/d3-data", 3),
+    ("search_text", "/api/jobs/search?text=python%20pipeline&page_size=50", 20),
+    ("search_filters", "/api/jobs/search?skills=python&country=France&seniority=senior", 20),
+    ("search_ids", "/api/jobs/search?skills=sql&ids_only=1&page_size=5000", 20),
+    ("job", "/api/job/{mid}", 50),
+    ("by_ids", "/api/jobs/by-ids?ids={ids}", 20),
+    ("aggregates", "/api/aggregates", 20),
+    ("timeseries", "/api/timeseries?granularity=week&top_skills=10", 20),
+    ("salary_estimate", "/api/salary/estimate?country=France&skills=python", 50),
+    ("cooccurrence", "/api/skills/cooccurrence?country=France", 10),
+    ("facets", "/api/facets?top=20&country=France&skills=python&hybrid=1", 20),
+    ("map_tile", "/api/map/tiles/2/1/1", 20),
+]
+
+# régression = plus haut pour tout, sauf les débits ; en dessous de ces
+# écarts absolus, c'est du bruit
+NOISE_FLOOR = {"seconds": 0.005, "bytes": 1024, "rss_mb": 10, "rows_per_s": 0}
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux : Ko
+
+
+def _emit(result: dict):
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ---------------------------------------------------- mesures (processus fils)
+def _child_load(root: str, endpoints: bool, backend: str = "memory"):
+    os.environ["DATA_DIR"] = os.path.join(root, "data")
+    os.environ["WATCH_DATA_FILES"] = "0"
+    os.environ["DATA_BACKEND"] = backend
+    if backend == "postgres":
+        os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+    sys.path.insert(0, BASE_DIR)
+    t0 = time.perf_counter()
+    import app
+    import metrics
+    import_seconds = time.perf_counter() - t0
+    while app.DATA is None:
+        if app.LOAD_ERROR:
+            raise SystemExit(f"load failed: {app.LOAD_ERROR}")
+        time.sleep(0.01)
+    out = {
+        "import_seconds": import_seconds,
+        "ready_seconds": time.perf_counter() - t0,
+        "steps_seconds": {k[0]: v for k, v in metrics.LOAD_SECONDS._values.items()},
+        "rss_mb_after_load": _peak_rss_mb(),
+    }
+    if endpoints:
+        out["endpoints"] = _bench_endpoints(app)
+        out["rss_mb_after_endpoints"] = _peak_rss_mb()
+    _emit(out)
+
+
+def _job_ids(data) -> list:
+    if data.backend == "postgres":
+        return [r[0] for r in data.store.fetchall("SELECT id FROM jobs ORDER BY id")]
+    return data.stats.frame["id"].tolist()
+
+
+def _bench_endpoints(app) -> dict:
+    ids = _job_ids(app.DATA)
+    fill = {
+        "mid": int(ids[len(ids) // 2]),
+        "ids": ",".join(str(int(i)) for i in ids[:: max(len(ids) // 50, 1)][:50]),
+    }
+    client = app.app.test_client()
+    results = {}
+    for name, url, repeats in ENDPOINTS:
+        url = url.format(**fill)
+        timings, size = [], 0
+        for i in range(repeats + 1):  # +1 : premier appel (payloads à construire)
+            t = time.perf_counter()
+            resp = client.get(url, headers={"Accept-Encoding": "identity"})
+            body = resp.get_data()
+            timings.append(time.perf_counter() - t)
+            size = len(body)
+            if resp.status_code == 501:  # pas disponible avec ce backend
+                break
+            if resp.status_code != 200:
+                raise SystemExit(f"{url}: HTTP {resp.status_code}")
+        if resp.status_code == 501:
+            continue
+        warm = sorted(timings[1:])
+        results[name] = {
+            "first_seconds": timings[0],
+            "p50_seconds": warm[len(warm) // 2],
+            "p95_seconds": warm[min(int(len(warm) * 0.95), len(warm) - 1)],
+            "bytes": size,
+        }
+    return results
+
+
+def _child_pipeline(root: str):
+    sys.path.insert(0, BASE_DIR)
+    import data
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        df = data.enrich_linkedin_dataset(
+            input_csv=os.path.join(root, "master_clean.csv"),
+            output_csv=os.path.join(tmp, "data.csv"),
+        )
+        seconds = time.perf_counter() - t
+    _emit({"rows": len(df), "seconds": seconds, "rows_per_s": len(df) / seconds,
+           "rss_mb": _peak_rss_mb()})
+
+
+def _child_pipeline_chunked(root: str):
+    sys.path.insert(0, BASE_DIR)
+    import data
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        rows = data.enrich_linkedin_dataset_chunked(
+            input_csv=os.path.join(root, "master_clean.csv"),
+            output_csv=os.path.join(tmp, "data.csv"),
+        )
+        seconds = time.perf_counter() - t
+    workers_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    _emit({"rows": rows, "seconds": seconds, "rows_per_s": rows / seconds,
+           "rss_mb": max(_peak_rss_mb(), workers_mb), "workers": os.cpu_count()})
+
+
+def _child_upload(root: str):
+    sys.path.insert(0, BASE_DIR)
+    os.chdir(root)  # import_csv lit data/*.csv en relatif
+    sys.stdin = io.StringIO(os.environ["BENCH_DATABASE_URL"] + "\n")  # input() à l'import
+    import import_csv
+    t = time.perf_counter()
+    import_csv.upload_data()
+    seconds = time.perf_counter() - t
+    rows = _count_rows(os.path.join(root, "data", "job_data_clean.csv"))
+    _emit({"rows": rows, "seconds": seconds, "rows_per_s": rows / seconds, "rss_mb": _peak_rss_mb()})
+
+
+def _count_rows(path: str) -> int:
+    import pandas as pd
+    return len(pd.read_csv(path, usecols=["id"], escapechar="\\"))
+
+
+CHILDREN = {
+    "load": lambda root: _child_load(root, endpoints=True),
+    "load_cached": lambda root: _child_load(root, endpoints=False),
+    "load_postgres": lambda root: _child_load(root, endpoints=True, backend="postgres"),
+    "pipeline": _child_pipeline,
+    "pipeline_chunked": _child_pipeline_chunked,
+    "upload": _child_upload,
+}
+
+
+# ---------------------------------------------------- orchestration
+def _run_child(stage: str, root: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", stage, root],
+        capture_output=True, text=True,
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+    return {"error": "\n".join(tail) or f"exit code {proc.returncode}"}
+
+
+def run_size(root: str, n: int, pipeline_max: int) -> dict:
+    cache = os.path.join(root, "data", ".cache")
+    shutil.rmtree(cache, ignore_errors=True)
+    result = {"load": _run_child("load", root)}
+    result["load_cached"] = _run_child("load_cached", root)  # le 1er run a écrit le cache
+    shutil.rmtree(cache, ignore_errors=True)
+    if n <= pipeline_max:
+        result["pipeline"] = _run_child("pipeline", root)
+        result["pipeline_chunked"] = _run_child("pipeline_chunked", root)
+    if os.environ.get("BENCH_DATABASE_URL"):
+        result["upload"] = _run_child("upload", root)
+        result["load_postgres"] = _run_child("load_postgres", root)
+    return result
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            out.update(_flatten(v, key))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = v
+    return out
+
+
+def _unit(key: str) -> str:
+    last = key.rsplit(".", 1)[-1]
+    for unit in NOISE_FLOOR:
+        if last.endswith(unit) or last.startswith(unit):
+            return unit
+    return ""
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Mesures qui régressent de plus de tolerance (et du plancher de bruit)."""
+    new, old = _flatten(results["sizes"]), _flatten(baseline.get("sizes", {}))
+    regressions = []
+    for key, value in sorted(new.items()):
+        unit = _unit(key)
+        if key not in old or not unit or key.endswith(".rows"):
+            continue
+        before = old[key]
+        worse = before - value if unit == "rows_per_s" else value - before
+        if worse > NOISE_FLOOR[unit] and worse > tolerance * abs(before):
+            regressions.append((key, before, value))
+    return regressions
+
+
+def _print_summary(n: int, r: dict):
+    load, cached = r.get("load", {}), r.get("load_cached", {})
+    print(f"\n=== {n} rows")
+    if "error" in load:
+        print(f"  load: ERROR {load['error']}")
+        return
+    print(f"  load (no cache) : ready {load['ready_seconds']:.2f}s, peak RSS {load['rss_mb_after_load']:.0f} MB")
+    for step, s in sorted(load["steps_seconds"].items(), key=lambda kv: -kv[1]):
+        print(f"      {step:<16} {s:8.3f}s")
+    if "ready_seconds" in cached:
+        print(f"  load (cache)    : ready {cached['ready_seconds']:.2f}s, peak RSS {cached['rss_mb_after_load']:.0f} MB")
+    _print_endpoints(load)
+    for stage in ("pipeline", "pipeline_chunked", "upload"):
+        s = r.get(stage)
+        if s and "error" not in s:
+            print(f"  {stage:<16} {s['seconds']:.1f}s, {s['rows_per_s']:.0f} rows/s, peak RSS {s['rss_mb']:.0f} MB")
+        elif s:
+            print(f"  {stage}: ERROR {s['error']}")
+    pg = r.get("load_postgres")
+    if pg and "error" not in pg:
+        print(f"  load (postgres) : ready {pg['ready_seconds']:.2f}s, peak RSS {pg['rss_mb_after_endpoints']:.0f} MB")
+        _print_endpoints(pg)
+    elif pg:
+        print(f"  load_postgres: ERROR {pg['error']}")
+
+
+def _print_endpoints(stage: dict):
+    print(f"  {'endpoint':<16} {'first':>9} {'p50':>9} {'p95':>9} {'bytes':>12}")
+    for name, e in stage.get("endpoints", {}).items():
+        print(f"  {name:<16} {e['first_seconds'] * 1000:8.1f}ms {e['p50_seconds'] * 1000:8.2f}ms "
+              f"{e['p95_seconds'] * 1000:8.2f}ms {e['bytes']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite")
+    parser.add_argument("sizes", nargs="*", type=int, help="tailles (défaut : tout --data)")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="dossier de gen_dataset.py")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--baseline", help="résultats JSON d'un run précédent")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--pipeline-max-rows", type=int, default=PIPELINE_MAX_ROWS)
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "ROOT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stage, root = args.child
+        CHILDREN[stage](root)
+        return
+
+    sizes = args.sizes or sorted(int(d) for d in os.listdir(args.data) if d.isdigit())
+    if not sizes:
+        raise SystemExit(f"No dataset in {args.data}/ : run gen_dataset.py first")
+
+    results = {"created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0],
+               "sizes": {}}
+    for n in sizes:
+        root = os.path.join(args.data, str(n))
+        if not os.path.isdir(root):
+            raise SystemExit(f"Missing {root} : python gen_dataset.py {n} --out {args.data}")
+        results["sizes"][str(n)] = run_size(os.path.abspath(root), n, args.pipeline_max_rows)
+        _print_summary(n, results["sizes"][str(n)])
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.4g} -> {after:.4g}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.tolerance:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
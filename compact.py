@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import gc
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# REPRÉSENTATION COMPACTE
+# Les colonnes-listes (technical_skills, domains...) ne sont plus des listes
+# Python par cellule mais un format CSR :
+#   offsets[i]:offsets[i+1] -> codes de la ligne i, codes -> vocab (str uniques)
+# Les listes ne sont recréées qu'au moment de répondre, pour les lignes servies.
+# Les colonnes texte peu variées (company, location, date_posted...) passent
+# en category : une chaîne par valeur distincte au lieu d'une par ligne.
+
+# int32 suffit tant qu'une colonne-liste a moins de 2^31 éléments au total
+OFFSET_DTYPE = "int32"
+
+# part max de valeurs distinctes pour qu'une colonne texte devienne category
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+class ListColumn:
+    __slots__ = ("offsets", "codes", "vocab")
+
+    def __init__(self, offsets: np.ndarray, codes: np.ndarray, vocab: np.ndarray):
+        self.offsets = offsets
+        self.codes = codes
+        self.vocab = vocab
+
+    @classmethod
+    def from_lists(cls, cells) -> "ListColumn":
+        cells = list(cells)
+        lengths = np.fromiter(map(len, cells), dtype=np.int64, count=len(cells))
+        offsets = np.zeros(len(cells) + 1, dtype=OFFSET_DTYPE)
+        np.cumsum(lengths, out=offsets[1:])
+
+        flat = pd.Series(list(chain.from_iterable(cells)), dtype=object)
+        codes, uniques = pd.factorize(flat)
+        return cls(offsets, codes.astype(np.int32), np.asarray(uniques, dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def row_ids(self) -> np.ndarray:
+        """Ligne de chaque code (même longueur que codes)."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.lengths())
+
+    def rows(self, positions=None) -> list:
+        """Listes Python des lignes demandées (toutes si positions est None)."""
+        if positions is None:
+            offsets, codes = self.offsets, self.codes
+        else:
+            positions = np.asarray(positions, dtype=np.int64)
+            starts, ends = self.offsets[positions], self.offsets[positions + 1]
+            lengths = ends - starts
+            offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            # indices des codes de chaque ligne, mis bout à bout
+            idx = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+            codes = self.codes[idx]
+
+        flat = self.vocab[codes].tolist()
+        o = offsets.tolist()
+        gc.disable()  # beaucoup de petites listes, rien à collecter
+        try:
+            return list(map(flat.__getitem__, map(slice, o[:-1], o[1:])))
+        finally:
+            gc.enable()
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.offsets.nbytes + self.codes.nbytes
+            + sum(len(v) + 49 for v in self.vocab) + self.vocab.nbytes
+        )
+
+
+class CompactFrame:
+    """
+    DataFrame des colonnes scalaires (catégories, floats, bools, textes) +
+    colonnes-listes en CSR. records() renvoie exactement ce que donnait
+    l'ancien df.to_dict(orient="records") (listes Python, "" pour les
+    valeurs manquantes).
+    """
+
+    def __init__(self, frame: pd.DataFrame, lists: dict, columns: list):
+        self.frame = frame
+        self.lists = lists
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, list_cols, category_cols=()) -> "CompactFrame":
+        """
+        category_cols sont toujours catégorisées ; les autres colonnes texte
+        le sont si elles ont peu de valeurs distinctes.
+        """
+        columns = list(df.columns)
+        lists = {c: ListColumn.from_lists(df[c]) for c in list_cols}
+        frame = df.drop(columns=list(list_cols))
+
+        max_unique = CATEGORY_MAX_UNIQUE_RATIO * len(frame)
+        for c in frame.columns:
+            if pd.api.types.is_float_dtype(frame[c].dtype) or frame[c].dtype == bool:
+                continue  # floats : NaN sert de masque
+            col = frame[c].fillna("")
+            if c in category_cols:
+                col = col.astype(str).astype("category")
+            elif pd.api.types.is_string_dtype(col.dtype) and col.nunique() <= max_unique:
+                col = col.astype("category")
+            else:
+                # read_csv (moteur python) rend des vues sur un seul tableau
+                # 2D lignes x colonnes : sans copie, il reste entier en mémoire
+                col = col.copy()
+            frame[c] = col
+        return cls(frame, lists, columns)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def records(self, positions=None, columns=None) -> list:
+        sub = self.frame if positions is None else self.frame.iloc[positions]
+        scalar_cols = [c for c in (columns or self.columns) if c in sub.columns]
+        sub = sub[scalar_cols]
+
+        # l'API a toujours renvoyé "" pour un nombre manquant
+        floats = [c for c in scalar_cols if pd.api.types.is_float_dtype(sub[c].dtype)]
+        if floats:
+            sub = sub.astype({c: object for c in floats})
+            for c in floats:
+                sub[c] = sub[c].where(sub[c].notna(), "")
+
+        out = sub.to_dict(orient="records")
+        for c, lc in self.lists.items():
+            if columns is not None and c not in columns:
+                continue
+            for rec, value in zip(out, lc.rows(positions)):
+                rec[c] = value
+        return out
+
+    def memory_usage(self) -> dict:
+        """Octets par colonne (deep), colonnes-listes comprises."""
+        usage = self.frame.memory_usage(deep=True, index=False).to_dict()
+        usage.update({c: lc.nbytes for c, lc in self.lists.items()})
+        return usage
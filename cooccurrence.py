@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# SKILL MATRIX
+# Matrice d'incidence creuse jobs x skills (technical_skills + tools_used,
+# une même chaîne = une même skill). Tout le reste en découle par produits
+# de matrices :
+#   co-occurrences  C = Xᵀ X   (diagonale = nombre de jobs par skill)
+#   lift(a, b)      = C[a, b] * N / (C[a, a] * C[b, b])
+#   salaires        = Xᵀ s, Xᵀ s², Xᵀ 1[s connu]
+# Un sous-ensemble de jobs (filtres) = les mêmes produits sur les lignes
+# retenues de X.
+
+
+class SkillMatrix:
+    def __init__(self, matrix, skills, salary):
+        self.matrix = matrix      # csr_matrix jobs x skills, 0/1 (int32)
+        self.skills = skills      # np.array de str
+        self.salary = salary      # float64 par job, NaN si non comparable
+        self.lookup = {v: i for i, v in enumerate(skills)}
+        self.full = self._summarize(matrix, salary)
+
+    @classmethod
+    def build(cls, list_columns, salary: np.ndarray) -> "SkillMatrix":
+        """list_columns : colonnes-listes CSR (compact.ListColumn) de même longueur."""
+        from scipy import sparse  # import lourd : seulement au chargement
+
+        n_rows = len(list_columns[0])
+        rows = np.concatenate([lc.row_ids() for lc in list_columns])
+        names = np.concatenate([lc.vocab[lc.codes] for lc in list_columns])
+        codes, skills = pd.factorize(pd.Series(names, dtype=object))
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, codes)),
+            shape=(n_rows, len(skills)),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1  # skill citée dans les deux colonnes : une fois
+        return cls(matrix, np.asarray(skills, dtype=object), np.asarray(salary, dtype=float))
+
+    @staticmethod
+    def _summarize(matrix, salary: np.ndarray) -> dict:
+        from scipy import sparse
+
+        known = np.isfinite(salary)
+        s = np.where(known, salary, 0.0)
+        xt = matrix.T.tocsr()
+        cooc = (xt @ matrix).tocsr()
+        upper = sparse.triu(cooc, k=1).tocoo()
+        return {
+            "n_jobs": matrix.shape[0],
+            "cooc": cooc,
+            "upper": (upper.row.astype(np.int64), upper.col.astype(np.int64),
+                      upper.data.astype(np.int64)),
+            "counts": cooc.diagonal().astype(np.int64),
+            "salary_n": xt @ known.astype(float),
+            "salary_sum": xt @ s,
+            "salary_sumsq": xt @ (s * s),
+        }
+
+    def summarize(self, rows=None) -> dict:
+        """Statistiques sur tous les jobs, ou sur les positions `rows`."""
+        if rows is None:
+            return self.full
+        return self._summarize(self.matrix[rows], self.salary[rows])
+
+    def skill_stats(self, summary: dict, min_count: int = 1) -> list:
+        counts, n = summary["counts"], summary["salary_n"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = summary["salary_sum"] / n
+            std = np.sqrt(np.maximum(summary["salary_sumsq"] / n - mean * mean, 0))
+        keep = np.flatnonzero(counts >= max(min_count, 1))
+        keep = keep[np.argsort(-counts[keep], kind="stable")]
+        return [
+            {
+                "skill": self.skills[i],
+                "count": int(counts[i]),
+                "salary_count": int(n[i]),
+                "avg_salary": float(mean[i]) if n[i] else None,
+                "std_salary": float(std[i]) if n[i] else None,
+            }
+            for i in keep
+        ]
+
+    def pairs(self, summary: dict, min_count: int = 1, top: int = 100,
+              sort: str = "count", skill=None) -> list:
+        """
+        Paires (a, b) citées ensemble dans au moins min_count jobs, triées
+        par nombre ou par lift. skill : seulement les voisins de cette skill.
+        """
+        cooc, counts, n_jobs = summary["cooc"], summary["counts"], summary["n_jobs"]
+        if skill is not None:
+            i = self.lookup.get(skill)
+            if i is None:
+                return []
+            row = cooc.getrow(i).tocoo()
+            a = np.full(row.nnz, i, dtype=np.int64)
+            b, c = row.col.astype(np.int64), row.data.astype(np.int64)
+            keep = b != i
+        else:
+            a, b, c = summary["upper"]
+            keep = np.ones(len(c), dtype=bool)
+
+        keep &= c >= max(min_count, 1)
+        a, b, c = a[keep], b[keep], c[keep]
+        lift = c * n_jobs / (counts[a] * counts[b])
+
+        # tri complet seulement sur les candidats au top (ex aequo compris)
+        key = lift if sort == "lift" else c
+        if len(key) > top:
+            threshold = np.partition(key, len(key) - top)[len(key) - top]
+            cand = np.flatnonzero(key >= threshold)
+            a, b, c, lift, key = a[cand], b[cand], c[cand], lift[cand], key[cand]
+        order = np.lexsort((b, a, -key))[:top]
+        return [
+            {"a": self.skills[x], "b": self.skills[y], "count": int(k), "lift": float(l)}
+            for x, y, k, l in zip(a[order], b[order], c[order], lift[order])
+        ]
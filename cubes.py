@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# TIME-SERIES CUBES
+# Nombre de jobs et de mentions de skills par (période, pays, séniorité),
+# calculés au chargement pour les granularités day / week / month.
+# Une requête filtrée ne parcourt que les cellules du cube, jamais les jobs.
+#   jobs   : cube dense [période, pays, séniorité]
+#   skills : cube creux (COO trié par période) : période, pays, séniorité,
+#            skill, nombre
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _bucket_starts(days: pd.DatetimeIndex, granularity: str) -> pd.DatetimeIndex:
+    if granularity == "day":
+        return days
+    if granularity == "week":  # semaines ISO, du lundi au dimanche
+        return days - pd.to_timedelta(days.weekday, unit="D")
+    return days - pd.to_timedelta(days.day - 1, unit="D")
+
+
+def _next_start(start: pd.Timestamp, granularity: str) -> pd.Timestamp:
+    """Début de la période qui suit celle qui commence à `start`."""
+    if granularity == "day":
+        return start + pd.Timedelta(days=1)
+    if granularity == "week":
+        return start + pd.Timedelta(days=7)
+    return start + pd.offsets.MonthBegin(1)
+
+
+def _as_utc_day_axis(ts):
+    """Borne start / end comparable aux périodes (naïves, en UTC comme _parse_dates)."""
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.tz_convert(None)
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """date_posted -> jour (NaT si illisible). Chaque valeur distincte n'est parsée qu'une fois."""
+    codes, uniques = pd.factorize(values.astype(str).str.strip())
+    parsed = pd.to_datetime(pd.Series(uniques), errors="coerce", format="mixed", utc=True)
+    days = parsed.dt.tz_localize(None).dt.normalize().to_numpy()
+    return pd.Series(np.append(days, np.datetime64("NaT"))[codes], index=values.index)
+
+
+class _Cube:
+    def __init__(self, starts, jobs, skill_bucket, skill_country, skill_seniority,
+                 skill_code, skill_count):
+        self.starts = starts          # DatetimeIndex, début de chaque période
+        self.jobs = jobs              # int32 [période, pays, séniorité]
+        self.skill_bucket = skill_bucket
+        self.skill_country = skill_country
+        self.skill_seniority = skill_seniority
+        self.skill_code = skill_code
+        self.skill_count = skill_count
+
+
+class TimeSeriesCubes:
+    def __init__(self, countries, seniorities, skills, cubes, undated):
+        self.countries = countries      # valeurs de l'axe pays
+        self.seniorities = seniorities
+        self.skills = skills            # vocab des skills (codes CSR)
+        self.skill_codes = {v: i for i, v in enumerate(skills)}
+        self.cubes = cubes              # granularité -> _Cube
+        self.undated = undated          # jobs sans date exploitable
+
+    @classmethod
+    def build(cls, dates: pd.Series, countries: pd.Series, seniorities: pd.Series,
+              skills) -> "TimeSeriesCubes":
+        """skills : colonne-liste CSR (compact.ListColumn)."""
+        days = _parse_dates(dates)
+        dated = days.notna().to_numpy()
+        c_codes, c_values = pd.factorize(countries.astype(str).str.strip())
+        s_codes, s_values = pd.factorize(seniorities.astype(str).str.strip())
+        n_c, n_s = len(c_values), len(s_values)
+
+        # mentions de skills des jobs datés
+        skill_rows = skills.row_ids()
+        keep = dated[skill_rows]
+        skill_rows, skill_codes = skill_rows[keep], skills.codes[keep].astype(np.int64)
+
+        cubes = {}
+        if dated.any():
+            first, last = days[dated].min(), days[dated].max()
+            all_days = pd.date_range(first, last, freq="D")
+            day_idx = np.full(len(days), -1, dtype=np.int64)
+            day_idx[dated] = ((days[dated] - first).dt.days).to_numpy()
+
+            for granularity in GRANULARITIES:
+                starts_per_day = _bucket_starts(all_days, granularity)
+                bucket_of_day, starts = pd.factorize(starts_per_day)
+                bucket = np.where(dated, bucket_of_day[np.maximum(day_idx, 0)], -1)
+                n_b = len(starts)
+
+                cell = (bucket[dated] * n_c + c_codes[dated]) * n_s + s_codes[dated]
+                jobs = np.bincount(cell, minlength=n_b * n_c * n_s)
+                jobs = jobs.reshape(n_b, n_c, n_s).astype(np.int32)
+
+                r = skill_rows
+                key = ((bucket[r] * n_c + c_codes[r]) * n_s + s_codes[r]) * len(skills.vocab) + skill_codes
+                key, count = np.unique(key, return_counts=True)  # trié => par période
+                key, skill_code = np.divmod(key, len(skills.vocab))
+                key, seniority = np.divmod(key, n_s)
+                b, country = np.divmod(key, n_c)
+
+                cubes[granularity] = _Cube(
+                    pd.DatetimeIndex(starts), jobs,
+                    b.astype(np.int32), country.astype(np.int32),
+                    seniority.astype(np.int32), skill_code.astype(np.int32),
+                    count.astype(np.int32),
+                )
+
+        return cls(
+            np.asarray(c_values, dtype=object), np.asarray(s_values, dtype=object),
+            skills.vocab, cubes, int((~dated).sum()),
+        )
+
+    @staticmethod
+    def _mask(axis: np.ndarray, selected) -> np.ndarray:
+        if not selected:
+            return np.ones(len(axis), dtype=bool)
+        return np.isin(axis, list(selected))
+
+    def query(self, granularity="month", countries=(), seniorities=(),
+              start=None, end=None, skills=(), top_skills=0) -> dict:
+        """
+        Séries filtrées : pays / séniorités en OR, période [start, end]
+        (dates incluses, bornées aux périodes qui les contiennent ; une
+        borne avec fuseau est ramenée en UTC).
+        skills : séries de ces skills ; top_skills : les N plus cités sur la
+        période filtrée.
+        """
+        cube = self.cubes.get(granularity)
+        if cube is None:
+            return {"granularity": granularity, "buckets": [], "jobs": [], "skills": {},
+                    "undated": self.undated}
+
+        start, end = _as_utc_day_axis(start), _as_utc_day_axis(end)
+        b0, b1 = 0, len(cube.starts)
+        if start is not None:
+            if start >= _next_start(cube.starts[-1], granularity):
+                b0 = b1  # après la dernière période : séries vides
+            else:
+                b0 = max(int(cube.starts.searchsorted(start, side="right")) - 1, 0)
+        if end is not None:
+            b1 = int(cube.starts.searchsorted(end, side="right"))
+        b1 = max(b0, b1)
+
+        c_mask = self._mask(self.countries, countries)
+        s_mask = self._mask(self.seniorities, seniorities)
+        jobs = cube.jobs[b0:b1][:, c_mask][:, :, s_mask].sum(axis=(1, 2))
+
+        out = {
+            "granularity": granularity,
+            "buckets": [d.strftime("%Y-%m-%d") for d in cube.starts[b0:b1]],
+            "jobs": jobs.tolist(),
+            "skills": {},
+            "undated": self.undated,
+        }
+        if not skills and not top_skills:
+            return out
+
+        lo = np.searchsorted(cube.skill_bucket, b0, side="left")
+        hi = np.searchsorted(cube.skill_bucket, b1, side="left")
+        m = c_mask[cube.skill_country[lo:hi]] & s_mask[cube.skill_seniority[lo:hi]]
+        bucket = cube.skill_bucket[lo:hi][m] - b0
+        code = cube.skill_code[lo:hi][m]
+        count = cube.skill_count[lo:hi][m]
+
+        wanted = list(dict.fromkeys(skills))
+        if top_skills:
+            totals = np.bincount(code, weights=count, minlength=len(self.skills))
+            top = np.argsort(-totals, kind="stable")[:top_skills]
+            wanted += [str(self.skills[i]) for i in top if totals[i] > 0]
+            wanted = list(dict.fromkeys(wanted))
+
+        # une seule passe sur les cellules pour toutes les skills demandées
+        n_b = b1 - b0
+        slot = np.full(len(self.skills) + 1, -1, dtype=np.int64)
+        for k, name in enumerate(wanted):
+            slot[self.skill_codes.get(name, len(self.skills))] = k
+        slot[len(self.skills)] = -1  # skill inconnue : série vide
+        k = slot[code]
+        sel = k >= 0
+        series = np.bincount(
+            k[sel] * n_b + bucket[sel], weights=count[sel], minlength=len(wanted) * n_b
+        ).astype(np.int64).reshape(len(wanted), n_b)
+        out["skills"] = {name: row.tolist() for name, row in zip(wanted, series)}
+        return out
@@ -4,8 +4,17 @@
 # Basé sur le pipeline original (Safia Lamri)
 # ====================================================
 
+import io
+import os
 import re
+import csv
 import html
+import json
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 import unicodedata
 import pandas as pd
 import numpy as np
@@ -83,16 +92,70 @@ def clean_text(text):
 # 🔹 3. Regex extractors
 # ====================================================
 
+# Recherche de mots-clés en un seul passage, quel que soit le nombre de
+# mots et de vocabulaires. Un \b est toujours une frontière entre une suite
+# de caractères "mot" (\w+) et une suite de "non-mot" (\W+), ou un bord du
+# texte collé à un mot : `\bmot\b` matche exactement quand le mot est égal
+# à des runs consécutifs du texte (ex. "c++" = "c" + "++"). On découpe donc
+# le texte en runs une fois, puis chaque run de départ coûte une recherche
+# dans un dict -> mêmes résultats que re.search(rf"\b{re.escape(w)}\b", t).
+_RUN_RE = re.compile(r"\w+|\W+")
+_WORD_RE = re.compile(r"\w")
+
+
+class KeywordMatcher:
+    def __init__(self, vocabularies):
+        """vocabularies : nom -> liste de mots."""
+        self.names = list(vocabularies)
+        self.terms = {}  # runs du mot -> [(vocabulaire, mot)]
+        for name, words in vocabularies.items():
+            for w in words:
+                runs = tuple(_RUN_RE.findall(w))
+                if runs:
+                    self.terms.setdefault(runs, []).append((name, w))
+        self.first_runs = {runs[0] for runs in self.terms}
+        self.max_runs = max((len(r) for r in self.terms), default=0)
+
+    def find(self, text):
+        """nom -> mots trouvés, triés et joints par ", " (comme find_keywords)."""
+        found = {name: set() for name in self.names}
+        if isinstance(text, str):
+            runs = _RUN_RE.findall(text.lower())
+            n = len(runs)
+            # \b en fin de texte seulement si le texte finit par un mot
+            end = n if n and _WORD_RE.match(runs[-1]) else n - 1
+            first_runs, terms = self.first_runs, self.terms
+            for i, run in enumerate(runs):
+                if run not in first_runs:
+                    continue
+                # \b au début du texte seulement devant un mot
+                if i == 0 and not _WORD_RE.match(run):
+                    continue
+                for j in range(i + 1, min(i + self.max_runs, end) + 1):
+                    for name, w in terms.get(tuple(runs[i:j]), ()):
+                        found[name].add(w)
+        return {name: ", ".join(sorted(words)) for name, words in found.items()}
+
+
+_MATCHERS = {}
+
+
 def find_keywords(text, words):
     if not isinstance(text, str):
         return ""
-    t = text.lower()
-    found = set()
-    for w in words:
-        pattern = rf"\b{re.escape(w)}\b"
-        if re.search(pattern, t):
-            found.add(w)
-    return ", ".join(sorted(found))
+    key = tuple(words)
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = _MATCHERS[key] = KeywordMatcher({"words": words})
+    return matcher.find(text)["words"]
+
+
+KEYWORD_MATCHER = KeywordMatcher({
+    "technical_skills": TECHNICAL_SKILLS,
+    "tools_used": TOOLS_LIST,
+    "soft_skills": SOFT_SKILLS,
+    "benefits": BENEFITS,
+})
 
 
 def match_category(text, categories):
@@ -102,9 +165,16 @@ def match_category(text, categories):
             return cat
     return None
 
+_SALARY_RE = re.compile(r"(\d+)\s?k?")
+_EXPERIENCE_RE = re.compile(r"(\d+)\+?\s*(years|yrs)")
+_DOMAIN_RES = {dom: re.compile(pattern) for dom, pattern in DOMAINS.items()}
+_SENTENCE_SPLIT_RE = re.compile(r"[.;\n]")
+_TASK_RE = re.compile(r"analy|build|develop|model|report", re.I)
+
+
 def parse_salary(text):
     t = text.lower()
-    nums = re.findall(r"(\d+)\s?k?", t)
+    nums = _SALARY_RE.findall(t)
     if not nums:
         return None, None, None
     vals = [int(n)*1000 if 'k' in t else int(n) for n in nums]
@@ -113,7 +183,7 @@ def parse_salary(text):
     return min(vals), max(vals), "annual"
 
 def parse_experience(text):
-    m = re.search(r"(\d+)\+?\s*(years|yrs)", text)
+    m = _EXPERIENCE_RE.search(text)
     return int(m.group(1)) if m else None
 
 def detect_work_mode(text):
@@ -125,14 +195,14 @@ def detect_work_mode(text):
 
 def extract_domains(text):
     t = text.lower()
-    for dom, pattern in DOMAINS.items():
-        if re.search(pattern, t):
+    for dom, pattern in _DOMAIN_RES.items():
+        if pattern.search(t):
             return dom
     return None
 
 def extract_tasks(text):
-    sentences = re.split(r"[.;\n]", text)
-    tasks = [s.strip() for s in sentences if re.search(r"analy|build|develop|model|report", s, re.I)]
+    sentences = _SENTENCE_SPLIT_RE.split(text)
+    tasks = [s.strip() for s in sentences if _TASK_RE.search(s)]
     return " | ".join(tasks) if tasks else None
 
 def extract_tone(text):
@@ -150,72 +220,294 @@ def extract_eeo_terms(text):
     return ", ".join(found) if found else None
 
 # ====================================================
-# 🔹 4. PIPELINE PRINCIPAL
+# 🔹 4. Registre des features
 # ====================================================
+# Chaque feature est déclarée une fois : colonne -> fonction(row), où row
+# donne le texte nettoyé (déjà en minuscules) et les calculs partagés par
+# plusieurs colonnes (scan des mots-clés, salaire), faits une seule fois
+# par ligne. extract_features évalue tout en un passage par description ;
+# ajouter une feature = une ligne ici, pas un nouveau passage sur le dataset.
+# L'ordre du dict est l'ordre des colonnes dans data.csv.
 
-def enrich_linkedin_dataset(input_csv="linkedin-scraper/master_clean1.csv", output_csv="data.csv"):
-    df = pd.read_csv(
-    input_csv,
-    sep="\t",              # ⬅️ LE POINT CRUCIAL
-    engine="python",
-    encoding="utf-8",
-    on_bad_lines="skip"
-)
+class FeatureRow:
+    def __init__(self, text, seniority=None):
+        self.text = text
+        self.seniority = seniority  # valeur du scrapper, si présente
 
-    print("ENGINE USED:", "python")
-    print("N_COLS:", len(df.columns))
-    print("COLS:", df.columns.tolist())
-    print("N_ROWS:", len(df))
+    @cached_property
+    def keywords(self):
+        return KEYWORD_MATCHER.find(self.text)
 
+    @cached_property
+    def salary(self):
+        return parse_salary(self.text)
 
-    # Nettoyage description
-    df["description_sans_html"] = df["description"].apply(clean_text)
 
-    # Extraire les features avec regex
-    df["technical_skills"] = df["description_sans_html"].apply(lambda x: find_keywords(x, TECHNICAL_SKILLS))
-    df["tools_used"] = df["description_sans_html"].apply(lambda x: find_keywords(x, TOOLS_LIST))
-    df["soft_skills"] = df["description_sans_html"].apply(lambda x: find_keywords(x, SOFT_SKILLS))
-    df["education_level"] = df["description_sans_html"].apply(lambda x: match_category(x, EDUCATION_LEVELS))
+def _salary_value(row):
+    low, high = row.salary[0], row.salary[1]
+    return (low + high) / 2 if low is not None else None
 
-    # Seniorité : si non présent dans scrapper, regex
-    df["seniority_level"] = df.apply(
-        lambda row: row["seniority_level"] if isinstance(row["seniority_level"], str) and row["seniority_level"] != "" 
-        else match_category(row["description_sans_html"], SENIORITY_LEVELS),
-        axis=1
-    )
-
-    df["benefits"] = df["description_sans_html"].apply(lambda x: find_keywords(x, BENEFITS))
-    df["domains"] = df["description_sans_html"].apply(extract_domains)
-    df["tasks"] = df["description_sans_html"].apply(extract_tasks)
-    df["tone_culture"] = df["description_sans_html"].apply(extract_tone)
-    df["eeo_terms"] = df["description_sans_html"].apply(extract_eeo_terms)
 
+FEATURES = {
+    "technical_skills": lambda row: row.keywords["technical_skills"],
+    "tools_used": lambda row: row.keywords["tools_used"],
+    "soft_skills": lambda row: row.keywords["soft_skills"],
+    "education_level": lambda row: match_category(row.text, EDUCATION_LEVELS),
+    # Seniorité : si non présent dans scrapper, regex
+    "seniority_level": lambda row: (
+        row.seniority if isinstance(row.seniority, str) and row.seniority != ""
+        else match_category(row.text, SENIORITY_LEVELS)
+    ),
+    "benefits": lambda row: row.keywords["benefits"],
+    "domains": lambda row: extract_domains(row.text),
+    "tasks": lambda row: extract_tasks(row.text),
+    "tone_culture": lambda row: extract_tone(row.text),
+    "eeo_terms": lambda row: extract_eeo_terms(row.text),
     # EEO & visa
-    df["eeo_statement"] = df["description_sans_html"].apply(lambda t: "yes" if "equal opportunity" in t else None)
-    df["visa_sponsorship"] = df["description_sans_html"].apply(lambda t: "yes" if "visa" in t else None)
-
+    "eeo_statement": lambda row: "yes" if "equal opportunity" in row.text else None,
+    "visa_sponsorship": lambda row: "yes" if "visa" in row.text else None,
     # Work mode
-    df["hybrid_policy"] = df["description_sans_html"].apply(detect_work_mode)
-
+    "hybrid_policy": lambda row: detect_work_mode(row.text),
     # Experience
-    df["experience_mentions"] = df["description_sans_html"].apply(parse_experience)
-
+    "experience_mentions": lambda row: parse_experience(row.text),
     # Salaire
-    df["salary_min"] = df["description_sans_html"].apply(lambda x: parse_salary(x)[0])
-    df["salary_max"] = df["description_sans_html"].apply(lambda x: parse_salary(x)[1])
-    df["salary_value"] = df.apply(
-        lambda r: (r["salary_min"] + r["salary_max"]) / 2 if pd.notna(r["salary_min"]) else None,
-        axis=1
+    "salary_min": lambda row: row.salary[0],
+    "salary_max": lambda row: row.salary[1],
+    "salary_value": _salary_value,
+}
+# toujours en float : le format d'un nombre dans data.csv ne dépend pas des
+# autres lignes (un seul None passe sinon la colonne entière de 5 à 5.0),
+# ni donc du découpage en chunks
+FLOAT_FEATURES = ["experience_mentions", "salary_min", "salary_max", "salary_value"]
+
+
+def extract_features(texts, seniorities=None):
+    """Texte nettoyé (+ seniorité du scrapper) -> DataFrame, une colonne par feature."""
+    if seniorities is None:
+        seniorities = [None] * len(texts)
+    columns = {name: [] for name in FEATURES}
+    extractors = [(columns[name].append, fn) for name, fn in FEATURES.items()]
+    for text, seniority in zip(texts, seniorities):
+        row = FeatureRow(text, seniority)
+        for append, fn in extractors:
+            append(fn(row))
+    out = pd.DataFrame(columns)
+    out[FLOAT_FEATURES] = out[FLOAT_FEATURES].astype("float64")
+    return out
+
+# ====================================================
+# 🔹 5. PIPELINE PRINCIPAL
+# ====================================================
+
+CHUNK_ROWS = 5_000
+
+
+def read_scraper_csv(input_csv, **kwargs):
+    return pd.read_csv(
+        input_csv,
+        sep="\t",              # ⬅️ LE POINT CRUCIAL
+        engine="python",
+        encoding="utf-8",
+        on_bad_lines="skip",
+        **kwargs,
     )
+
+
+def enrich_frame(df):
+    """Nettoyage + features sur un DataFrame brut du scrapper (modifié en place)."""
+    # Nettoyage description
+    df["description_sans_html"] = df["description"].apply(clean_text)
+
+    # Extraire les features : un passage par description (voir FEATURES)
+    features = extract_features(df["description_sans_html"], df.get("seniority_level"))
+    features.index = df.index
+    for name in FEATURES:
+        df[name] = features[name]
+
     df["salary_type"] = "annual"
     df["salary_currency"] = "EUR"
+    return df
+
+
+def enrich_linkedin_dataset(input_csv="linkedin-scraper/master_clean1.csv", output_csv="data.csv"):
+    df = read_scraper_csv(input_csv)
+
+    print("ENGINE USED:", "python")
+    print("N_COLS:", len(df.columns))
+    print("COLS:", df.columns.tolist())
+    print("N_ROWS:", len(df))
+
+    enrich_frame(df)
 
     # Sauvegarde finale
     df.to_csv(output_csv, sep=";", index=False)
     print(f"✅ Pipeline terminé. Fichier généré : {output_csv}")
     return df
+
+# ====================================================
+# 🔹 6. MODE STREAMING (chunks + process pool)
+# ====================================================
+# Pour les gros exports : l'entrée est lue par chunks de chunk_rows lignes,
+# chaque chunk est enrichi et sérialisé en CSV dans un process du pool, et
+# le parent écrit les morceaux dans l'ordre de l'entrée au fur et à mesure.
+# Au plus 2 chunks par worker sont en vol : la mémoire dépend de
+# chunk_rows x workers, pas de la taille de l'export. Même contenu que
+# enrich_linkedin_dataset ; les colonnes d'entrée sont lues en texte (leur
+# type ne dépend pas du chunk), donc un id écrit "1.0" par le mode complet
+# si la colonne a un trou reste "1" ici.
+
+def _enrich_chunk(chunk, header):
+    return enrich_frame(chunk).to_csv(sep=";", index=False, header=header)
+
+
+def enrich_linkedin_dataset_chunked(input_csv="linkedin-scraper/master_clean1.csv", output_csv="data.csv",
+                                    chunk_rows=CHUNK_ROWS, workers=None):
+    """Enrichit input_csv vers output_csv par chunks ; renvoie le nombre de lignes."""
+    workers = workers or os.cpu_count() or 1
+    chunks = read_scraper_csv(input_csv, chunksize=chunk_rows, dtype=str)
+    rows = 0
+    with open(output_csv, "w", encoding="utf-8", newline="") as out:
+        if workers == 1:
+            for i, chunk in enumerate(chunks):
+                out.write(_enrich_chunk(chunk, header=i == 0))
+                rows += len(chunk)
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                pending = deque()
+                for i, chunk in enumerate(chunks):
+                    pending.append(pool.submit(_enrich_chunk, chunk, i == 0))
+                    rows += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        out.write(pending.popleft().result())
+                while pending:
+                    out.write(pending.popleft().result())
+    print(f"✅ Pipeline terminé ({rows} lignes, {workers} workers). Fichier généré : {output_csv}")
+    return rows
+
+
+# ====================================================
+# 🔹 7. MODE INCRÉMENTAL
+# ====================================================
+# scrap.py ajoute quelques centaines d'offres par mois : inutile de tout
+# ré-enrichir. Un état à côté de la sortie (data.csv.state.json) garde,
+# pour chaque ligne de data.csv, le hash de sa ligne d'entrée (link,
+# description et autres colonnes du scrapper) et sa position en octets.
+# Au run suivant, une ligne d'entrée dont le hash est connu reprend ses
+# octets de data.csv tels quels ; seules les nouvelles ou modifiées
+# passent par enrich_frame. La sortie suit l'ordre (et le contenu) de
+# l'entrée, et reste identique à celle du mode streaming.
+# Tout est recalculé si ENRICH_VERSION, FEATURES, les colonnes d'entrée ou
+# data.csv ont changé depuis le dernier run.
+ENRICH_VERSION = 1  # à incrémenter si les features changent
+
+
+def _row_hashes(df):
+    rows = zip(*(df[c].fillna("") for c in df.columns))
+    return [hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=16).hexdigest() for row in rows]
+
+
+def _load_state(output_csv, columns):
+    """(octets de output_csv, hash -> (début, fin) de sa ligne), ou None si l'état est invalide."""
+    try:
+        with open(f"{output_csv}.state.json", "r", encoding="utf-8") as f:
+            state = json.load(f)
+        with open(output_csv, "rb") as f:
+            content = f.read()
+    except (OSError, ValueError):
+        return None
+    if (
+        state.get("version") != ENRICH_VERSION
+        or state.get("columns") != columns
+        or state.get("features") != list(FEATURES)
+        or state.get("sha256") != hashlib.sha256(content).hexdigest()
+    ):
+        return None
+    offsets = state["offsets"]
+    spans = {}
+    for i, h in enumerate(state["hashes"]):
+        spans.setdefault(h, (offsets[i], offsets[i + 1]))
+    return content, spans
+
+
+def _csv_records(df):
+    """Header + une ligne CSV (bytes) par ligne de df, au format de df.to_csv(sep=";")."""
+    # to_csv formate les valeurs (floats, NaN) ; on relit en texte puis
+    # chaque ligne passe par le même csv.writer que pandas
+    text = df.to_csv(sep=";", index=False)
+    values = pd.read_csv(io.StringIO(text), sep=";", dtype=str, keep_default_na=False)
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=";", lineterminator="\n")
+    records = []
+    for row in [values.columns.tolist()] + values.values.tolist():
+        writer.writerow(row)
+        records.append(buf.getvalue().encode("utf-8"))
+        buf.seek(0)
+        buf.truncate()
+    return records[0], records[1:]
+
+
+def _write_atomic(path, mode, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def enrich_linkedin_dataset_incremental(input_csv="linkedin-scraper/master_clean1.csv", output_csv="data.csv"):
+    """Enrichit seulement les lignes nouvelles ou modifiées ; renvoie (lignes, enrichies)."""
+    # colonnes lues en texte comme le mode streaming : une ligne s'écrit
+    # pareil quelles que soient les autres
+    df = read_scraper_csv(input_csv, dtype=str)
+    columns = df.columns.tolist()
+    hashes = _row_hashes(df)
+    content, spans = _load_state(output_csv, columns) or (b"", {})
+
+    todo = [i for i, h in enumerate(hashes) if h not in spans]
+    header, records = _csv_records(enrich_frame(df.iloc[todo].copy()))
+    enriched = dict(zip(todo, records))
+
+    parts, offsets = [header], [len(header)]
+    for i, h in enumerate(hashes):
+        if i in enriched:
+            parts.append(enriched[i])
+        else:
+            start, end = spans[h]
+            parts.append(content[start:end])
+        offsets.append(offsets[-1] + len(parts[-1]))
+    out = b"".join(parts)
+
+    _write_atomic(output_csv, "wb", lambda f: f.write(out))
+    state = {
+        "version": ENRICH_VERSION,
+        "columns": columns,
+        "features": list(FEATURES),
+        "sha256": hashlib.sha256(out).hexdigest(),
+        "hashes": hashes,
+        "offsets": offsets,
+    }
+    _write_atomic(f"{output_csv}.state.json", "w", lambda f: json.dump(state, f))
+    print(f"✅ Pipeline terminé ({len(todo)} lignes enrichies sur {len(df)}). Fichier généré : {output_csv}")
+    return len(df), len(todo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nettoyage + enrichissement du dataset LinkedIn")
+    parser.add_argument("--input", default="linkedin-scraper/master_clean1.csv")
+    parser.add_argument("--output", default="data.csv")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help=f"mode streaming, par chunks (ex. {CHUNK_ROWS})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process du mode streaming (défaut : nombre de coeurs)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="n'enrichit que les lignes nouvelles ou modifiées depuis le dernier run")
+    args = parser.parse_args()
+    if args.incremental:
+        enrich_linkedin_dataset_incremental(args.input, args.output)
+    elif args.chunk_rows:
+        enrich_linkedin_dataset_chunked(args.input, args.output, args.chunk_rows, args.workers)
+    else:
+        enrich_linkedin_dataset(input_csv=args.input, output_csv=args.output)
+
+
 if __name__ == "__main__":
-    enrich_linkedin_dataset(
-        input_csv="linkedin-scraper/master_clean1.csv",
-        output_csv="data.csv"
-    )
+    main()
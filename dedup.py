@@ -0,0 +1,191 @@
+# ====================================================
+# DEDUP.PY
+# Quasi-doublons entre scrap.py et data.py : une offre republiée sur
+# LinkedIn avec une nouvelle URL (ou un texte à peine retouché) n'est pas
+# vue par le dédoublonnage exact de scrap.append_master_json, et compte
+# deux fois partout en aval.
+#   shingles   k mots consécutifs de description_sans_html (clean_text)
+#   MinHash    NUM_PERM minima de hash par offre : la proportion de
+#              minima égaux estime le Jaccard de deux offres
+#   LSH        signature coupée en BANDS bandes ; deux offres qui ont une
+#              bande identique sont candidates (tri des bandes : ~linéaire)
+#   clusters   candidates vérifiées (Jaccard estimé >= threshold) par
+#              groupes dans chaque bucket (voir linked_pairs), puis
+#              composantes connexes ; la 1re offre du fichier est gardée
+# --mode collapse (défaut) retire les doublons, --mode flag les garde avec
+# une colonne duplicate_of (id de l'offre gardée).
+#
+#   python dedup.py --input linkedin-scraper/master_clean1.csv --output linkedin-scraper/master_dedup.csv
+#   python data.py --input linkedin-scraper/master_dedup.csv
+# ====================================================
+
+import argparse
+import zlib
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from data import clean_text, read_scraper_csv
+
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+# 16 bandes x 8 lignes : une paire à 0.8 de Jaccard est candidate à 95 %,
+# à 0.9 à 99.99 %, à 0.5 à 6 % (écartée ensuite par la vérification)
+BANDS = 16
+THRESHOLD = 0.8
+SEED = 1602
+# shingles hachés à la fois : le bloc (x NUM_PERM x 8 octets) reste en cache
+BLOCK_SHINGLES = 1 << 10
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+
+
+def shingle_hashes(texts, k: int = SHINGLE_WORDS):
+    """(hash uint64 < 2**32 de chaque shingle, offsets CSR par texte)."""
+    token_ids = {}
+    tokens, counts = [], []
+    for text in texts:
+        # clean_text a déjà normalisé les espaces : un mot = ponctuation comprise
+        words = text.split() if isinstance(text, str) else []
+        # un shingle commence à chaque mot ; les k - 1 derniers sont
+        # complétés par des 0 (un texte de moins de k mots a aussi ses shingles)
+        tokens.extend([token_ids.get(w) or token_ids.setdefault(w, zlib.crc32(w.encode("utf-8")) | 1)
+                       for w in words])
+        tokens.extend([0] * (k - 1) if words else [])
+        counts.append(len(words))
+    tokens = np.array(tokens, dtype=np.uint64)
+    counts = np.array(counts, dtype=np.int64)
+    if len(counts) == 0:  # export sans offre (en-tête seul)
+        return np.empty(0, dtype=np.uint64), np.zeros(1, dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    # mot m (tous textes confondus) -> sa position dans tokens : décalé de
+    # k - 1 par texte non vide qui le précède
+    padded = np.concatenate([[0], np.cumsum(np.where(counts > 0, k - 1, 0))[:-1]])
+    starts = np.arange(offsets[-1]) + np.repeat(padded, counts)
+    h = np.zeros(len(starts), dtype=np.uint64)
+    for j in range(k):
+        h = h * _MIX + tokens[starts + j]
+    return (h * _MIX) >> _SHIFT, offsets
+
+
+class NearDuplicates:
+    def __init__(self, signatures: np.ndarray, has_shingles: np.ndarray):
+        self.signatures = signatures      # (n, NUM_PERM) uint32
+        self.has_shingles = has_shingles  # texte vide : jamais doublon
+
+    @classmethod
+    def build(cls, texts, num_perm: int = NUM_PERM, seed: int = SEED) -> "NearDuplicates":
+        """Signatures MinHash des textes (description_sans_html)."""
+        shingles, offsets = shingle_hashes(texts)
+        n = len(offsets) - 1
+        rng = np.random.default_rng(seed)
+        # hash (a * x + b) >> 32 sur 64 bits : une "permutation" par colonne
+        a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        signatures = np.full((n, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        has_shingles = offsets[1:] > offsets[:-1]
+        docs = np.flatnonzero(has_shingles)
+
+        ends = offsets[docs + 1]
+        longest = int((offsets[1:] - offsets[:-1]).max(initial=0))
+        buf = np.empty((max(BLOCK_SHINGLES, longest), num_perm), dtype=np.uint64)
+        lo = 0
+        while lo < len(docs):
+            # assez de textes pour remplir un bloc (au moins un)
+            hi = max(lo + 1, int(np.searchsorted(ends, offsets[docs[lo]] + BLOCK_SHINGLES, "right")))
+            block = docs[lo:hi]
+            start, end = offsets[block[0]], offsets[block[-1] + 1]
+            hashed = buf[:end - start]
+            np.multiply(shingles[start:end, None], a, out=hashed)
+            hashed += b
+            hashed >>= _SHIFT
+            signatures[block] = np.minimum.reduceat(hashed, offsets[block] - start, axis=0)
+            lo = hi
+        return cls(signatures, has_shingles)
+
+    def linked_pairs(self, threshold: float = THRESHOLD, bands: int = BANDS) -> tuple:
+        """
+        (i, j), i < j, des offres qui partagent une bande et dont le Jaccard
+        estimé atteint threshold. Dans chaque bucket, les membres sont
+        comparés au 1er ; ceux qui ne lui ressemblent pas forment un nouveau
+        groupe comparé à son propre 1er membre, et ainsi de suite. Un membre
+        proche d'un autre mais pas du 1er du bucket reste ainsi relié, sans
+        comparer toutes les paires du bucket (quadratique pour une offre
+        republiée des milliers de fois avec de petites retouches).
+        """
+        n = len(self.has_shingles)
+        docs = np.flatnonzero(self.has_shingles)
+        rows = self.signatures.shape[1] // bands
+        pairs = [np.empty(0, dtype=np.int64)]
+        if len(docs) < 2:
+            bands = 0
+        for band in range(bands):
+            keys = np.zeros(len(docs), dtype=np.uint64)
+            for col in self.signatures[docs, band * rows:(band + 1) * rows].T:
+                keys = (keys ^ col) * _MIX
+            order = np.argsort(keys, kind="stable")
+            keys, members = keys[order], docs[order]
+            while len(members) > 1:
+                # 1er de chaque bucket (le plus haut dans le fichier) = leader
+                new = np.concatenate([[True], keys[1:] != keys[:-1]])
+                leader = members[np.maximum.accumulate(np.where(new, np.arange(len(keys)), 0))]
+                follower = np.flatnonzero(~new)
+                close = self.similarity(leader[follower], members[follower]) >= threshold
+                pairs.append(leader[follower[close]] * n + members[follower[close]])
+                rest = follower[~close]
+                keys, members = keys[rest], members[rest]
+        codes = np.unique(np.concatenate(pairs))
+        return codes // n, codes % n
+
+    def similarity(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Jaccard estimé des paires (i, j)."""
+        return (self.signatures[i] == self.signatures[j]).mean(axis=1)
+
+    def duplicate_of(self, threshold: float = THRESHOLD, bands: int = BANDS) -> np.ndarray:
+        """Pour chaque offre : position de l'offre gardée de son cluster, -1 si c'est elle."""
+        n = len(self.has_shingles)
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        i, j = self.linked_pairs(threshold, bands)
+        graph = coo_matrix((np.ones(len(i), dtype=np.int8), (i, j)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        # 1re offre du fichier de chaque cluster = la plus ancienne
+        first = np.full(labels.max() + 1, n, dtype=np.int64)
+        np.minimum.at(first, labels, np.arange(n))
+        out = first[labels]
+        out[out == np.arange(n)] = -1
+        return out
+
+
+def dedupe_scraper_csv(input_csv, output_csv, mode="collapse", threshold=THRESHOLD):
+    """Export du scrapper -> même TSV sans (ou avec signalement des) quasi-doublons."""
+    df = read_scraper_csv(input_csv, dtype=str)
+    texts = [clean_text(t) for t in df["description"]]
+    duplicate_of = NearDuplicates.build(texts).duplicate_of(threshold)
+    is_duplicate = duplicate_of >= 0
+    ids = df["id"].to_numpy() if "id" in df.columns else np.arange(len(df)).astype(str)
+    if mode == "flag":
+        df["duplicate_of"] = np.where(is_duplicate, ids[np.maximum(duplicate_of, 0)], "")
+    else:
+        df = df[~is_duplicate]
+    df.to_csv(output_csv, sep="\t", index=False)
+    n_clusters = len(np.unique(duplicate_of[is_duplicate]))
+    print(f"✅ {int(is_duplicate.sum())} quasi-doublons dans {n_clusters} clusters "
+          f"sur {len(is_duplicate)} offres ({mode}). Fichier généré : {output_csv}")
+    return duplicate_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate job offers (MinHash + LSH)")
+    parser.add_argument("--input", default="linkedin-scraper/master_clean1.csv")
+    parser.add_argument("--output", default="linkedin-scraper/master_dedup.csv")
+    parser.add_argument("--mode", choices=["collapse", "flag"], default="collapse")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Jaccard estimé minimal")
+    args = parser.parse_args()
+    dedupe_scraper_csv(args.input, args.output, args.mode, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import gc
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# FULL-TEXT INDEX
+# Index inversé mot -> lignes sur title + description_sans_html, classement
+# BM25. Chaque mot de la requête est un préfixe ("pyth" trouve "python") ;
+# une ligne doit contenir tous les mots de la requête (AND).
+#
+# Stockage CSR, comme les colonnes-listes de compact.py :
+#   vocab trié (mots sans accents, en minuscules)
+#   offsets[t]:offsets[t+1] -> rows / tf du mot t
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Mots trop fréquents pour servir à classer (FR / EN) : pas indexés
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was we were will with you your our
+au aux avec ce ces dans de des du en et est il la le les leur mais nous
+ou par pas pour qui que sa se ses son sur un une vous
+""".split())
+
+TITLE_WEIGHT = 3  # un mot du titre compte comme 3 mots de la description
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MIN_PREFIX_LEN = 2       # "d" seul ne s'étend pas à tout le vocabulaire
+MAX_PREFIX_TERMS = 64    # mots gardés par préfixe (les plus fréquents)
+_CHUNK_DOCS = 5000
+
+
+def fold(text: str) -> str:
+    """minuscules, sans accents : "Données" -> "donnees" """
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _term_counts(texts, vocab: dict):
+    """
+    (doc, terme, nb d'occurrences) pour chaque texte distinct.
+    Les textes sont découpés sur les espaces (rapide) ; la regex et le
+    retrait des accents ne tournent qu'une fois par morceau distinct
+    ("python," -> ["python"], "ci/cd" -> ["ci", "cd"]).
+    """
+    pieces = {}  # morceau brut -> ids des mots qu'il contient
+    docs, terms, counts = [], [], []
+    for start in range(0, len(texts), _CHUNK_DOCS):
+        chunk = texts[start:start + _CHUNK_DOCS]
+        split = [t.lower().split() for t in chunk]
+        lengths = np.fromiter(map(len, split), dtype=np.int64, count=len(split))
+        if not lengths.sum():
+            continue
+        local, uniques = pd.factorize(pd.Series([w for ws in split for w in ws], dtype=object))
+
+        sub_ids = []
+        for u in uniques:
+            ids = pieces.get(u)
+            if ids is None:
+                ids = pieces[u] = [
+                    vocab.setdefault(fold(w), len(vocab)) for w in _TOKEN_RE.findall(u)
+                ]
+            sub_ids.append(ids)
+        n_sub = np.fromiter(map(len, sub_ids), dtype=np.int64, count=len(sub_ids))
+        sub_offsets = np.zeros(len(sub_ids) + 1, dtype=np.int64)
+        np.cumsum(n_sub, out=sub_offsets[1:])
+        flat_ids = np.fromiter(
+            (i for ids in sub_ids for i in ids), dtype=np.int64, count=sub_offsets[-1]
+        )
+
+        # chaque occurrence d'un morceau -> ses mots
+        doc = np.repeat(np.arange(start, start + len(chunk), dtype=np.int64), lengths)
+        n = n_sub[local]
+        doc = np.repeat(doc, n)
+        pos = np.zeros(len(local) + 1, dtype=np.int64)
+        np.cumsum(n, out=pos[1:])
+        idx = np.repeat(sub_offsets[local] - pos[:-1], n) + np.arange(pos[-1])
+
+        n_terms = len(vocab)
+        key, c = np.unique(doc * n_terms + flat_ids[idx], return_counts=True)
+        docs.append(key // n_terms)
+        terms.append(key % n_terms)
+        counts.append(c)
+
+    if not docs:
+        return _empty_int(), _empty_int(), _empty_int()
+    return np.concatenate(docs), np.concatenate(terms), np.concatenate(counts)
+
+
+def _empty_int():
+    return np.empty(0, dtype=np.int64)
+
+
+def _expand_to_rows(codes: np.ndarray, n_docs: int, docs, terms, counts):
+    """Postings par texte distinct -> postings par ligne (textes dupliqués)."""
+    rows_by_doc = np.argsort(codes, kind="stable")
+    doc_offsets = np.zeros(n_docs + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=n_docs), out=doc_offsets[1:])
+
+    starts, ends = doc_offsets[docs], doc_offsets[docs + 1]
+    n = ends - starts
+    out_offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum(n, out=out_offsets[1:])
+    idx = np.repeat(starts - out_offsets[:-1], n) + np.arange(out_offsets[-1])
+    return rows_by_doc[idx], np.repeat(terms, n), np.repeat(counts, n)
+
+
+class FullTextIndex:
+    def __init__(self, vocab, offsets, rows, weights, n_rows):
+        self.vocab = vocab        # np.array de str, trié
+        self.offsets = offsets    # int64, len(vocab) + 1
+        self.rows = rows          # int32, triées par mot puis par ligne
+        # part BM25 de (mot, ligne) hors idf, calculée au build :
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * longueur / longueur moyenne))
+        self.weights = weights    # float32
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, fields: dict) -> "FullTextIndex":
+        """fields : {nom: (série de textes, poids)}"""
+        n_rows = len(next(iter(fields.values()))[0])
+        vocab = {}
+        parts = []
+        doc_len = np.zeros(n_rows, dtype=np.float32)
+
+        for series, weight in fields.values():
+            values = series.fillna("").astype(str)
+            codes, uniques = pd.factorize(values)
+            # des millions de petites chaînes / listes : le GC n'a rien à
+            # collecter mais se déclencherait sans arrêt
+            gc.disable()
+            try:
+                docs, terms, counts = _term_counts(list(uniques), vocab)
+            finally:
+                gc.enable()
+            # longueur avant retrait des stopwords, comme un BM25 classique
+            lengths = np.bincount(docs, weights=counts, minlength=len(uniques))
+            doc_len += (weight * lengths[codes]).astype(np.float32)
+            rows, terms, counts = _expand_to_rows(codes, len(uniques), docs, terms, counts)
+            parts.append((rows, terms, counts * weight))
+
+        words = np.array(list(vocab), dtype=object)
+        keep_term = np.array([w not in STOPWORDS for w in words], dtype=bool)
+
+        rows = np.concatenate([p[0] for p in parts])
+        terms = np.concatenate([p[1] for p in parts])
+        tf = np.concatenate([p[2] for p in parts])
+        mask = keep_term[terms] if len(terms) else np.zeros(0, dtype=bool)
+        rows, terms, tf = rows[mask], terms[mask], tf[mask]
+
+        # ids de mots réattribués dans l'ordre alphabétique (préfixe = plage)
+        alpha = np.argsort(words.astype(str)) if len(words) else _empty_int()
+        rank = np.empty(len(words), dtype=np.int64)
+        rank[alpha] = np.arange(len(words))
+        terms = rank[terms]
+
+        # un même (mot, ligne) peut venir des deux champs : on additionne
+        key = terms * max(n_rows, 1) + rows
+        order = np.argsort(key)
+        key, tf = key[order], tf[order]
+        first = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else _empty_int()
+        tf = np.add.reduceat(tf, first) if len(key) else tf
+        key = key[first]
+        terms, rows = key // max(n_rows, 1), key % max(n_rows, 1)
+
+        sorted_words = words[alpha]
+        offsets = np.zeros(len(sorted_words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(sorted_words)), out=offsets[1:])
+
+        # les stopwords n'ont plus de postings : on les sort du vocabulaire
+        df = np.diff(offsets)
+        live = np.flatnonzero(df > 0)
+        offsets = np.zeros(len(live) + 1, dtype=np.int64)
+        np.cumsum(df[live], out=offsets[1:])
+
+        avg_len = float(doc_len.mean()) if n_rows and doc_len.mean() > 0 else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[rows] / avg_len)
+        weights = tf * (BM25_K1 + 1) / (tf + norm)
+
+        return cls(
+            sorted_words[live], offsets,
+            rows.astype(np.int32), weights.astype(np.float32), n_rows,
+        )
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.offsets.nbytes + self.rows.nbytes + self.weights.nbytes
+            + self.vocab.nbytes
+            + sum(len(v) + 49 for v in self.vocab)
+        )
+
+    def expand(self, prefix: str) -> np.ndarray:
+        """Ids des mots qui commencent par `prefix` (les plus fréquents d'abord si trop)."""
+        lo = np.searchsorted(self.vocab, prefix, side="left")
+        if len(prefix) < MIN_PREFIX_LEN:
+            exact = lo < len(self.vocab) and self.vocab[lo] == prefix
+            return np.arange(lo, lo + 1) if exact else _empty_int()
+        hi = np.searchsorted(self.vocab, prefix + "\U0010ffff", side="left")
+        terms = np.arange(lo, hi)
+        if len(terms) > MAX_PREFIX_TERMS:
+            df = self.offsets[terms + 1] - self.offsets[terms]
+            terms = np.sort(terms[np.argsort(-df, kind="stable")[:MAX_PREFIX_TERMS]])
+        return terms
+
+    def _token_scores(self, terms: np.ndarray) -> np.ndarray:
+        """
+        Score BM25 de chaque ligne pour ces mots (0 si aucun n'y figure).
+        Un tableau dense de n_rows : un bincount coûte moins qu'un tri.
+        """
+        starts, ends = self.offsets[terms], self.offsets[terms + 1]
+        n = ends - starts
+        idf = np.log1p((self.n_rows - n + 0.5) / (n + 0.5))
+
+        out_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(n, out=out_offsets[1:])
+        idx = np.repeat(starts - out_offsets[:-1], n) + np.arange(out_offsets[-1])
+
+        # une ligne peut matcher plusieurs extensions du même préfixe
+        return np.bincount(
+            self.rows[idx], weights=self.weights[idx] * np.repeat(idf, n),
+            minlength=self.n_rows,
+        )
+
+    def search(self, query: str, candidates=None):
+        """
+        (lignes, scores) triés par score décroissant, à égalité dans l'ordre
+        du fichier. None si la requête ne contient aucun mot exploitable.
+        candidates : positions déjà filtrées ou None.
+        """
+        tokens = tokenize(query)
+        # les stopwords complets sont ignorés, sauf le dernier mot (en cours
+        # de frappe : "the" peut devenir "theory")
+        tokens = [t for t in tokens[:-1] if t not in STOPWORDS] + tokens[-1:]
+        if not tokens:
+            return None
+
+        if candidates is None:
+            keep = np.ones(self.n_rows, dtype=bool)
+        else:
+            keep = np.zeros(self.n_rows, dtype=bool)
+            keep[candidates] = True
+
+        total = np.zeros(self.n_rows)
+        for token in dict.fromkeys(tokens):
+            score = self._token_scores(self.expand(token))
+            keep &= score > 0  # idf > 0 : tout mot présent donne un score > 0
+            total += score
+
+        rows = np.flatnonzero(keep)
+        scores = total[rows]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
@@ -0,0 +1,299 @@
+# ====================================================
+# GEN_DATASET.PY
+# Jeux de données synthétiques au schéma réel, pour les benchmarks :
+#   <out>/<n>/master_clean.csv        export brut du scraper (TSV, comme
+#                                     scrap.append_master_csv)
+#   <out>/<n>/data/job_data_clean.csv dataset enrichi lu par app.py
+#   <out>/<n>/data/jobs_for_d3.csv    sortie de data_cluster.py (colonnes
+#                                     du dataset + topics + UMAP 2D)
+# Les trois fichiers décrivent les mêmes offres (mêmes ids, descriptions).
+# Vocabulaire repris de data.py, popularités en loi de Zipf, encodages des
+# listes mélangés comme dans les vrais fichiers ("['a', 'b']", "a, b", vide).
+#
+#   python gen_dataset.py                          # 1k, 10k, 100k, 1M
+#   python gen_dataset.py 1000 50000 --out bench_data --seed 7
+# ====================================================
+
+import argparse
+import csv
+import os
+import random
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from data import TECHNICAL_SKILLS, TOOLS_LIST, SOFT_SKILLS, BENEFITS, DOMAINS
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_OUT = "bench_data"
+
+STATS_COLUMNS = [
+    "id", "title", "company", "country", "location", "link", "source",
+    "date_posted", "description", "description_sans_html",
+    "technical_skills", "tools_used", "soft_skills",
+    "education_level", "seniority_level",
+    "benefits", "eeo_statement",
+    "hybrid_policy", "visa_sponsorship",
+    "tasks", "domains",
+    "tone_culture", "eeo_terms",
+    "experience_mentions", "salary_value", "salary_type", "salary_currency",
+    "experience_years",
+]
+RAW_COLUMNS = [
+    "id", "title", "company", "country", "location",
+    "link", "date_posted", "description", "seniority_level",
+]
+
+TITLES = [
+    "Data Analyst", "Data Engineer", "Data Scientist", "BI Developer",
+    "Analytics Engineer", "Machine Learning Engineer", "Business Analyst",
+    "Web Analyst", "Client Insights Analyst", "Data Architect",
+    "Product Analyst", "Marketing Analyst", "Brand Manager",
+]
+SENIORITY = ["intern", "junior", "mid", "senior", "lead"]
+SENIORITY_WORDS = {"intern": "Intern", "junior": "Junior", "mid": "", "senior": "Senior", "lead": "Lead"}
+COUNTRIES = {
+    "France": ["Paris", "Lyon", "Marseille", "Toulouse", "Lille", "Nantes", "Bordeaux"],
+    "USA": ["New York", "San Francisco", "Austin", "Seattle", "Chicago", "Boston"],
+    "UK": ["London", "Manchester", "Edinburgh"],
+    "Germany": ["Berlin", "Munich", "Hamburg"],
+    "Canada": ["Toronto", "Montreal", "Vancouver"],
+    "Spain": ["Madrid", "Barcelona"],
+    "Netherlands": ["Amsterdam", "Rotterdam"],
+}
+COUNTRY_WEIGHTS = [0.45, 0.2, 0.1, 0.08, 0.07, 0.05, 0.05]
+CURRENCIES = {"France": "EUR", "USA": "USD", "UK": "GBP", "Germany": "EUR",
+              "Canada": "CAD", "Spain": "EUR", "Netherlands": "EUR"}
+SALARY_BASE = {"intern": 18, "junior": 38, "mid": 52, "senior": 68, "lead": 85}  # k
+EDUCATION = ["phd", "master", "bachelor", "associate", ""]
+EDUCATION_WORDS = {"phd": "PhD", "master": "Master's degree (MSc)",
+                   "bachelor": "Bachelor's degree", "associate": "associate degree", "": ""}
+DOMAIN_WORDS = {"finance": "banking", "marketing": "marketing", "healthcare": "healthcare",
+                "ecommerce": "e-commerce"}
+EEO_TERMS = ["race", "gender", "sex", "age", "color", "religion", "disability"]
+TONES = ["fast-paced", "inclusive", "collaborative"]
+TASK_SENTENCES = [
+    "Build and maintain data pipelines for {team}",
+    "Analyze customer behaviour and report insights to {team}",
+    "Develop dashboards tracking the KPIs of {team}",
+    "Model and forecast demand with the {team} team",
+    "Design the reporting layer used by {team}",
+]
+TEAMS = ["marketing", "finance", "product", "sales", "operations", "the executive board", "CRM"]
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+# mots de remplissage : le vocabulaire de l'index texte grandit avec n
+_SYLLABLES = ["da", "ta", "ly", "sis", "ne", "ro", "mo", "del", "qua", "li", "ty", "ex",
+              "per", "tion", "ana", "ver", "sa", "ble", "in", "co", "re", "pro", "duc"]
+
+
+def _filler_vocab(size: int, rng: random.Random) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def _sample_lists(rng: np.random.Generator, vocab: list, n: int, mean: float, max_k: int) -> list:
+    """n sous-ensembles de vocab (taille ~ Poisson(mean), popularité Zipf)."""
+    k = np.minimum(rng.poisson(mean, n), min(max_k, len(vocab)))
+    p = _zipf_weights(len(vocab))
+    # tirage avec remise puis dédoublonnage : proche d'un tirage sans remise
+    draws = rng.choice(len(vocab), size=(n, max_k + 4), p=p)
+    out = []
+    for row, kk in zip(draws, k):
+        seen = list(dict.fromkeys(row.tolist()))[:kk]
+        out.append([vocab[i] for i in seen])
+    return out
+
+
+def _encode_list(items: list, r: float, sep: str = ", ") -> str:
+    """Encodages rencontrés dans job_data_clean.csv."""
+    if r < 0.6:
+        return str(items)
+    if r < 0.9:
+        return sep.join(items)
+    return "" if not items else str(items)
+
+
+def generate(n: int, seed: int = 42, filler_words: int = 120) -> tuple:
+    """(raw, stats, d3) : trois DataFrames de n offres."""
+    rng = np.random.default_rng(seed)
+    prng = random.Random(seed)
+    vocab = _filler_vocab(max(2000, int(n ** 0.6)), prng)
+
+    ids = np.arange(1, n + 1)
+    seniority = rng.choice(SENIORITY, n, p=[0.08, 0.25, 0.35, 0.24, 0.08])
+    base_title = rng.choice(TITLES, n, p=_zipf_weights(len(TITLES), 0.8))
+    countries = list(COUNTRIES)
+    country = rng.choice(countries, n, p=COUNTRY_WEIGHTS)
+    n_companies = max(20, n // 15)
+    company_idx = rng.choice(n_companies, n, p=_zipf_weights(n_companies, 0.9))
+    days_ago = rng.integers(0, 365, n)
+    today = pd.Timestamp("2026-01-01")
+    date_posted = (today - pd.to_timedelta(days_ago, unit="D")).strftime("%Y-%m-%d")
+
+    skills = _sample_lists(rng, TECHNICAL_SKILLS, n, 4.0, 10)
+    tools = _sample_lists(rng, TOOLS_LIST, n, 2.0, 6)
+    soft = _sample_lists(rng, SOFT_SKILLS, n, 2.0, 5)
+    benefits = _sample_lists(rng, BENEFITS, n, 1.5, 5)
+    domains = _sample_lists(rng, list(DOMAINS), n, 0.8, 2)
+    education = rng.choice(EDUCATION, n, p=[0.05, 0.4, 0.35, 0.05, 0.15])
+    mode = rng.choice(["remote", "hybrid", "on-site", ""], n, p=[0.2, 0.4, 0.2, 0.2])
+    visa = rng.random(n) < 0.12
+    eeo = rng.random(n) < 0.3
+    has_salary = rng.random(n) < 0.35
+    years = np.where(rng.random(n) < 0.6, rng.integers(1, 11, n), 0)
+    r_enc = rng.random((n, 8))
+    filler = rng.integers(0, len(vocab), (n, filler_words))
+    n_filler = rng.integers(filler_words // 3, filler_words, n)
+
+    raw_rows, stats_rows = [], []
+    for i in range(n):
+        sen = str(seniority[i])
+        title = f"{SENIORITY_WORDS[sen]} {base_title[i]}".strip()
+        c = str(country[i])
+        location = COUNTRIES[c][i % len(COUNTRIES[c])]
+        company = f"Company {company_idx[i]:05d}"
+        team = TEAMS[i % len(TEAMS)]
+        tasks = [s.format(team=team) for s in prng.sample(TASK_SENTENCES, prng.randint(1, 3))]
+        tones = [t for t in TONES if prng.random() < 0.25]
+        eeo_terms = prng.sample(EEO_TERMS, prng.randint(2, 5)) if eeo[i] else []
+
+        salary_min = salary_max = None
+        if has_salary[i]:
+            base = SALARY_BASE[sen] * prng.uniform(0.8, 1.25)
+            salary_min, salary_max = int(base), int(base * prng.uniform(1.05, 1.3))
+
+        parts = [
+            f"<p><strong>{company}</strong> is hiring a {title} in {location}.</p>",
+            "<ul>" + "".join(f"<li>{t}.</li>" for t in tasks) + "</ul>",
+        ]
+        if skills[i] or tools[i]:
+            parts.append(f"<p>Tech stack: {', '.join(skills[i] + tools[i])}.</p>")
+        if soft[i]:
+            parts.append(f"<p>We value {', '.join(soft[i])}.</p>")
+        if education[i]:
+            parts.append(f"<p>{EDUCATION_WORDS[str(education[i])]} or equivalent.</p>")
+        if years[i]:
+            parts.append(f"<p>{years[i]}+ years of experience.</p>")
+        if domains[i]:
+            parts.append(f"<p>Industry: {', '.join(DOMAIN_WORDS[d] for d in domains[i])}.</p>")
+        if mode[i]:
+            parts.append(f"<p>Work mode: {mode[i]}.</p>")
+        if salary_min:
+            parts.append(f"<p>Salary: {salary_min}k - {salary_max}k {CURRENCIES[c]}.</p>")
+        if benefits[i]:
+            parts.append(f"<p>Perks: {', '.join(benefits[i])}.</p>")
+        if tones:
+            parts.append(f"<p>A {' and '.join(tones)} team.</p>")
+        if visa[i]:
+            parts.append("<p>Visa sponsorship available.</p>")
+        parts.append("<p>" + " ".join(vocab[j] for j in filler[i, :n_filler[i]]) + ".</p>")
+        if eeo[i]:
+            parts.append(
+                "<p>We are an equal opportunity employer and do not discriminate based on "
+                + ", ".join(eeo_terms) + ".</p>"
+            )
+        # les vraies descriptions gardent des retours à la ligne
+        description = "\n".join(parts)
+        plain = " ".join(_TAG_RE.sub(" ", description).split()).lower()
+
+        link = f"https://www.linkedin.com/jobs/view/{4_000_000_000 + ids[i]}"
+        raw_rows.append((int(ids[i]), title, company, c, location, link, date_posted[i],
+                         description, ""))
+
+        r = r_enc[i]
+        salary_value = (salary_min + salary_max) * 500 if salary_min else ""
+        stats_rows.append((
+            int(ids[i]), title, company, c, location, link, "linkedin", date_posted[i],
+            description, plain,
+            _encode_list(skills[i], r[0]), _encode_list(tools[i], r[1]),
+            _encode_list(soft[i], r[2]),
+            str(education[i]), sen,
+            _encode_list(benefits[i], r[3]),
+            "yes" if eeo[i] else "",
+            _encode_bool(mode[i] in ("remote", "hybrid"), r[4]),
+            _encode_bool(bool(visa[i]), r[5]),
+            " | ".join(tasks), _encode_list(domains[i], r[6]),
+            _encode_list([t.replace("-", "_") for t in tones], r[7]),
+            ", ".join(eeo_terms),
+            str(years[i]) if years[i] else "",
+            salary_value, "annual" if salary_min else "", CURRENCIES[c] if salary_min else "",
+            float(years[i]) if years[i] else "",
+        ))
+
+    raw = pd.DataFrame(raw_rows, columns=RAW_COLUMNS)
+    stats = pd.DataFrame(stats_rows, columns=STATS_COLUMNS)
+    d3 = _d3_frame(stats, rng)
+    return raw, stats, d3
+
+
+def _encode_bool(value: bool, r: float) -> str:
+    if r < 0.1:
+        return ""
+    if r < 0.4:
+        return "yes" if value else "no"
+    return str(value)
+
+
+def _d3_frame(stats: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """Colonnes du dataset + topics BERTopic + coordonnées UMAP (nuages par topic)."""
+    n = len(stats)
+    n_topics = int(min(max(8, n ** 0.4), 60))
+    topic = rng.choice(np.arange(-1, n_topics), n, p=_zipf_weights(n_topics + 1, 0.7))
+    centers = rng.uniform(-10, 10, (n_topics + 1, 2))
+    spread = np.where(topic == -1, 4.0, 0.8)[:, None]
+    xy = centers[topic + 1] + rng.normal(size=(n, 2)) * spread
+
+    keywords = {t: ", ".join(rng.choice(TECHNICAL_SKILLS, 5, replace=False)) for t in range(n_topics)}
+    keywords[-1] = ""
+    counts = pd.Series(topic).value_counts()
+
+    d3 = stats.copy()
+    d3["topic_filtered"] = topic
+    d3["topic_size"] = counts.reindex(topic).to_numpy()
+    d3["topic_keywords"] = [keywords[t] for t in topic]
+    d3["topic_name"] = [
+        "-1_outliers" if t == -1 else f"{t}_" + "_".join(keywords[t].split(", ")[:3])
+        for t in topic
+    ]
+    d3["x_umap"] = xy[:, 0]
+    d3["y_umap"] = xy[:, 1]
+    return d3
+
+
+def write(n: int, out: str, seed: int = 42) -> str:
+    root = os.path.join(out, str(n))
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    t0 = time.perf_counter()
+    raw, stats, d3 = generate(n, seed)
+    # mêmes écritures que scrap.py (csv TSV) et que le pipeline (to_csv)
+    raw.to_csv(os.path.join(root, "master_clean.csv"), sep="\t", index=False,
+               quoting=csv.QUOTE_MINIMAL)
+    stats.to_csv(os.path.join(root, "data", "job_data_clean.csv"), index=False, escapechar="\\")
+    d3.to_csv(os.path.join(root, "data", "jobs_for_d3.csv"), index=False)
+    print(f"{n:>9} rows -> {root} ({time.perf_counter() - t0:.1f}s)")
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic datasets for benchmarks")
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    for n in args.sizes:
+        write(n, args.out, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import multiprocessing
+import os
+import signal
+
+# PRODUCTION : gunicorn -c gunicorn.conf.py app:app
+# Les données sont chargées une seule fois dans le master (preload_app) et
+# partagées en copy-on-write par les workers : N workers coûtent à peine
+# plus de mémoire qu'un seul, et le démarrage ne dépend pas de N.
+# Le chargement tourne en arrière-plan (voir STARTUP dans app.py) : les
+# premiers workers répondent tout de suite (/healthz, 503 "warming_up"),
+# puis sont remplacés par des forks qui ont les données.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+preload_app = True
+# la 1re sérialisation d'un payload ou un gros export peut prendre du temps
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+# PRELOAD_PAYLOADS=0 : payloads JSON sérialisés à la demande, par worker
+warm_payloads = os.environ.get("PRELOAD_PAYLOADS", "1") != "0"
+
+
+def when_ready(server):
+    import app
+
+    def loaded():
+        os.kill(os.getpid(), signal.SIGHUP)  # -> on_reload, nouveaux workers
+
+    app.call_when_ready(loaded)
+
+
+def on_reload(server):
+    # SIGHUP (watcher, /api/admin/reload ou kill -HUP) : le master recharge
+    # pendant que les anciens workers servent encore, puis gunicorn les
+    # remplace par des forks qui héritent du nouveau snapshot. Après le
+    # chargement initial, les données sont fraîches : pas de 2e lecture.
+    import app
+    if app.needs_reload():
+        app.reload_data()
+    app.prepare_for_fork(warm_payloads)
@@ -2,8 +2,9 @@ import os
 import pandas as pd
 import psycopg2
 from psycopg2.extras import Json
-import ast
-import re
+
+from normalize import to_bool, to_float, to_list
+from pgstore import create_indexes
 
 # INTERACTIVE CONFIGURATION
 print("--- CONFIGURATION ---")
@@ -19,53 +20,36 @@ STATS_PATH = "data/job_data_clean.csv"
 D3_PATH = "data/jobs_for_d3.csv"
 
 # DATA CLEANING HELPERS
-_SPLIT_RE = re.compile(r"[;,\|]")
-
-
-def to_bool(value):
-    """Convert various truthy/falsy representations to boolean."""
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return False
-    if isinstance(value, bool):
-        return value
-    return str(value).strip().lower() in {"true", "1", "yes", "y", "oui"}
-
-
-def to_float(value):
-    """Safely convert to float or return None."""
-    try:
-        if value is None or (isinstance(value, float) and pd.isna(value)) or value == "":
-            return None
-        return float(value)
-    except Exception:
-        return None
-
-
-def to_list(value):
-    """Normalize string / list / tuple representations into a clean list."""
-    if value is None or (isinstance(value, float) and pd.isna(value)) or value == "":
-        return []
-
-    if isinstance(value, list):
-        return [str(x).strip() for x in value if str(x).strip()]
-
-    s = str(value).strip()
-    if not s or s in {"[]", "()"}:
-        return []
-
-    # Try literal list/tuple parsing
-    if (s.startswith("[") and s.endswith("]")) or (s.startswith("(") and s.endswith(")")):
-        try:
-            parsed = ast.literal_eval(s)
-            if isinstance(parsed, (list, tuple)):
-                return [str(x).strip() for x in parsed if str(x).strip()]
-        except Exception:
-            pass
-
-    # Fallback: split on common separators
-    parts = [p.strip().strip("'").strip('"') for p in _SPLIT_RE.split(s)]
-    return [p for p in parts if p]
-
+# to_bool / to_float / to_list : ceux du backend mémoire (normalize.py), pour
+# que les deux backends voient les mêmes valeurs
+
+
+def read_stats_csv(path):
+    """Même lecture que app._read_stats_csv (guillemets échappés par "\\")."""
+    return pd.read_csv(
+        path,
+        sep=",",
+        quotechar='"',
+        escapechar="\\",
+        engine="python",
+        encoding="utf-8",
+        on_bad_lines="skip",
+    )
+
+
+def with_ids(df, name):
+    """
+    Ids du CSV (ceux de app.ensure_id : 1..N si la colonne manque). Une
+    ligne sans id ou avec un id déjà vu n'est pas insérée : en mémoire,
+    /api/job renvoie aussi la 1re ligne de chaque id.
+    """
+    if "id" not in df.columns:
+        df = df.assign(id=range(1, len(df) + 1))
+    ids = pd.to_numeric(df["id"], errors="coerce")
+    keep = ids.notna() & ~ids.duplicated()
+    if not keep.all():
+        print(f"WARNING: {int((~keep).sum())} rows of {name} skipped (missing or duplicate id).")
+    return df[keep].assign(id=ids[keep].astype("int64"))
 
 
 # MAIN SCRIPT
@@ -85,7 +69,7 @@ def upload_data():
 
     # 1. JOBS TABLE
     print(f"Loading and cleaning {STATS_PATH}...")
-    df = pd.read_csv(STATS_PATH, on_bad_lines="skip")
+    df = with_ids(read_stats_csv(STATS_PATH), "jobs")
 
     expected_cols = [
         "title", "company", "country", "location", "link", "source",
@@ -111,7 +95,7 @@ def upload_data():
     cur.execute("DROP TABLE IF EXISTS jobs CASCADE;")
     cur.execute("""
         CREATE TABLE jobs (
-            id SERIAL PRIMARY KEY,
+            id BIGINT PRIMARY KEY,
             title TEXT, company TEXT, country TEXT, location TEXT, link TEXT, source TEXT,
             date_posted TEXT, description TEXT, description_sans_html TEXT,
             technical_skills JSONB, tools_used JSONB, soft_skills JSONB,
@@ -120,7 +104,7 @@ def upload_data():
             hybrid_policy BOOLEAN, visa_sponsorship BOOLEAN,
             tasks JSONB, domains JSONB,
             tone_culture JSONB, eeo_terms JSONB,
-            experience_mentions TEXT,
+            experience_mentions FLOAT,
             salary_value FLOAT, salary_type TEXT, salary_currency TEXT,
             experience_years FLOAT
         );
@@ -130,7 +114,7 @@ def upload_data():
     for _, row in df.iterrows():
         cur.execute("""
             INSERT INTO jobs (
-                title, company, country, location, link, source,
+                id, title, company, country, location, link, source,
                 date_posted, description, description_sans_html,
                 technical_skills, tools_used, soft_skills,
                 education_level, seniority_level,
@@ -141,9 +125,9 @@ def upload_data():
                 experience_mentions,
                 salary_value, salary_type, salary_currency,
                 experience_years
-            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """, (
-            row["title"], row["company"], row["country"], row["location"],
+            int(row["id"]), row["title"], row["company"], row["country"], row["location"],
             row["link"], row["source"],
             row["date_posted"], row["description"], row["description_sans_html"],
             Json(to_list(row["technical_skills"])),
@@ -158,7 +142,7 @@ def upload_data():
             Json(to_list(row["domains"])),
             Json(to_list(row["tone_culture"])),
             Json(to_list(row["eeo_terms"])),
-            row["experience_mentions"],
+            to_float(row["experience_mentions"]),
             to_float(row["salary_value"]),
             row["salary_type"],
             row["salary_currency"],
@@ -167,12 +151,14 @@ def upload_data():
 
     # 2. D3 DATA TABLE
     print(f"Loading and cleaning {D3_PATH}...")
-    df_d3 = pd.read_csv(D3_PATH, on_bad_lines="skip").fillna("")
+    # même lecture que app._parse_d3_csv
+    df_d3 = pd.read_csv(D3_PATH, sep=",", encoding="utf-8", engine="python", on_bad_lines="skip")
+    df_d3 = with_ids(df_d3, "d3_data").fillna("")
 
     cur.execute("DROP TABLE IF EXISTS d3_data CASCADE;")
     cur.execute("""
         CREATE TABLE d3_data (
-            id SERIAL PRIMARY KEY,
+            id BIGINT PRIMARY KEY,
             title TEXT,
             x_umap FLOAT, y_umap FLOAT,
             salary_value FLOAT,
@@ -187,11 +173,11 @@ def upload_data():
 
         cur.execute("""
             INSERT INTO d3_data (
-                title, x_umap, y_umap, salary_value,
+                id, title, x_umap, y_umap, salary_value,
                 skills_tech, topic_keywords, domains
-            ) VALUES (%s,%s,%s,%s,%s,%s,%s)
+            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
         """, (
-            row.get("title", ""),
+            int(row["id"]), row.get("title", ""),
             to_float(row.get("x_umap")),
             to_float(row.get("y_umap")),
             to_float(row.get("salary_value")),
@@ -200,6 +186,10 @@ def upload_data():
             Json(to_list(row.get("domains"))),
         ))
 
+    # Recherche et filtres du backend postgres de app.py (voir pgstore.py)
+    print("Creating indexes...")
+    create_indexes(cur)
+
     conn.commit()
     cur.close()
     conn.close()
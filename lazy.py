@@ -0,0 +1,52 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+# LAZY IMPORTS
+# lazy_import("numpy") place dans sys.modules un module vide : les
+# `import numpy as np` qui suivent (app.py, compact.py, ...) ne coûtent
+# rien, et le vrai module n'est importé qu'au premier accès à un attribut
+# (np.zeros, ...). importlib.util.LazyLoader ne suffit pas : le moindre
+# `import numpy` ailleurs relit __spec__ et déclenche l'import complet.
+
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, attr):
+        # appelé seulement pour un attribut absent : avant le chargement,
+        # ou un attribut que le vrai module crée à la demande
+        real = _load(self)
+        return getattr(real, attr)
+
+
+def _load(proxy: _LazyModule) -> types.ModuleType:
+    with _lock:
+        real = proxy.__dict__.get("_lazy_real")
+        if real is None:
+            name = proxy.__name__
+            if sys.modules.get(name) is proxy:
+                del sys.modules[name]
+            real = importlib.import_module(name)
+            # le proxy devient une copie du vrai module : plus de détour
+            # par __getattr__ pour les accès suivants
+            proxy.__dict__.update(real.__dict__)
+            proxy.__dict__["_lazy_real"] = real
+        return real
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Module importé au premier accès à un attribut (déjà importé : tel quel)."""
+    with _lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ImportError(f"No module named {name!r}")
+        proxy = _LazyModule(name)
+        proxy.__spec__ = spec
+        proxy.__file__ = spec.origin
+        sys.modules[name] = proxy
+        return proxy
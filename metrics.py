@@ -0,0 +1,274 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ContextDecorator
+
+# METRICS
+# Registre minimal au format texte Prometheus (sans dépendance) :
+# compteurs, jauges et histogrammes à labels, plus un middleware WSGI qui
+# mesure chaque requête.
+#
+# Le temps d'une requête est découpé en phases : le code appelle
+# `with phase("query"):` (ou @phase("query")) autour de ce qu'il veut
+# distinguer ; "handler" = le reste du temps passé dans l'app, "send" = le
+# temps passé à produire / envoyer le corps de la réponse (streaming compris).
+#
+# Chaque processus a ses propres valeurs : en multi-workers (gunicorn),
+# chaque worker expose les siennes.
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))  # 256 o -> 64 Mo
+
+ROUTE_KEY = "metrics.route"  # clé d'environ WSGI : règle Flask de la requête
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra="") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_one(key, value))
+        return lines
+
+    def _render_one(self, key, value) -> list:
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # compteurs par bucket (non cumulés), somme, nombre
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_one(self, key, state) -> list:
+        counts, total, n = state
+        lines, cum = [], 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            cum += c
+            le = f'le="{_number(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cum}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(float(total))}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Durée totale des requêtes (corps envoyé compris).",
+    ("route", "method", "status"),
+))
+RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "http_response_size_bytes", "Taille des corps de réponse envoyés.",
+    ("route",), buckets=SIZE_BUCKETS,
+))
+PHASE_SECONDS = REGISTRY.register(Histogram(
+    "http_request_phase_seconds", "Temps par phase (query, records, serialize, compress, handler, send).",
+    ("route", "phase"),
+))
+LOAD_SECONDS = REGISTRY.register(Gauge(
+    "dataset_load_seconds", "Durée de chaque étape du dernier chargement des données.", ("step",),
+))
+LOADS_TOTAL = REGISTRY.register(Counter(
+    "dataset_loads_total", "Chargements des données (démarrage + rechargements).",
+))
+DATASET_ROWS = REGISTRY.register(Gauge(
+    "dataset_rows", "Lignes du snapshot servi.", ("dataset",),
+))
+
+
+# PHASES
+_phases = contextvars.ContextVar("metrics_phases", default=None)
+
+
+class phase(ContextDecorator):
+    """Ajoute le temps du bloc à la phase `name` de la requête en cours."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _recreate_cm(self):
+        # utilisé en décorateur : une instance par appel (threads, réentrance)
+        return type(self)(self.name)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        phases = _phases.get()
+        if phases is not None:
+            phases[self.name] = phases.get(self.name, 0.0) + elapsed
+        return False
+
+
+class load_step(ContextDecorator):
+    """Chronomètre une étape de chargement -> dataset_load_seconds{step}."""
+
+    def __init__(self, step: str):
+        self.step = step
+
+    def _recreate_cm(self):
+        return type(self)(self.step)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            LOAD_SECONDS.set(time.perf_counter() - self._start, step=self.step)
+        return False
+
+
+# MIDDLEWARE
+class MetricsMiddleware:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        phases = {}
+        token = _phases.set(phases)
+        status = ["500"]
+
+        def _start_response(s, headers, exc_info=None):
+            status[0] = s.split(" ", 1)[0]
+            return start_response(s, headers, exc_info)
+
+        try:
+            body = self.wsgi_app(environ, _start_response)
+        except Exception:
+            _record(environ, status[0], start, phases, dict(phases), time.perf_counter(), 0)
+            raise
+        finally:
+            _phases.reset(token)
+        return _MeasuredBody(environ, status, start, phases, time.perf_counter(), body)
+
+
+def _record(environ, status, start, phases, handler_phases, handler_end, size):
+    """handler_phases : phases déjà mesurées quand l'app a rendu la réponse."""
+    end = time.perf_counter()
+    route = environ.get(ROUTE_KEY) or "unmatched"
+    REQUEST_SECONDS.observe(end - start, route=route, method=environ.get("REQUEST_METHOD", ""),
+                            status=status)
+    RESPONSE_BYTES.observe(size, route=route)
+    for name, seconds in phases.items():
+        PHASE_SECONDS.observe(seconds, route=route, phase=name)
+    # ce qui n'est dans aucune phase nommée, avant / après le retour de l'app
+    streamed = sum(phases.values()) - sum(handler_phases.values())
+    handler = handler_end - start - sum(handler_phases.values())
+    PHASE_SECONDS.observe(max(handler, 0.0), route=route, phase="handler")
+    PHASE_SECONDS.observe(max(end - handler_end - streamed, 0.0), route=route, phase="send")
+
+
+class _MeasuredBody:
+    """Itère le corps de la réponse en comptant octets et temps d'envoi."""
+
+    def __init__(self, environ, status, start, phases, handler_end, body):
+        self.environ = environ
+        self.status = status
+        self.start = start
+        self.phases = phases
+        self.handler_phases = dict(phases)
+        self.handler_end = handler_end
+        self.body = body
+        self.size = 0
+
+    def __iter__(self):
+        # les phases mesurées pendant le streaming (records, serialize) comptent
+        token = _phases.set(self.phases)
+        try:
+            for chunk in self.body:
+                self.size += len(chunk)
+                yield chunk
+        finally:
+            _phases.reset(token)
+
+    def close(self):
+        try:
+            if hasattr(self.body, "close"):
+                self.body.close()
+        finally:
+            _record(self.environ, self.status[0], self.start, self.phases,
+                    self.handler_phases, self.handler_end, self.size)
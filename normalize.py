@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import ast
+import gc
+import re
+
+import numpy as np
+import pandas as pd
+
+# PARSERS (cellule par cellule)
+_SPLIT_RE = re.compile(r"[;,\|]")
+
+TRUE_VALUES = {"true", "1", "yes", "y", "oui"}
+
+
+def to_bool(v):
+    if v is None or (isinstance(v, float) and pd.isna(v)):
+        return False
+    if isinstance(v, bool):
+        return v
+    s = str(v).strip().lower()
+    return s in TRUE_VALUES
+
+
+def to_float(v):
+    try:
+        if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+def to_list(v):
+    """
+    Transforme en liste Python :
+    - déjà liste => ok
+    - "['a','b']" / "[]" => ast.literal_eval
+    - "a;b;c" => split
+    - NaN/None/"" => []
+    """
+    if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
+        return []
+    if isinstance(v, list):
+        return [str(x).strip() for x in v if str(x).strip()]
+
+    s = str(v).strip()
+    if not s or s == "[]":
+        return []
+    if (s.startswith("[") and s.endswith("]")) or (s.startswith("(") and s.endswith(")")):
+        try:
+            parsed = ast.literal_eval(s)
+            if isinstance(parsed, (list, tuple)):
+                return [str(x).strip() for x in parsed if str(x).strip()]
+        except Exception:
+            pass
+
+    # Split classique
+    parts = [p.strip().strip("'").strip('"') for p in _SPLIT_RE.split(s)]
+    return [p for p in parts if p]
+
+
+# PARSERS (colonne entière)
+# Même sortie que to_bool / to_float / to_list appliqués via .apply,
+# mais en une passe vectorisée par colonne.
+
+# Liste Python "simple" : uniquement des chaînes quotées sans échappement,
+# séparées par des virgules. ast.literal_eval donnerait exactement les
+# mêmes éléments ; tout le reste (nombres, tuples, échappements...) repasse
+# par to_list.
+_WS = r"[ \t\f\r\n]*"
+_QUOTED = r"""(?:'[^'\\\r\n]*'|"[^"\\\r\n]*")"""
+_SIMPLE_LIST_RE = re.compile(
+    rf"\[{_WS}{_QUOTED}(?:{_WS},{_WS}{_QUOTED})*{_WS},?{_WS}\]"
+)
+_QUOTED_ITEM_RE = re.compile(r"""'([^']*)'|"([^"]*)\"""")
+
+
+def _parse_list_cell(v) -> list:
+    if not isinstance(v, str):
+        return to_list(v)
+    s = v.strip()
+    if not s:
+        return []
+    first = s[0]
+    if first == "[":
+        if _SIMPLE_LIST_RE.fullmatch(s):
+            items = (a or b for a, b in _QUOTED_ITEM_RE.findall(s))
+            return [x for x in (i.strip() for i in items) if x]
+        return to_list(v)
+    if first == "(":
+        return to_list(v)
+    # "a;b|c" : même split que to_list, sans repasser par ses tests
+    parts = [p.strip().strip("'").strip('"') for p in _SPLIT_RE.split(s)]
+    return [p for p in parts if p]
+
+
+def _is_homogeneous(s: pd.Series) -> bool:
+    """
+    factorize confond True, 1 et 1.0 (même hash) alors que to_bool / to_list
+    les traitent différemment : on ne dédoublonne que des colonnes d'un seul
+    type (ce que renvoie read_csv).
+    """
+    return pd.api.types.infer_dtype(s, skipna=True) in {
+        "string", "empty", "floating", "integer", "boolean",
+    }
+
+
+def to_bool_series(s: pd.Series) -> pd.Series:
+    if s.dtype == bool:
+        return s.copy()
+    if not _is_homogeneous(s):
+        return s.apply(to_bool).astype(bool)
+    # Quelques valeurs distinctes ("True", "yes", NaN...) : to_bool sur
+    # chacune, puis un take numpy
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    table = np.array([to_bool(u) for u in uniques] + [False], dtype=bool)
+    return pd.Series(table[codes], index=s.index, name=s.name)
+
+
+def to_float_series(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_float_dtype(s.dtype):
+        return s.astype(float)
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    # to_float (float()) sur chaque valeur distincte : pd.to_numeric accepte
+    # d'autres formats ("5e 81", mais pas "1_000") et n'arrondit pas
+    # toujours comme float() ("26e91")
+    table = np.array([to_float(u) for u in uniques] + [None], dtype=float)
+    return pd.Series(table[codes], index=s.index, name=s.name)
+
+
+def to_list_series(s: pd.Series) -> pd.Series:
+    """
+    Chaque valeur distincte n'est parsée qu'une fois, puis chaque ligne
+    reçoit sa propre copie de la liste.
+    """
+    if not _is_homogeneous(s):
+        # cellules déjà en listes, ou types mélangés
+        return s.apply(to_list)
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+
+    # Des centaines de milliers de petites listes : le GC se déclencherait
+    # sans cesse pour rien, on le suspend le temps de la construction
+    gc.disable()
+    try:
+        parsed = [_parse_list_cell(u) for u in uniques]
+        parsed.append([])  # code -1 (NaN/None)
+        lists = list(map(list, map(parsed.__getitem__, codes.tolist())))
+    finally:
+        gc.enable()
+    return pd.Series(lists, index=s.index, dtype=object, name=s.name)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+# POSTGRES STORE
+# Backend DATA_BACKEND=postgres (voir app.py) : les jobs restent dans les
+# tables remplies par import_csv.py et sont lus via un pool de connexions
+# en lecture seule. Les filtres de l'explorer deviennent du SQL :
+#   skills (AND)   -> technical_skills @> '["python", "sql"]'   (GIN)
+#   domains (OR)   -> domains ?| array['...', '...']            (GIN)
+#   texte          -> search_vector @@ 'python:* & pipe:*'      (GIN, titre pondéré)
+# La mémoire du serveur ne dépend plus de la taille du dataset.
+# psycopg2 n'est importé qu'en mode postgres.
+
+JOB_COLUMNS = [
+    "id", "title", "company", "country", "location", "link", "source",
+    "date_posted", "description", "description_sans_html",
+    "technical_skills", "tools_used", "soft_skills",
+    "education_level", "seniority_level",
+    "benefits", "eeo_statement",
+    "hybrid_policy", "visa_sponsorship",
+    "tasks", "domains",
+    "tone_culture", "eeo_terms",
+    "experience_mentions", "salary_value", "salary_type", "salary_currency",
+    "experience_years",
+]
+D3_COLUMNS = ["id", "title", "x_umap", "y_umap", "salary_value", "skills_tech", "topic_keywords", "domains"]
+TABLE_COLUMNS = {"jobs": JOB_COLUMNS, "d3_data": D3_COLUMNS}
+# l'API a toujours renvoyé "" pour un nombre manquant (voir CompactFrame.records)
+FLOAT_COLUMNS = {"experience_mentions", "salary_value", "experience_years", "x_umap", "y_umap"}
+
+# mêmes champs que la recherche en mémoire : titre (poids A) + description
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "to_tsvector('simple', coalesce(description_sans_html, ''))"
+)
+SCHEMA = [
+    f"ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS jobs_search_vector_gin ON jobs USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS jobs_technical_skills_gin ON jobs USING gin (technical_skills)",
+    "CREATE INDEX IF NOT EXISTS jobs_domains_gin ON jobs USING gin (domains)",
+    # filtres sur la valeur sans espaces autour, comme l'index en mémoire
+    "CREATE INDEX IF NOT EXISTS jobs_country_btrim_idx ON jobs (btrim(country))",
+    "CREATE INDEX IF NOT EXISTS jobs_seniority_level_btrim_idx ON jobs (btrim(seniority_level))",
+    "CREATE INDEX IF NOT EXISTS jobs_salary_value_idx ON jobs (salary_value)",
+    "ANALYZE jobs",
+]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class PoolBusy(RuntimeError):
+    """Aucune connexion libérée à temps (app.py répond 503)."""
+
+
+def create_indexes(cur):
+    """Colonne search_vector + index (idempotent) ; appelé par import_csv.py."""
+    for ddl in SCHEMA:
+        cur.execute(ddl)
+
+
+def _text_query(text: str) -> str:
+    """"python pipe" -> "python:* & pipe:*" (chaque mot est un préfixe)."""
+    return " & ".join(f"{t}:*" for t in _TOKEN_RE.findall(text.lower()))
+
+
+class PostgresStore:
+    """
+    Pool de connexions partagé par les threads du processus. Après un fork,
+    le fils ouvre son propre pool : appeler close() avant de forker (le
+    master gunicorn, voir app.prepare_for_fork).
+    """
+
+    def __init__(self, dsn: str, max_connections: int = 4, statement_timeout_ms: int = 10000,
+                 acquire_timeout_s: float = 5.0):
+        self.dsn = dsn
+        self.max_connections = max_connections
+        self.statement_timeout_ms = statement_timeout_ms
+        self.acquire_timeout_s = acquire_timeout_s
+        self._pool = None
+        self._pid = None
+        self._inherited = []  # pools hérités d'un fork : jamais fermés ici
+        self._lock = threading.Lock()
+        # getconn() échoue si le pool est vide : on attend un slot à la place,
+        # au plus acquire_timeout_s (PoolBusy ensuite)
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    @classmethod
+    def build(cls, dsn: str, max_connections: int = 4, statement_timeout_ms: int = 10000,
+              acquire_timeout_s: float = 5.0) -> "PostgresStore":
+        """Store prêt à servir ; échoue si la base ou les tables sont absentes."""
+        store = cls(dsn, max_connections, statement_timeout_ms, acquire_timeout_s)
+        with store.cursor() as cur:
+            cur.execute("SELECT 1 FROM d3_data LIMIT 1")
+            cur.execute(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'jobs' AND column_name = 'search_vector'"
+            )
+            if cur.fetchone() is None:
+                raise RuntimeError("jobs.search_vector is missing: re-run import_csv.py")
+        return store
+
+    def _get_pool(self):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        with self._lock:
+            if self._pool is not None and self._pid != os.getpid():
+                # fermer ces connexions couperait aussi celles du parent
+                self._inherited.append(self._pool)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ThreadedConnectionPool(
+                    1, self.max_connections, self.dsn,
+                    options=f"-c statement_timeout={self.statement_timeout_ms} "
+                            f"-c default_transaction_read_only=on",
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+    @contextmanager
+    def cursor(self, name: str | None = None):
+        """Curseur sur une connexion du pool ; name= : curseur côté serveur."""
+        import psycopg2
+
+        if not self._slots.acquire(timeout=self.acquire_timeout_s):
+            raise PoolBusy(f"no database connection available after {self.acquire_timeout_s}s")
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+            broken = False
+            try:
+                with conn.cursor(name=name) as cur:
+                    yield cur
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True  # connexion perdue : ne pas la remettre au pool
+                raise
+            finally:
+                if not broken and not conn.closed:
+                    try:
+                        conn.rollback()  # lecture seule : fin de la transaction
+                    except psycopg2.Error:
+                        broken = True
+                pool.putconn(conn, close=broken or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def fetchall(self, sql: str, params=()) -> list:
+        with self.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def count(self, table: str) -> int:
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"unknown table: {table}")
+        return self.fetchall(f"SELECT count(*) FROM {table}")[0][0]
+
+    # ------------------------------------------------------------ records
+    @staticmethod
+    def _records(columns, rows) -> list:
+        floats = [i for i, c in enumerate(columns) if c in FLOAT_COLUMNS]
+        out = []
+        for row in rows:
+            if floats:
+                row = list(row)
+                for i in floats:
+                    if row[i] is None:
+                        row[i] = ""
+            out.append(dict(zip(columns, row)))
+        return out
+
+    def jobs_by_ids(self, ids) -> tuple:
+        """(records dans l'ordre de ids, ids absents)."""
+        ids = [int(i) for i in ids]
+        # hors BIGINT : jamais dans la table (et ANY(numeric[]) n'utiliserait plus l'index)
+        queried = [i for i in ids if -2 ** 63 <= i < 2 ** 63]
+        rows = self.fetchall(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ANY(%s::bigint[])", (queried,)
+        ) if queried else []
+        by_id = {r["id"]: r for r in self._records(JOB_COLUMNS, rows)}
+        return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+    def iter_batches(self, table: str, batch_rows: int, columns=None):
+        """
+        Toute la table, par lots de records. Une requête par lot (reprise
+        après le dernier id) : la connexion est rendue au pool entre deux
+        lots, un client lent ne la garde pas pendant tout le téléchargement.
+        """
+        columns = [c for c in TABLE_COLUMNS[table] if columns is None or c in columns]
+        selected = columns if "id" in columns else columns + ["id"]
+        last = None
+        while True:
+            with self.cursor() as cur:
+                if last is None:
+                    cur.execute(f"SELECT {', '.join(selected)} FROM {table} ORDER BY id LIMIT %s", (batch_rows,))
+                else:
+                    cur.execute(f"SELECT {', '.join(selected)} FROM {table} WHERE id > %s ORDER BY id LIMIT %s",
+                                (last, batch_rows))
+                rows = cur.fetchall()
+            if not rows:
+                return
+            last = rows[-1][selected.index("id")]
+            yield self._records(columns, [r[:len(columns)] for r in rows])
+            if len(rows) < batch_rows:
+                return
+
+    # ------------------------------------------------------------ search
+    def search(self, text="", min_salary=0.0, hybrid=False, visa=False, countries=(),
+               seniorities=(), skills=(), domains=(), offset=0, limit=10, ids_only=False) -> tuple:
+        """
+        (total, page) avec les filtres de app.search_jobs : ordre des ids,
+        ou pertinence (ts_rank) si `text` est donné. page = ids si ids_only,
+        sinon records.
+        """
+        where, params = [], []
+        if skills:
+            where.append("technical_skills @> %s::jsonb")
+            params.append(json.dumps(list(skills)))
+        if countries:
+            where.append("btrim(country) = ANY(%s)")
+            params.append(list(countries))
+        if seniorities:
+            where.append("btrim(seniority_level) = ANY(%s)")
+            params.append(list(seniorities))
+        if domains:
+            where.append("domains ?| %s")
+            params.append(list(domains))
+        if hybrid:
+            where.append("hybrid_policy")
+        if visa:
+            where.append("visa_sponsorship")
+        if min_salary and min_salary > 0:
+            where.append("salary_value >= %s")
+            params.append(min_salary)
+
+        order, order_params = "id", []
+        query = _text_query(text)
+        if query:
+            where.append("search_vector @@ to_tsquery('simple', %s)")
+            params.append(query)
+            order = "ts_rank(search_vector, to_tsquery('simple', %s)) DESC, id"
+            order_params = [query]
+
+        columns = ["id"] if ids_only else JOB_COLUMNS
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        with self.cursor() as cur:
+            cur.execute(
+                f"SELECT {', '.join(columns)}, count(*) OVER () FROM jobs {where_sql} "
+                f"ORDER BY {order} LIMIT %s OFFSET %s",
+                params + order_params + [limit, offset],
+            )
+            rows = cur.fetchall()
+            if rows:
+                total = rows[0][-1]
+            else:  # page au-delà des résultats : le total reste utile
+                cur.execute(f"SELECT count(*) FROM jobs {where_sql}", params)
+                total = cur.fetchone()[0]
+        rows = [r[:-1] for r in rows]
+        if ids_only:
+            return total, [r[0] for r in rows]
+        return total, self._records(columns, rows)
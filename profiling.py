@@ -0,0 +1,151 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+# PROFILING (opt-in)
+# Profil d'une seule requête lente : ajouter ?profile=cprofile ou
+# ?profile=sample à l'URL. La requête est exécutée normalement (corps de la
+# réponse compris), mais c'est le rapport du profil qui est renvoyé en
+# text/plain. Le profil brut est aussi écrit dans `profile_dir` :
+#   cprofile -> .prof (pstats, snakeviz, ...)
+#   sample   -> .folded (piles repliées, pour flamegraph.pl / speedscope)
+# Le mode "sample" relève la pile du thread toutes les SAMPLE_INTERVAL
+# secondes : surcoût faible, contrairement à cProfile qui ralentit tout le
+# code Python.
+
+SAMPLE_INTERVAL = 0.001
+REPORT_LINES = 40
+MODES = ("cprofile", "sample")
+
+
+class _Sampler:
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def report(self) -> str:
+        total = sum(self.stacks.values()) or 1
+        self_time, inclusive = Counter(), Counter()
+        for stack, n in self.stacks.items():
+            frames = stack.split(";")
+            self_time[_function(frames[-1])] += n
+            for f in set(map(_function, frames)):
+                inclusive[f] += n
+        out = [f"{total} samples, 1 every {self.interval * 1000:g} ms", "", "self      total     function"]
+        for f, n in self_time.most_common(REPORT_LINES):
+            out.append(f"{100 * n / total:6.1f}%  {100 * inclusive[f] / total:6.1f}%   {f}")
+        return "\n".join(out) + "\n"
+
+
+def _function(frame: str) -> str:
+    """"fichier:fonction:ligne" -> "fichier:fonction" """
+    return frame.rsplit(":", 1)[0]
+
+
+class ProfilingMiddleware:
+    """Actif seulement si enabled ; check(environ) peut refuser (jeton admin...)."""
+
+    def __init__(self, wsgi_app, enabled: bool, profile_dir: str, check=None):
+        self.wsgi_app = wsgi_app
+        self.enabled = enabled
+        self.profile_dir = profile_dir
+        self.check = check
+
+    def __call__(self, environ, start_response):
+        mode = None
+        if self.enabled and "profile=" in environ.get("QUERY_STRING", ""):
+            mode = parse_qs(environ["QUERY_STRING"]).get("profile", [None])[0]
+        if mode not in MODES:
+            return self.wsgi_app(environ, start_response)
+        if self.check is not None and not self.check(environ):
+            start_response("403 FORBIDDEN", [("Content-Type", "text/plain; charset=utf-8")])
+            return [b"profiling requires a valid X-Admin-Token\n"]
+
+        status = []
+
+        def _start_response(s, headers, exc_info=None):
+            status.append(s)
+            return lambda data: None
+
+        def run():
+            body = self.wsgi_app(environ, _start_response)
+            try:
+                return sum(len(chunk) for chunk in body)
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+
+        start = time.perf_counter()
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            size = profiler.runcall(run)
+            elapsed = time.perf_counter() - start
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(REPORT_LINES)
+            report, path = buf.getvalue(), self._path("prof")
+            path = self._write(path, profiler.dump_stats)
+        else:
+            with _Sampler(threading.get_ident()) as sampler:
+                size = run()
+            elapsed = time.perf_counter() - start
+            report, path = sampler.report(), self._path("folded")
+            path = self._write(path, lambda p: _write_text(p, sampler.folded()))
+
+        header = (
+            f"{environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}?{environ.get('QUERY_STRING')}\n"
+            f"status {status[0] if status else '?'}, {size} bytes, {elapsed * 1000:.1f} ms "
+            f"(profiled: {mode})\n"
+            f"raw profile: {path or 'not written'}\n\n"
+        )
+        start_response("200 OK", [("Content-Type", "text/plain; charset=utf-8")])
+        return [(header + report).encode("utf-8")]
+
+    def _path(self, ext: str) -> str:
+        return os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.{ext}")
+
+    def _write(self, path: str, write):
+        """Chemin du fichier écrit, None en cas d'échec."""
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            write(path)
+            return path
+        except OSError as e:
+            print(f"Profile not written ({path}): {e}")
+            return None
+
+
+def _write_text(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# SALARY SKETCHES
+# Un sketch de quantiles par cellule (séniorité, pays, skill), façon
+# DDSketch : les salaires tombent dans des buckets logarithmiques de
+# largeur relative 2 * RELATIVE_ACCURACY. Fusionner deux sketches = additionner
+# leurs compteurs, et tout quantile est juste à RELATIVE_ACCURACY près.
+#
+# La skill ANY_SKILL (dernier indice) regroupe tous les jobs de la cellule,
+# qu'ils citent une skill ou non. Un job qui cite 3 skills compte dans 3
+# cellules-skill : fusionner plusieurs skills pondère donc chaque job par le
+# nombre de skills du profil qu'il demande.
+#
+# Stockage CSR : offsets[cellule]:offsets[cellule + 1] -> buckets / counts
+# non nuls de la cellule. La mémoire dépend du nombre de cellules et de
+# buckets occupés, pas du nombre de jobs.
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+MIN_SALARY = 1.0  # en dessous (0, négatifs) : ignoré
+
+ANY_SKILL = "*"
+
+
+def _bucket(values: np.ndarray) -> np.ndarray:
+    return np.ceil(np.log(values) / _LOG_GAMMA).astype(np.int64)
+
+
+def _bucket_value(buckets: np.ndarray) -> np.ndarray:
+    """Valeur représentative d'un bucket (erreur relative <= RELATIVE_ACCURACY)."""
+    return 2 * _GAMMA ** buckets / (_GAMMA + 1)
+
+
+class SalarySketches:
+    def __init__(self, seniorities, countries, skills, offsets, buckets, counts, sums):
+        self.seniorities = seniorities  # valeurs des axes
+        self.countries = countries
+        self.skills = skills            # ..., ANY_SKILL en dernier
+        self.offsets = offsets          # int64, n_cellules + 1
+        self.buckets = buckets          # int32, index de bucket log
+        self.counts = counts            # int32
+        self.sums = sums                # float64 par cellule : moyenne exacte
+        self._s = {v: i for i, v in enumerate(seniorities)}
+        self._c = {v: i for i, v in enumerate(countries)}
+        self._k = {v: i for i, v in enumerate(skills)}
+
+    @classmethod
+    def build(cls, salaries: pd.Series, seniorities: pd.Series, countries: pd.Series,
+              skills) -> "SalarySketches":
+        """skills : colonne-liste CSR (compact.ListColumn)."""
+        salary = salaries.to_numpy(dtype=float)
+        valid = np.isfinite(salary) & (salary >= MIN_SALARY)
+        s_codes, s_values = pd.factorize(seniorities.astype(str).str.strip())
+        c_codes, c_values = pd.factorize(countries.astype(str).str.strip())
+        n_s, n_c, n_k = len(s_values), len(c_values), len(skills.vocab) + 1
+        any_skill = n_k - 1
+
+        # (ligne, skill) : une paire par skill citée + une paire ANY_SKILL
+        skill_rows = skills.row_ids()
+        rows = np.concatenate([skill_rows, np.arange(len(salary))])
+        k = np.concatenate([skills.codes.astype(np.int64), np.full(len(salary), any_skill)])
+        keep = valid[rows]
+        rows, k = rows[keep], k[keep]
+
+        cell = (s_codes[rows] * n_c + c_codes[rows]) * n_k + k
+        bucket = _bucket(salary[rows])
+        b_min = int(bucket.min()) if len(bucket) else 0
+        span = int(bucket.max()) - b_min + 1 if len(bucket) else 1
+
+        key, counts = np.unique(cell * span + (bucket - b_min), return_counts=True)
+        cells, buckets = np.divmod(key, span)
+
+        n_cells = n_s * n_c * n_k
+        offsets = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=n_cells), out=offsets[1:])
+        sums = np.bincount(cell, weights=salary[rows], minlength=n_cells)
+
+        return cls(
+            list(map(str, s_values)), list(map(str, c_values)),
+            list(map(str, skills.vocab)) + [ANY_SKILL],
+            offsets, (buckets + b_min).astype(np.int32), counts.astype(np.int32), sums,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.buckets.nbytes + self.counts.nbytes + self.sums.nbytes
+
+    def _axis(self, lookup: dict, n: int, selected):
+        if not selected:
+            return np.arange(n)
+        return np.array([lookup[v] for v in selected if v in lookup], dtype=np.int64)
+
+    def estimate(self, seniorities=(), countries=(), skills=(), quantiles=(0.1, 0.25, 0.5, 0.75, 0.9)):
+        """
+        Fusionne les sketches des cellules du profil (valeurs vides = toutes)
+        et renvoie {"count", "mean", "quantiles": {q: salaire}}.
+        """
+        n_s, n_c, n_k = len(self.seniorities), len(self.countries), len(self.skills)
+        s = self._axis(self._s, n_s, seniorities)
+        c = self._axis(self._c, n_c, countries)
+        k = self._axis(self._k, n_k, skills) if skills else np.array([n_k - 1])
+
+        cells = ((s[:, None, None] * n_c + c[None, :, None]) * n_k + k[None, None, :]).ravel()
+        starts, ends = self.offsets[cells], self.offsets[cells + 1]
+        n = ends - starts
+        out_offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(n, out=out_offsets[1:])
+        idx = np.repeat(starts - out_offsets[:-1], n) + np.arange(out_offsets[-1])
+
+        buckets, counts = self.buckets[idx], self.counts[idx]
+        total = int(counts.sum())
+        if total == 0:
+            return {"count": 0, "mean": None, "quantiles": {str(q): None for q in quantiles}}
+
+        # histogramme fusionné, puis rang de chaque quantile
+        b_min = int(buckets.min())
+        cum = np.cumsum(np.bincount(buckets - b_min, weights=counts))
+        ranks = np.floor([q * (total - 1) for q in quantiles])
+        pos = np.searchsorted(cum, ranks, side="right")
+        values = _bucket_value(np.minimum(pos, len(cum) - 1) + b_min)
+        return {
+            "count": total,
+            "mean": float(self.sums[cells].sum() / total),
+            "quantiles": {str(q): float(v) for q, v in zip(quantiles, values)},
+        }
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# SPATIAL INDEX (carte UMAP)
+# Quadtree implicite : chaque point reçoit un code de Morton (bits de x et y
+# entrelacés) sur une grille 2^KEY_BITS x 2^KEY_BITS, et les points sont
+# triés par code. Toute case du quadtree, à n'importe quel niveau, est alors
+# une plage contiguë du tableau trié : un searchsorted suffit.
+#
+# Tuiles "à la slippy map" : au zoom z, 2^z x 2^z tuiles sur l'étendue des
+# points ; la tuile (0, 0) est en bas à gauche (x et y minimaux).
+
+KEY_BITS = 20       # résolution max : 2^20 cases par axe
+CELL_DEPTH = 6      # une tuile agrégée = 2^6 x 2^6 cases
+MAX_ZOOM = KEY_BITS - CELL_DEPTH
+TILE_POINT_LIMIT = 1000  # au-delà, la tuile renvoie des agrégats (ou une page de points)
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """0b1011 -> 0b1000101 : un bit libre entre chaque bit (v < 2^32)."""
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def morton(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    return _spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))
+
+
+class SpatialIndex:
+    def __init__(self, keys, rows, cum_x, cum_y, bounds):
+        self.keys = keys      # uint64, codes de Morton triés
+        self.rows = rows      # int64, position de la ligne de chaque code
+        # sommes cumulées de x / y dans l'ordre des codes : centroïde d'une
+        # plage en O(1)
+        self.cum_x = cum_x
+        self.cum_y = cum_y
+        self.bounds = bounds  # (x_min, y_min, x_max, y_max)
+
+    @classmethod
+    def build(cls, x: pd.Series, y: pd.Series) -> "SpatialIndex":
+        x = pd.to_numeric(x, errors="coerce").to_numpy(dtype=float)
+        y = pd.to_numeric(y, errors="coerce").to_numpy(dtype=float)
+        rows = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        x, y = x[rows], y[rows]
+
+        if len(rows):
+            bounds = (float(x.min()), float(y.min()), float(x.max()), float(y.max()))
+        else:
+            bounds = (0.0, 0.0, 1.0, 1.0)
+        side = 1 << KEY_BITS
+        ix = _grid(x, bounds[0], bounds[2], side)
+        iy = _grid(y, bounds[1], bounds[3], side)
+
+        keys = morton(ix, iy)
+        order = np.argsort(keys, kind="stable")
+        keys, rows, x, y = keys[order], rows[order], x[order], y[order]
+        return cls(
+            keys, rows,
+            np.concatenate(([0.0], np.cumsum(x))),
+            np.concatenate(([0.0], np.cumsum(y))),
+            bounds,
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def meta(self) -> dict:
+        x_min, y_min, x_max, y_max = self.bounds
+        return {
+            "count": len(self),
+            "bounds": {"x_min": x_min, "y_min": y_min, "x_max": x_max, "y_max": y_max},
+            "max_zoom": MAX_ZOOM,
+            "tile_point_limit": TILE_POINT_LIMIT,
+        }
+
+    def _range(self, level: int, cell: int):
+        """[lo, hi) des points de la case `cell` (code de Morton) au niveau `level`."""
+        shift = np.uint64(2 * (KEY_BITS - level))
+        lo = np.searchsorted(self.keys, np.uint64(cell) << shift, side="left")
+        hi = np.searchsorted(self.keys, np.uint64(cell + 1) << shift, side="left")
+        return int(lo), int(hi)
+
+    def tile(self, z: int, tx: int, ty: int, offset: int = 0):
+        """
+        Points de la tuile (positions des lignes) si elle en contient au plus
+        TILE_POINT_LIMIT, sinon agrégats sur la grille la plus fine (au plus
+        2^CELL_DEPTH par axe) qui donne au plus TILE_POINT_LIMIT cases non
+        vides {"count", "x", "y" (centroïdes), "rows" (un point représentant)}.
+        Au zoom max, plus d'agrégats : les points par pages de TILE_POINT_LIMIT
+        à partir de `offset`.
+        Renvoie (nb de points, rows ou None, agrégats ou None).
+        """
+        cell = int(morton(np.array([tx]), np.array([ty]))[0])
+        lo, hi = self._range(z, cell)
+        count = hi - lo
+        if count <= TILE_POINT_LIMIT or z >= MAX_ZOOM:
+            start = lo + min(max(offset, 0), count)
+            return count, self.rows[start:min(hi, start + TILE_POINT_LIMIT)], None
+
+        # les 4^CELL_DEPTH sous-cases de la tuile sont des plages contiguës :
+        # leurs bornes en un seul searchsorted, indépendamment du nb de points
+        level = z + CELL_DEPTH
+        shift = np.uint64(2 * (KEY_BITS - level))
+        first = np.uint64(cell) << np.uint64(2 * CELL_DEPTH)
+        sub = first + np.arange(4 ** CELL_DEPTH + 1, dtype=np.uint64)
+        bounds = np.searchsorted(self.keys[lo:hi], sub << shift, side="left") + lo
+        # trop de cases non vides : on regroupe les sous-cases 4 par 4 (une
+        # case du niveau au-dessus = 4 plages de Morton consécutives)
+        while np.count_nonzero(np.diff(bounds)) > TILE_POINT_LIMIT:
+            bounds = bounds[::4]
+
+        starts, ends = bounds[:-1], bounds[1:]
+        n = ends - starts
+        keep = np.flatnonzero(n)
+        starts, ends, n = starts[keep], ends[keep], n[keep]
+        # représentant : le point du milieu de la case (dans l'ordre de Morton)
+        mid = starts + n // 2
+        return count, None, {
+            "count": n,
+            "x": (self.cum_x[ends] - self.cum_x[starts]) / n,
+            "y": (self.cum_y[ends] - self.cum_y[starts]) / n,
+            "rows": self.rows[mid],
+        }
+
+
+def _grid(v: np.ndarray, lo: float, hi: float, side: int) -> np.ndarray:
+    span = hi - lo
+    if span <= 0:
+        return np.zeros(len(v), dtype=np.int64)
+    return np.clip(((v - lo) / span * side).astype(np.int64), 0, side - 1)
@@ -7,32 +7,8 @@ document.addEventListener("DOMContentLoaded", () => {
   const COLOR_BG_DARK = "#333";
   const COLOR_BG_BODY = "#000";
 
-  const dataPath = "/api/stats-data";
-  function toBool(v) {
-    if (v === true || v === false) return v;
-    if (v === null || v === undefined) return false;
-    const s = String(v).trim().toLowerCase();
-    return ["true", "1", "yes", "y", "oui"].includes(s);
-  }
-
-  function toList(v) {
-    if (Array.isArray(v)) {
-      return v.map((x) => String(x).trim()).filter((x) => x.length > 0);
-    }
-
-    if (v === null || v === undefined) return [];
-
-    const s = String(v).trim();
-    if (!s || s === "[]") return [];
-
-    // remove crochets + quotes and split
-    return s
-      .replace(/^\s*\[|\]\s*$/g, "")
-      .replace(/['"]/g, "")
-      .split(/;|,|\|/)
-      .map((x) => x.trim())
-      .filter((x) => x.length > 0);
-  }
+  // Aggregates are precomputed server-side (app.py build_aggregates)
+  const dataPath = "/api/aggregates";
 
   const showTooltip = (event, content, tooltip) => {
     tooltip
@@ -46,25 +22,6 @@ document.addEventListener("DOMContentLoaded", () => {
     tooltip.style("opacity", 0);
   };
 
-  function aggregateData(data, column, isList = false) {
-    const counts = new Map();
-
-    data.forEach((d) => {
-      const raw = d[column];
-
-      const items = isList ? (Array.isArray(raw) ? raw : toList(raw)) : [raw];
-
-      items.forEach((item) => {
-        const key =
-          item === null || item === undefined ? "" : String(item).trim();
-        if (!key || key === "Not specified") return;
-        counts.set(key, (counts.get(key) || 0) + 1);
-      });
-    });
-
-    return Array.from(counts, ([name, count]) => ({ name, count }));
-  }
-
   function createLegend(containerSelector, pieData, colorScale) {
     const host = d3.select(containerSelector).node();
     if (!host) return;
@@ -93,47 +50,11 @@ document.addEventListener("DOMContentLoaded", () => {
       );
   }
 
-  // 1) Load + preprocess
+  // 1) Load aggregates
   d3.json(dataPath)
-    .then((data) => {
-      console.log(`Data loaded successfully from ${dataPath}!`, data?.[0]);
-
-      const processedData = (data || []).map((d) => ({
-        ...d,
-
-        // numbers
-        salary_value:
-          d.salary_value !== "" &&
-          d.salary_value !== null &&
-          d.salary_value !== undefined
-            ? +d.salary_value
-            : null,
-
-        experience_years:
-          d.experience_years !== "" &&
-          d.experience_years !== null &&
-          d.experience_years !== undefined
-            ? +d.experience_years
-            : null,
-
-        // bools (FIX)
-        hybrid_policy: toBool(d.hybrid_policy),
-        visa_sponsorship: toBool(d.visa_sponsorship),
-
-        // lists (FIX)
-        technical_skills: toList(d.technical_skills),
-        tools_used: toList(d.tools_used),
-        domains: toList(d.domains),
-
-        // strings fallback
-        seniority_level: d.seniority_level || "Not specified",
-        country: d.country || "Not specified",
-        source: d.source || "N/A",
-        title: d.title || d.job_title || "Untitled",
-        company: d.company || "Unknown",
-      }));
-
-      console.log("Data processed. First item:", processedData[0]);
+    .then((agg) => {
+      console.log(`Aggregates loaded successfully from ${dataPath}!`);
+      const counts = agg.counts;
 
       // Tooltip unique
       const tooltip = d3
@@ -142,11 +63,11 @@ document.addEventListener("DOMContentLoaded", () => {
         .attr("class", "d3-tooltip");
 
       // KPIs
-      updateKPIs(processedData);
+      updateKPIs(agg.kpis);
 
       // Charts
       createTechSkillsChart(
-        processedData,
+        counts.technical_skills.items,
         "#viz-tech-skills",
         tooltip,
         COLOR_ACCENT,
@@ -154,7 +75,7 @@ document.addEventListener("DOMContentLoaded", () => {
       );
 
       createSalaryHistogram(
-        processedData,
+        agg["salary-histogram"],
         "#viz-salary-dist",
         tooltip,
         COLOR_ACCENT,
@@ -162,7 +83,7 @@ document.addEventListener("DOMContentLoaded", () => {
       );
 
       createTopToolsChart(
-        processedData,
+        counts.tools_used.items,
         "#viz-tools",
         tooltip,
         COLOR_ACCENT,
@@ -170,7 +91,7 @@ document.addEventListener("DOMContentLoaded", () => {
       );
 
       createGeoChart(
-        processedData,
+        counts.country.items,
         "#viz-geo",
         tooltip,
         COLOR_ACCENT,
@@ -178,7 +99,7 @@ document.addEventListener("DOMContentLoaded", () => {
       );
 
       createDomainsChart(
-        processedData,
+        counts.domains.items,
         "#viz-domains",
         tooltip,
         COLOR_ACCENT,
@@ -186,11 +107,10 @@ document.addEventListener("DOMContentLoaded", () => {
       );
 
       // Pie charts
-      createSeniorityChart(processedData, "#viz-seniority", tooltip);
+      createSeniorityChart(counts.seniority_level, "#viz-seniority", tooltip);
 
       createPolicyPieChart(
-        processedData,
-        "hybrid_policy",
+        agg.policies.hybrid_policy,
         "#viz-hybrid",
         tooltip,
         ["Hybrid/Remote", "On-site"],
@@ -198,22 +118,21 @@ document.addEventListener("DOMContentLoaded", () => {
       );
 
       createPolicyPieChart(
-        processedData,
-        "visa_sponsorship",
+        agg.policies.visa_sponsorship,
         "#viz-visa",
         tooltip,
         ["Visa OK", "Visa No"],
         [COLOR_ACCENT, COLOR_BG_DARK]
       );
 
-      createSourceChart(processedData, "#viz-source", tooltip, [
+      createSourceChart(counts.source, "#viz-source", tooltip, [
         COLOR_ACCENT,
         COLOR_BG_DARK,
       ]);
 
       // Top titles / companies
-      createTopTitles(processedData, "#chart-titles", tooltip);
-      createTopCompanies(processedData, "#chart-companies", tooltip);
+      createTopTitles(counts.title.items, "#chart-titles", tooltip);
+      createTopCompanies(counts.company.items, "#chart-companies", tooltip);
 
       setupModalListeners();
 
@@ -225,23 +144,11 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 
   // 2) KPIs
-  function updateKPIs(data) {
-    d3.select("#kpi-total-value").text(data.length);
-
-    const uniqueCompanies = new Set(data.map((d) => d.company).filter(Boolean));
-    d3.select("#kpi-total-companies").text(uniqueCompanies.size);
-
-    const annualSalaries = data
-      .filter(
-        (d) =>
-          d.salary_type === "annual" &&
-          d.salary_currency === "USD" &&
-          d.salary_value &&
-          d.salary_value > 1000
-      )
-      .map((d) => d.salary_value);
+  function updateKPIs(kpis) {
+    d3.select("#kpi-total-value").text(kpis.total_jobs);
+    d3.select("#kpi-total-companies").text(kpis.total_companies);
 
-    const medianSalary = d3.median(annualSalaries);
+    const medianSalary = kpis.median_salary;
     d3.select("#kpi-median-salary").text(
       medianSalary ? `$${(medianSalary / 1000).toFixed(0)}k` : "N/A"
     );
@@ -249,19 +156,15 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // 3) Generic Bar Chart
   function createGenericBarChart(
-    config,
+    items,
     selector,
     tooltip,
     color,
     hoverColor,
     topN = 10
   ) {
-    const aggregated = aggregateData(config.data, config.column, config.isList);
-
-    const topData = aggregated
-      .sort((a, b) => b.count - a.count)
-      .slice(0, topN)
-      .reverse();
+    // items arrive sorted by count (desc) from the API
+    const topData = items.slice(0, topN).reverse();
 
     const vizElement = d3.select(selector);
     if (vizElement.empty()) return;
@@ -335,9 +238,9 @@ document.addEventListener("DOMContentLoaded", () => {
       .attr("width", (d) => x(d.count));
   }
 
-  function createTechSkillsChart(data, selector, tooltip, color, hoverColor) {
+  function createTechSkillsChart(items, selector, tooltip, color, hoverColor) {
     createGenericBarChart(
-      { data, column: "technical_skills", isList: true },
+      items,
       selector,
       tooltip,
       color,
@@ -345,9 +248,9 @@ document.addEventListener("DOMContentLoaded", () => {
     );
   }
 
-  function createTopToolsChart(data, selector, tooltip, color, hoverColor) {
+  function createTopToolsChart(items, selector, tooltip, color, hoverColor) {
     createGenericBarChart(
-      { data, column: "tools_used", isList: true },
+      items,
       selector,
       tooltip,
       color,
@@ -355,9 +258,9 @@ document.addEventListener("DOMContentLoaded", () => {
     );
   }
 
-  function createGeoChart(data, selector, tooltip, color, hoverColor) {
+  function createGeoChart(items, selector, tooltip, color, hoverColor) {
     createGenericBarChart(
-      { data, column: "country", isList: false },
+      items,
       selector,
       tooltip,
       color,
@@ -365,9 +268,9 @@ document.addEventListener("DOMContentLoaded", () => {
     );
   }
 
-  function createDomainsChart(data, selector, tooltip, color, hoverColor) {
+  function createDomainsChart(items, selector, tooltip, color, hoverColor) {
     createGenericBarChart(
-      { data, column: "domains", isList: true },
+      items,
       selector,
       tooltip,
       color,
@@ -376,18 +279,8 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   // 4) Salary Histogram
-  function createSalaryHistogram(data, selector, tooltip, color, hoverColor) {
-    const annualSalaries = data
-      .filter(
-        (d) =>
-          d.salary_type === "annual" &&
-          d.salary_currency === "USD" &&
-          d.salary_value &&
-          d.salary_value > 20000 &&
-          d.salary_value < 500000
-      )
-      .map((d) => d.salary_value);
-
+  function createSalaryHistogram(bins, selector, tooltip, color, hoverColor) {
+    // bins = [{x0, x1, count}] (annual USD salaries, same thresholds as d3.bin)
     const vizElement = d3.select(selector);
     if (vizElement.empty()) return;
     vizElement.html("");
@@ -397,7 +290,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const width = bbox.width - margin.left - margin.right;
     const height = bbox.height - margin.top - margin.bottom;
-    if (width <= 0 || height <= 0 || annualSalaries.length === 0) return;
+    if (width <= 0 || height <= 0 || bins.length === 0) return;
 
     const svg = vizElement
       .append("svg")
@@ -414,8 +307,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const x = d3
       .scaleLinear()
-      .domain(d3.extent(annualSalaries))
-      .nice()
+      .domain([bins[0].x0, bins[bins.length - 1].x1])
       .range([0, width]);
 
     svg
@@ -429,13 +321,9 @@ document.addEventListener("DOMContentLoaded", () => {
           .tickFormat((d) => `$${Math.round(d / 1000)}k`)
       );
 
-    const histogram = d3.bin().domain(x.domain()).thresholds(x.ticks(20));
-
-    const bins = histogram(annualSalaries);
-
     const y = d3
       .scaleLinear()
-      .domain([0, d3.max(bins, (d) => d.length) || 1])
+      .domain([0, d3.max(bins, (d) => d.count) || 1])
       .nice()
       .range([height, 0]);
 
@@ -455,7 +343,7 @@ document.addEventListener("DOMContentLoaded", () => {
         d3.select(event.currentTarget).attr("fill", hoverColor);
         const content = `<b>$${Math.round(d.x0 / 1000)}k - $${Math.round(
           d.x1 / 1000
-        )}k</b><br>${d.length} jobs`;
+        )}k</b><br>${d.count} jobs`;
         showTooltip(event, content, tooltip);
       })
       .on("mouseout", (event) => {
@@ -464,8 +352,8 @@ document.addEventListener("DOMContentLoaded", () => {
       })
       .transition()
       .duration(800)
-      .attr("y", (d) => y(d.length))
-      .attr("height", (d) => height - y(d.length));
+      .attr("y", (d) => y(d.count))
+      .attr("height", (d) => height - y(d.count));
   }
 
   // 5) Pie charts
@@ -537,15 +425,14 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   function createPolicyPieChart(
-    data,
-    column,
+    policy,
     selector,
     tooltip,
     labels,
     colorRange
   ) {
-    const trueCount = data.filter((d) => d[column] === true).length;
-    const falseCount = data.length - trueCount;
+    const trueCount = policy.true;
+    const falseCount = policy.false;
 
     const pieData = [
       { name: labels[0], value: trueCount },
@@ -555,15 +442,11 @@ document.addEventListener("DOMContentLoaded", () => {
     createGenericPieChart(pieData, selector, tooltip, colorRange);
   }
 
-  function createSeniorityChart(data, selector, tooltip) {
-    const aggregated = aggregateData(data, "seniority_level", false).sort(
-      (a, b) => b.count - a.count
-    );
-
-    const top5 = aggregated
+  function createSeniorityChart(seniority, selector, tooltip) {
+    const top5 = seniority.items
       .slice(0, 5)
       .map((d) => ({ name: d.name, value: d.count }));
-    const otherCount = aggregated.slice(5).reduce((acc, d) => acc + d.count, 0);
+    const otherCount = seniority.total - d3.sum(top5, (d) => d.value);
     if (otherCount > 0) top5.push({ name: "Other", value: otherCount });
 
     const colorRange = [
@@ -577,14 +460,11 @@ document.addEventListener("DOMContentLoaded", () => {
     createGenericPieChart(top5, selector, tooltip, colorRange, 0);
   }
 
-  function createSourceChart(data, selector, tooltip, colorRange) {
-    const aggregated = aggregateData(data, "source", false).sort(
-      (a, b) => b.count - a.count
-    );
-    if (aggregated.length === 0) return;
+  function createSourceChart(sources, selector, tooltip, colorRange) {
+    if (sources.items.length === 0) return;
 
-    const top = aggregated[0];
-    const otherCount = aggregated.slice(1).reduce((acc, d) => acc + d.count, 0);
+    const top = sources.items[0];
+    const otherCount = sources.total - top.count;
 
     const pieData = [
       { name: top.name, value: top.count },
@@ -595,7 +475,7 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   // 6) Top titles / companies
-  function createTopTitles(data, selector, tooltip) {
+  function createTopTitles(items, selector, tooltip) {
     const host = d3.select(selector);
     if (host.empty()) return;
     host.html("");
@@ -604,16 +484,9 @@ document.addEventListener("DOMContentLoaded", () => {
     const width = 850 - margin.left - margin.right;
     const height = 400 - margin.top - margin.bottom;
 
-    const titles = Array.from(
-      d3.rollup(
-        data,
-        (v) => v.length,
-        (d) => d.title
-      )
-    )
-      .map(([title, count]) => ({ title, count }))
-      .sort((a, b) => d3.descending(a.count, b.count))
-      .slice(0, 10);
+    const titles = items
+      .slice(0, 10)
+      .map((d) => ({ title: d.name, count: d.count }));
 
     const svg = host
       .append("svg")
@@ -676,7 +549,7 @@ document.addEventListener("DOMContentLoaded", () => {
       .call(d3.axisBottom(x));
   }
 
-  function createTopCompanies(data, selector, tooltip) {
+  function createTopCompanies(items, selector, tooltip) {
     const host = d3.select(selector);
     if (host.empty()) return;
     host.html("");
@@ -685,16 +558,9 @@ document.addEventListener("DOMContentLoaded", () => {
     const width = 850 - margin.left - margin.right;
     const height = 400 - margin.top - margin.bottom;
 
-    const companies = Array.from(
-      d3.rollup(
-        data,
-        (v) => v.length,
-        (d) => d.company
-      )
-    )
-      .map(([company, count]) => ({ company, count }))
-      .sort((a, b) => d3.descending(a.count, b.count))
-      .slice(0, 10);
+    const companies = items
+      .slice(0, 10)
+      .map((d) => ({ company: d.name, count: d.count }));
 
     const svg = host
       .append("svg")
@@ -4,65 +4,26 @@ document.addEventListener("DOMContentLoaded", () => {
   const COLOR_ACCENT = "cyan";
   const COLOR_DANGER = "#f4dd11ff";
   const COLOR_SUCCESS = "#2ed573";
-  const DATA_PATH = "/api/stats-data";
-
-  d3.dsv(";", DATA_PATH)
-    .then((data) => {
-      console.log("Data loaded for insights.");
-      const processedData = data.map((d) => ({
-        ...d,
-        salary_value: d.salary_value ? +d.salary_value : null,
-        technical_skills: parseListString(d.technical_skills),
-        seniority_level: d.seniority_level || "Not specified",
-      }));
-
-      createScatterPlot(processedData, "#viz-popularity-scatter");
-      createSeniorityLadder(processedData, "#viz-seniority-ladder");
+  // Skill and seniority salary stats are precomputed server-side
+  const SKILLS_PATH = "/api/aggregates/skills-salary";
+  const SENIORITY_PATH = "/api/aggregates/seniority-salary";
+
+  Promise.all([d3.json(SKILLS_PATH), d3.json(SENIORITY_PATH)])
+    .then(([skillsSalary, senioritySalary]) => {
+      console.log("Aggregates loaded for insights.");
+      createScatterPlot(skillsSalary, "#viz-popularity-scatter");
+      createSeniorityLadder(senioritySalary, "#viz-seniority-ladder");
     })
     .catch((error) => {
       console.error("Error loading data:", error);
     });
 
-  function parseListString(listString) {
-    if (!listString || listString === "[]") return [];
-    return listString
-      .replace(/[\[\]']/g, "")
-      .split(", ")
-      .map((s) => s.trim())
-      .filter((s) => s.length > 0);
-  }
   // VIZ 1 : POPULARITY VS VALUE SCATTER PLOT
-  function createScatterPlot(data, selector) {
-    const skillStats = new Map();
-    data.forEach((d) => {
-      if (
-        d.salary_value &&
-        d.salary_currency === "USD" &&
-        d.salary_type === "annual" &&
-        d.salary_value > 20000
-      ) {
-        d.technical_skills.forEach((skill) => {
-          if (!skillStats.has(skill))
-            skillStats.set(skill, { sum: 0, count: 0 });
-          skillStats.get(skill).sum += d.salary_value;
-          skillStats.get(skill).count += 1;
-        });
-      }
-    });
-
-    const plotData = [];
-    skillStats.forEach((val, key) => {
-      if (val.count >= 5) {
-        plotData.push({
-          skill: key,
-          avgSalary: val.sum / val.count,
-          mentions: val.count,
-        });
-      }
-    });
-
-    const medianMentions = d3.median(plotData, (d) => d.mentions);
-    const medianSalary = d3.median(plotData, (d) => d.avgSalary);
+  function createScatterPlot(skillsSalary, selector) {
+    // one point per skill with >= 5 annual USD salaries
+    const plotData = skillsSalary.skills;
+    const medianMentions = skillsSalary.median_mentions;
+    const medianSalary = skillsSalary.median_salary;
 
     const container = d3.select(selector);
     const width = container.node().getBoundingClientRect().width;
@@ -244,45 +205,8 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // VIZ 2 : SENIORITY LADDER (BAR CHART)
 
-  function createSeniorityLadder(data, selector) {
-    const groups = new Map();
-    data.forEach((d) => {
-      if (
-        d.salary_value &&
-        d.salary_currency === "USD" &&
-        d.salary_type === "annual" &&
-        d.salary_value > 10000
-      ) {
-        if (!groups.has(d.seniority_level)) groups.set(d.seniority_level, []);
-        groups.get(d.seniority_level).push(d.salary_value);
-      }
-    });
-
-    // ordered levels with median salaries
-    const careerOrder = [
-      "entry",
-      "junior",
-      "mid",
-      "senior",
-      "lead",
-      "principal",
-      "executive",
-    ];
-    let plotData = [];
-
-    groups.forEach((salaries, level) => {
-      const lvl = level.toLowerCase();
-      if (careerOrder.includes(lvl) && salaries.length >= 5) {
-        plotData.push({
-          level: lvl,
-          median: d3.median(salaries),
-        });
-      }
-    });
-
-    plotData.sort(
-      (a, b) => careerOrder.indexOf(a.level) - careerOrder.indexOf(b.level)
-    );
+  function createSeniorityLadder(plotData, selector) {
+    // plotData = [{level, median}] already in career order
 
     // Calcul du KPI
     const juniorData = plotData.find(
@@ -0,0 +1,75 @@
+import os
+import shutil
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEST_ROWS = 400
+
+
+@pytest.fixture(scope="session")
+def dataset_root(tmp_path_factory):
+    """Jeu synthétique de gen_dataset.py (export du scraper + CSV de l'app)."""
+    import gen_dataset
+    return gen_dataset.write(TEST_ROWS, str(tmp_path_factory.mktemp("bench")), seed=7)
+
+
+@pytest.fixture(scope="session")
+def app_module(dataset_root):
+    """app.py chargé sur le jeu synthétique (DATA prêt)."""
+    os.environ["DATA_DIR"] = os.path.join(dataset_root, "data")
+    os.environ.setdefault("WATCH_DATA_FILES", "0")
+    import app
+    deadline = time.time() + 120
+    while app.DATA is None:
+        assert time.time() < deadline, app.LOAD_ERROR
+        time.sleep(0.05)
+    return app
+
+
+@pytest.fixture()
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture(scope="session")
+def messy_root(dataset_root, tmp_path_factory):
+    """
+    Copie du jeu de test avec des cas que gen_dataset.py ne produit pas :
+    ids du CSV qui ne sont pas 1..N, pays et séniorités entourés d'espaces,
+    source / titre / entreprise vides ou "Not specified".
+    """
+    root = str(tmp_path_factory.mktemp("messy"))
+    shutil.copytree(os.path.join(dataset_root, "data"), os.path.join(root, "data"))
+    path = os.path.join(root, "data", "job_data_clean.csv")
+    df = pd.read_csv(path, escapechar="\\", engine="python", dtype=str, keep_default_na=False)
+    df["id"] = [str(10 + 3 * i) for i in range(len(df))]
+    df.loc[::5, "country"] = " " + df.loc[::5, "country"] + " "
+    df.loc[::7, "seniority_level"] = df.loc[::7, "seniority_level"] + "  "
+    df.loc[::3, "source"] = ""
+    df.loc[1::4, "source"] = "indeed"
+    df.loc[::11, "title"] = ""
+    df.loc[5::13, "title"] = "Not specified"
+    df.loc[::9, "company"] = ""
+    df.loc[4::17, "company"] = " Company 00001"
+    df.to_csv(path, index=False, escapechar="\\")
+    return root
+
+
+@pytest.fixture(scope="session")
+def messy_dataset(app_module, messy_root):
+    """Dataset mémoire de app.py chargé depuis messy_root (DATA inchangé)."""
+    mp = pytest.MonkeyPatch()
+    data_dir = os.path.join(messy_root, "data")
+    mp.setattr(app_module, "STATS_PATH", os.path.join(data_dir, "job_data_clean.csv"))
+    mp.setattr(app_module, "D3_PATH", os.path.join(data_dir, "jobs_for_d3.csv"))
+    mp.setattr(app_module, "CACHE_DIR", os.path.join(data_dir, ".cache"))
+    try:
+        return app_module.load_dataset()
+    finally:
+        mp.undo()
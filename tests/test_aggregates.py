@@ -0,0 +1,76 @@
+# /api/aggregates contre l'ancien comptage de static/page1-dashboard.js
+# (avant user-002), porté tel quel ci-dessous et appliqué à /api/stats-data
+import pytest
+
+
+def _old_processed(d):
+    """processedData : replis des champs texte."""
+    return {
+        **d,
+        "seniority_level": d["seniority_level"] or "Not specified",
+        "country": d["country"] or "Not specified",
+        "source": d["source"] or "N/A",
+        "title": d["title"] or "Untitled",
+        "company": d["company"] or "Unknown",
+    }
+
+
+def _old_aggregate_data(data, column, is_list=False):
+    """aggregateData : Map dans l'ordre de 1re apparition."""
+    counts = {}
+    for d in data:
+        items = [str(x).strip() for x in d[column] if str(x).strip()] if is_list else [d[column]]
+        for item in items:
+            key = "" if item is None else str(item).strip()
+            if not key or key == "Not specified":
+                continue
+            counts[key] = counts.get(key, 0) + 1
+    return [{"name": k, "count": v} for k, v in counts.items()]
+
+
+def _old_rollup(data, column):
+    """d3.rollup(data, v => v.length, d => d[column]) : valeurs brutes."""
+    counts = {}
+    for d in data:
+        counts[d[column]] = counts.get(d[column], 0) + 1
+    return [{"name": k, "count": v} for k, v in counts.items()]
+
+
+def _by_count(items):
+    # Array.prototype.sort est stable : ex aequo dans l'ordre d'apparition
+    return sorted(items, key=lambda d: -d["count"])
+
+
+@pytest.fixture()
+def get(app_module, client, messy_dataset, monkeypatch):
+    monkeypatch.setattr(app_module, "DATA", messy_dataset)
+    return lambda url: client.get(url).get_json()
+
+
+@pytest.mark.parametrize("column, is_list", [
+    ("technical_skills", True), ("tools_used", True), ("domains", True),
+    ("country", False), ("seniority_level", False), ("source", False),
+])
+def test_counts_match_old_aggregate_data(get, column, is_list):
+    data = [_old_processed(d) for d in get("/api/stats-data")]
+    expected = _by_count(_old_aggregate_data(data, column, is_list))
+    counts = get("/api/aggregates")["counts"][column]
+    assert counts["items"] == expected[:len(counts["items"])]
+    assert counts["total"] == sum(d["count"] for d in expected)
+
+
+@pytest.mark.parametrize("column", ["title", "company"])
+def test_top_titles_and_companies_match_old_rollup(get, column):
+    data = [_old_processed(d) for d in get("/api/stats-data")]
+    expected = _by_count(_old_rollup(data, column))
+    items = get("/api/aggregates")["counts"][column]["items"]
+    assert items[:10] == expected[:10]
+
+
+def test_messy_values_are_counted_like_before(get):
+    counts = get("/api/aggregates")["counts"]
+    assert "N/A" in [d["name"] for d in counts["source"]["items"]]
+    titles = [d["name"] for d in counts["title"]["items"]]
+    assert "Untitled" in titles and "Not specified" in titles
+    companies = [d["name"] for d in counts["company"]["items"]]
+    assert "Unknown" in companies and " Company 00001" in companies
@@ -0,0 +1,101 @@
+# load_cached : data/.cache/ réutilisé tant que le CSV ne change pas
+# (mtime, taille, sha256), reparse sinon ou si le cache est illisible
+import os
+
+import pytest
+
+
+@pytest.fixture()
+def csv_path(app_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "CACHE_DIR", str(tmp_path / ".cache"))
+    path = tmp_path / "jobs.csv"
+    path.write_text("id,title\n1,data engineer\n")
+    return str(path)
+
+
+class Parse:
+    """parse() qui compte ses appels et relit le CSV."""
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        with open(self.path, encoding="utf-8") as f:
+            return {"text": f.read()}
+
+
+def _load(app_module, path):
+    parse = Parse(path)
+    return app_module.load_cached(path, parse), parse.calls
+
+
+def test_hit_skips_parse(app_module, csv_path):
+    assert _load(app_module, csv_path) == ({"text": "id,title\n1,data engineer\n"}, 1)
+    assert sorted(os.listdir(app_module.CACHE_DIR)) == ["jobs.meta.json", "jobs.pkl"]
+    assert _load(app_module, csv_path) == ({"text": "id,title\n1,data engineer\n"}, 0)
+
+
+def test_mtime_change_invalidates(app_module, csv_path):
+    _load(app_module, csv_path)
+    st = os.stat(csv_path)
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert _load(app_module, csv_path)[1] == 1
+    assert _load(app_module, csv_path)[1] == 0
+
+
+def test_size_change_invalidates(app_module, csv_path):
+    _load(app_module, csv_path)
+    st = os.stat(csv_path)
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("2,data analyst\n")
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert _load(app_module, csv_path) == ({"text": "id,title\n1,data engineer\n2,data analyst\n"}, 1)
+
+
+def test_content_change_invalidates(app_module, csv_path):
+    """Même taille, même mtime : seul le sha256 voit la différence."""
+    _load(app_module, csv_path)
+    st = os.stat(csv_path)
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("id,title\n1,data designer\n")
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(csv_path).st_size == st.st_size
+    assert _load(app_module, csv_path) == ({"text": "id,title\n1,data designer\n"}, 1)
+
+
+def test_version_change_invalidates(app_module, csv_path, monkeypatch):
+    _load(app_module, csv_path)
+    monkeypatch.setattr(app_module, "CACHE_VERSION", app_module.CACHE_VERSION + 1)
+    assert _load(app_module, csv_path)[1] == 1
+
+
+@pytest.mark.parametrize("damage", ["corrupt", "truncate", "remove", "bad_meta"])
+def test_unreadable_cache_falls_back_to_csv(app_module, csv_path, damage):
+    _load(app_module, csv_path)
+    pkl = os.path.join(app_module.CACHE_DIR, "jobs.pkl")
+    meta = os.path.join(app_module.CACHE_DIR, "jobs.meta.json")
+    if damage == "corrupt":
+        with open(pkl, "wb") as f:
+            f.write(b"not a pickle")
+    elif damage == "truncate":
+        with open(pkl, "r+b") as f:
+            f.truncate(os.path.getsize(pkl) // 2)
+    elif damage == "remove":
+        os.remove(pkl)
+    else:
+        with open(meta, "w", encoding="utf-8") as f:
+            f.write("{")
+    assert _load(app_module, csv_path) == ({"text": "id,title\n1,data engineer\n"}, 1)
+    # cache réécrit au passage
+    assert _load(app_module, csv_path)[1] == 0
+
+
+def test_stats_cache_round_trip(app_module, dataset_root, tmp_path, monkeypatch):
+    """Le CompactFrame relu du cache est celui du parse."""
+    monkeypatch.setattr(app_module, "CACHE_DIR", str(tmp_path / ".cache"))
+    parsed = app_module.load_stats_df()
+    cached = app_module.load_stats_df()
+    assert os.listdir(tmp_path / ".cache")
+    assert cached.records() == parsed.records()
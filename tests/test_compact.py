@@ -0,0 +1,116 @@
+# CompactFrame (user-009) contre l'ancien DataFrame de listes Python :
+# records(), colonnes-listes et index inversés doivent être identiques
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact import CompactFrame, ListColumn
+from conftest import ROOT
+
+
+# RÉFÉRENCE : app.py avant user-009 (git show 9db43fb^:app.py)
+def old_records(df, positions=None, columns=None):
+    """stats_df.fillna("") puis .iloc[positions][columns].to_dict(orient="records")."""
+    df = df.astype({c: object for c in df.columns if pd.api.types.is_float_dtype(df[c].dtype)})
+    df = df.fillna("")
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    sub = df if positions is None else df.iloc[positions]
+    return sub.to_dict(orient="records")
+
+
+def old_list_postings(cells, postings):
+    lengths = cells.str.len().to_numpy(dtype=np.int64)
+    flat = pd.Series([x for lst in cells for x in lst], dtype=object)
+    return postings(flat, np.repeat(np.arange(len(cells), dtype=np.int64), lengths))
+
+
+@pytest.fixture(scope="module", params=["dataset", "messy"])
+def frames(request, app_module, messy_root):
+    """(DataFrame normalisé, CompactFrame) du même CSV."""
+    with pytest.MonkeyPatch.context() as mp:
+        if request.param == "messy":
+            mp.setattr(app_module, "STATS_PATH", f"{messy_root}/data/job_data_clean.csv")
+        df = app_module._read_stats_csv()
+    compact = CompactFrame.from_frame(df.copy(), app_module.STATS_LIST_COLS, app_module.STATS_CATEGORY_COLS)
+    return df, compact
+
+
+def _dumps(app_module, records):
+    return app_module.app.json.dumps(records, separators=(",", ":"))
+
+
+def test_all_records_match(app_module, frames):
+    df, compact = frames
+    old, new = old_records(df), compact.records()
+    assert new == old
+    assert _dumps(app_module, new) == _dumps(app_module, old)
+
+
+@pytest.mark.parametrize("positions", [[0], [5, 2, 5], [], "last", "every7th"])
+def test_records_at_positions_match(frames, positions):
+    df, compact = frames
+    if positions == "last":
+        positions = [len(df) - 1]
+    elif positions == "every7th":
+        positions = list(range(len(df) - 1, -1, -7))
+    positions = np.array(positions, dtype=np.int64)
+    assert compact.records(positions) == old_records(df, positions)
+
+
+def test_light_records_match(app_module, frames):
+    df, compact = frames
+    columns = app_module.LIGHT_COLS
+    assert compact.records(columns=columns) == old_records(df, columns=columns)
+    positions = np.arange(0, len(df), 3)
+    assert compact.records(positions, columns) == old_records(df, positions, columns)
+
+
+def test_list_postings_match(app_module, frames):
+    df, compact = frames
+    for c in app_module.INDEXED_LIST_COLS:
+        old = old_list_postings(df[c], app_module._postings)
+        new = app_module._list_postings(compact.lists[c])
+        assert list(new) == list(old)
+        for value, rows in old.items():
+            assert np.array_equal(new[value], rows), (c, value)
+
+
+def test_list_column_round_trip():
+    cells = [["a", "b"], [], ["b"], [], ["c", "a", "a"], []]
+    lc = ListColumn.from_lists(cells)
+    assert lc.rows() == cells
+    assert lc.rows([4, 0, 1]) == [cells[4], cells[0], cells[1]]
+    assert lc.rows(np.array([], dtype=np.int64)) == []
+    assert list(lc.row_ids()) == [0, 0, 2, 4, 4, 4]
+    assert ListColumn.from_lists([[], []]).rows() == [[], []]
+
+
+def test_json_payload_matches(app_module, client):
+    """/api/jobs : mêmes objets que l'ancien stats_df.to_dict(orient="records")."""
+    df = app_module._read_stats_csv()
+    resp = client.get("/api/jobs")
+    assert json.loads(resp.get_data(as_text=True)) == json.loads(_dumps(app_module, old_records(df)))
+    resp.close()
+
+
+def test_bench_memory_import_starts_nothing(dataset_root):
+    """bench_memory.py : pas de chargement ni de watcher en arrière-plan."""
+    data_dir = os.path.join(dataset_root, "data")
+    env = {k: v for k, v in os.environ.items() if k not in {"LOAD_DATA", "WATCH_DATA_FILES"}}
+    env["DATA_DIR"] = data_dir
+    code = ("import threading, bench_memory; "
+            "print(sorted(t.name for t in threading.enumerate()), bench_memory.app.DATA)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.stdout.strip().splitlines()[-1] == "['MainThread'] None", out.stderr
+
+    out = subprocess.run([sys.executable, "bench_memory.py", os.path.join(data_dir, "job_data_clean.csv")],
+                         cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert "400 lignes" in out.stdout and "Stats dataset charged" not in out.stdout
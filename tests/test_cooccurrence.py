@@ -0,0 +1,144 @@
+# SkillMatrix et /api/skills/cooccurrence contre un comptage des paires en
+# Python pur, y compris la coupure à `top` au milieu des ex aequo
+import itertools
+import math
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from compact import ListColumn
+from cooccurrence import SkillMatrix
+
+SKILLS = [f"skill{k}" for k in range(12)]
+
+
+@pytest.fixture(scope="module")
+def jobs():
+    """60 jobs : skills techniques + outils (parfois la même chaîne), salaire parfois inconnu."""
+    rng = random.Random(3)
+    technical = [rng.sample(SKILLS, rng.randint(0, 5)) for _ in range(60)]
+    tools = [rng.sample(SKILLS[:6], rng.randint(0, 2)) for _ in range(60)]
+    salary = [rng.choice([math.nan, 40000.0, 55000.0, 70000.0]) for _ in range(60)]
+    return technical, tools, salary
+
+
+@pytest.fixture(scope="module")
+def matrix(jobs):
+    technical, tools, salary = jobs
+    return SkillMatrix.build([ListColumn.from_lists(technical), ListColumn.from_lists(tools)],
+                             np.array(salary))
+
+
+def _brute_force(jobs, rows=None):
+    technical, tools, salary = jobs
+    rows = range(len(technical)) if rows is None else rows
+    sets = [set(technical[r]) | set(tools[r]) for r in rows]
+    counts = Counter(s for skills in sets for s in skills)
+    pairs = Counter(frozenset(p) for skills in sets for p in itertools.combinations(skills, 2))
+    salaries = {s: [salary[r] for r, skills in zip(rows, sets) if s in skills
+                    and not math.isnan(salary[r])] for s in counts}
+    return len(sets), counts, pairs, salaries
+
+
+def _expected_pairs(matrix, brute, min_count=1, top=100, sort="count", skill=None):
+    n, counts, pairs, _ = brute
+    out = []
+    for pair, c in pairs.items():
+        if c < min_count or (skill is not None and skill not in pair):
+            continue
+        a, b = sorted(pair, key=matrix.lookup.get)
+        if skill is not None:
+            a, b = skill, (b if a == skill else a)
+        lift = c * n / (counts[a] * counts[b])
+        out.append({"a": a, "b": b, "count": c, "lift": lift})
+    key = (lambda p: -p["lift"]) if sort == "lift" else (lambda p: -p["count"])
+    out.sort(key=lambda p: (key(p), matrix.lookup[p["a"]], matrix.lookup[p["b"]]))
+    return out[:top]
+
+
+@pytest.mark.parametrize("sort", ["count", "lift"])
+@pytest.mark.parametrize("min_count", [1, 2, 4])
+@pytest.mark.parametrize("top", [1, 2, 5, 17, 1000])
+def test_pairs_match_brute_force(jobs, matrix, sort, min_count, top):
+    brute = _brute_force(jobs)
+    expected = _expected_pairs(matrix, brute, min_count, top, sort)
+    got = matrix.pairs(matrix.summarize(), min_count=min_count, top=top, sort=sort)
+    assert got == pytest.approx(expected)
+    if top < 1000:
+        assert len(got) == top
+
+
+@pytest.mark.parametrize("skill", ["skill0", "skill11", "unknown"])
+@pytest.mark.parametrize("top", [1, 3, 1000])
+def test_neighbours_match_brute_force(jobs, matrix, skill, top):
+    brute = _brute_force(jobs)
+    for sort in ["count", "lift"]:
+        expected = _expected_pairs(matrix, brute, top=top, sort=sort, skill=skill)
+        got = matrix.pairs(matrix.summarize(), top=top, sort=sort, skill=skill)
+        assert got == pytest.approx(expected)
+
+
+def test_subset_matches_brute_force(jobs, matrix):
+    rows = list(range(0, 60, 3))
+    brute = _brute_force(jobs, rows)
+    summary = matrix.summarize(np.array(rows))
+    assert summary["n_jobs"] == 20
+    assert matrix.pairs(summary, top=1000) == pytest.approx(_expected_pairs(matrix, brute, top=1000))
+
+
+def test_skill_stats_match_brute_force(jobs, matrix):
+    n, counts, _, salaries = _brute_force(jobs)
+    stats = matrix.skill_stats(matrix.summarize(), min_count=2)
+    assert [s["skill"] for s in stats] == sorted(
+        (s for s in counts if counts[s] >= 2), key=lambda s: (-counts[s], matrix.lookup[s]))
+    for s in stats:
+        values = salaries[s["skill"]]
+        assert s["count"] == counts[s["skill"]]
+        assert s["salary_count"] == len(values)
+        if values:
+            mean = sum(values) / len(values)
+            assert s["avg_salary"] == pytest.approx(mean)
+            assert s["std_salary"] == pytest.approx(
+                math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)), abs=1e-6)
+        else:
+            assert s["avg_salary"] is None and s["std_salary"] is None
+
+
+# API : jeu de test complet, brute force sur les records
+def _api_brute(app_module, rows):
+    records = app_module.DATA.stats.records()
+    jobs = ([records[r]["technical_skills"] for r in range(len(records))],
+            [records[r]["tools_used"] for r in range(len(records))],
+            [math.nan] * len(records))
+    return _brute_force(jobs, rows)
+
+
+@pytest.mark.parametrize("query, top", [("", 100), ("&top=7", 7), ("&top=0", 1), ("&top=-5", 1),
+                                        ("&top=100000", 1000)])
+def test_api_top_bound(app_module, client, query, top):
+    matrix = app_module.DATA.skill_matrix
+    body = client.get(f"/api/skills/cooccurrence?min_count=1{query}").get_json()
+    brute = _api_brute(app_module, None)
+    assert body["jobs"] == brute[0]
+    expected = _expected_pairs(matrix, brute, top=top)
+    assert body["pairs"] == pytest.approx(expected)
+    assert len(body["pairs"]) == min(top, len(brute[2]))
+    assert len(body["skills"]) == min(top, len(brute[1]))
+
+
+def test_api_top_capped(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "COOCCURRENCE_MAX_TOP", 4)
+    body = client.get("/api/skills/cooccurrence?top=50&sort=lift").get_json()
+    assert len(body["pairs"]) == 4 and len(body["skills"]) == 4
+
+
+def test_api_filtered(app_module, client):
+    data = app_module.DATA
+    country = data.stats.records(positions=[0])[0]["country"]
+    rows = [i for i, r in enumerate(data.stats.records()) if r["country"] == country]
+    body = client.get(f"/api/skills/cooccurrence?country={country}&min_count=2&sort=lift&top=20").get_json()
+    brute = _api_brute(app_module, rows)
+    assert body["jobs"] == len(rows)
+    assert body["pairs"] == pytest.approx(_expected_pairs(data.skill_matrix, brute, 2, 20, "lift"))
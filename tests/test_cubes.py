@@ -0,0 +1,100 @@
+# Séries de /api/timeseries contre un comptage direct des jobs
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact import ListColumn
+from cubes import GRANULARITIES, TimeSeriesCubes, _bucket_starts
+
+
+@pytest.fixture(scope="module")
+def jobs():
+    rng = np.random.default_rng(3)
+    n = 3000
+    days = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 500, n), unit="D")
+    return pd.DataFrame({
+        "day": days,
+        "country": rng.choice(["France", "USA", "UK"], n),
+        "seniority": rng.choice(["junior", "senior"], n),
+        "skills": [list(rng.choice(["python", "sql", "excel"], rng.integers(0, 3), replace=False))
+                   for _ in range(n)],
+    })
+
+
+@pytest.fixture(scope="module")
+def cubes(jobs):
+    return TimeSeriesCubes.build(
+        jobs["day"].dt.strftime("%Y-%m-%d"), jobs["country"], jobs["seniority"],
+        ListColumn.from_lists(jobs["skills"]),
+    )
+
+
+def _expected(jobs, granularity, start, end, country):
+    """buckets / jobs / python attendus, en comptant les jobs un par un."""
+    starts = _bucket_starts(pd.DatetimeIndex(jobs["day"]), granularity)
+    all_buckets = pd.date_range(starts.min(), starts.max(), freq="D")
+    all_buckets = all_buckets[all_buckets.isin(_bucket_starts(all_buckets, granularity))]
+    first = _bucket_starts(pd.DatetimeIndex([start]), granularity)[0]
+    buckets = all_buckets[(all_buckets >= first) & (all_buckets <= end)]
+    mask = (jobs["country"] == country).to_numpy()
+    per_bucket = pd.Series(starts[mask]).value_counts()
+    python = pd.Series(starts[mask & jobs["skills"].map(lambda s: "python" in s).to_numpy()]).value_counts()
+    return (
+        [b.strftime("%Y-%m-%d") for b in buckets],
+        [int(per_bucket.get(b, 0)) for b in buckets],
+        [int(python.get(b, 0)) for b in buckets],
+    )
+
+
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+@pytest.mark.parametrize("start, end", [
+    ("2023-06-01", "2026-01-01"),
+    ("2024-03-15", "2024-09-02"),
+    ("2025-05-10", "2026-01-01"),   # dans la dernière période
+    ("2025-05-15", "2026-01-01"),   # le lendemain du dernier jour (2025-05-14)
+    ("2025-07-01", "2026-01-01"),   # bien après la dernière période
+    ("2023-01-01", "2023-06-01"),   # avant la première
+])
+def test_query_matches_direct_count(jobs, cubes, granularity, start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    out = cubes.query(granularity, countries=["France"], start=start, end=end, skills=["python"])
+    buckets, counts, python = _expected(jobs, granularity, start, end, "France")
+    assert out["buckets"] == buckets
+    assert out["jobs"] == counts
+    assert out["skills"]["python"] == python
+
+
+def test_start_after_last_bucket_is_empty(jobs, cubes):
+    last_day = jobs["day"].max()
+    out = cubes.query("month", start=last_day + pd.offsets.MonthBegin(1), top_skills=2)
+    assert out["buckets"] == [] and out["jobs"] == []
+    assert all(series == [] for series in out["skills"].values())
+
+
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_tz_aware_bounds_are_read_in_utc(cubes, granularity):
+    """Les jours sont stockés en UTC (voir _parse_dates) : une borne avec fuseau y est ramenée."""
+    aware = cubes.query(granularity, start=pd.Timestamp("2024-03-01T01:00+02:00"),
+                        end=pd.Timestamp("2024-06-30T23:00-05:00"), skills=["sql"])
+    naive = cubes.query(granularity, start=pd.Timestamp("2024-02-29T23:00"),
+                        end=pd.Timestamp("2024-07-01T04:00"), skills=["sql"])
+    assert aware == naive
+    assert aware["buckets"]
+
+
+@pytest.mark.parametrize("query, status", [
+    ("start=2025-01-01T00:00%2B02:00", 200),
+    ("start=2025-01-01T00:00Z&end=2025-03-01T12:00-03:00", 200),
+    ("end=2025-03-01", 200),
+    ("start=nat", 400),
+    ("end=not-a-date", 400),
+])
+def test_api_timeseries_bounds(client, query, status):
+    resp = client.get(f"/api/timeseries?granularity=day&{query}")
+    assert resp.status_code == status, resp.get_data(as_text=True)
+
+
+def test_api_tz_aware_start_matches_utc(client):
+    aware = client.get("/api/timeseries?granularity=day&start=2025-01-01T01:00%2B02:00").get_json()
+    utc = client.get("/api/timeseries?granularity=day&start=2024-12-31T23:00").get_json()
+    assert aware == utc
@@ -0,0 +1,163 @@
+# dedup.py : reposts plantés dans l'export du jeu de test, clusters LSH
+# contre un calcul par paire, modes collapse / flag, entrées vides
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import clean_text, read_scraper_csv
+from dedup import BANDS, NearDuplicates, dedupe_scraper_csv, shingle_hashes
+
+HEADER = ["id", "title", "company", "country", "location", "link", "date_posted", "description",
+          "seniority_level"]
+
+
+def _write(df, path):
+    df.to_csv(path, sep="\t", index=False, quoting=csv.QUOTE_MINIMAL)
+    return str(path)
+
+
+def _edit(text, every):
+    """Retouche légère : un mot sur `every` remplacé."""
+    words = text.split(" ")
+    return " ".join("tweaked" if i % every == every - 1 else w for i, w in enumerate(words))
+
+
+@pytest.fixture(scope="module")
+def export(dataset_root):
+    """Export du jeu de test + 3 reposts (exact, retouché, avec nouvel id / lien) et une offre vide."""
+    df = read_scraper_csv(os.path.join(dataset_root, "master_clean.csv"), dtype=str)
+    base = df.iloc[:120].copy()
+    reposts = base.iloc[[3, 5, 5]].copy()
+    reposts["id"] = ["9001", "9002", "9003"]
+    reposts["link"] = reposts["link"] + "?repost"
+    reposts.iloc[1, reposts.columns.get_loc("description")] = _edit(reposts["description"].iloc[1], 40)
+    empty = base.iloc[[0]].assign(id="9004", description="")
+    return pd.concat([base, reposts, empty, empty.assign(id="9005")], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def near(export):
+    return NearDuplicates.build([clean_text(t) for t in export["description"]])
+
+
+def test_planted_reposts_are_found(export, near):
+    dup = near.duplicate_of()
+    pos = {i: p for p, i in enumerate(export["id"])}
+    assert dup[pos["9001"]] == pos["4"]
+    assert dup[pos["9002"]] == pos["6"]
+    assert dup[pos["9003"]] == pos["6"]
+    # un texte vide n'est le doublon de rien
+    assert dup[pos["9004"]] == dup[pos["9005"]] == -1
+    # les offres gardées ne pointent vers rien, les autres vers une offre gardée plus haut
+    kept = dup < 0
+    assert kept[pos["4"]] and kept[pos["6"]]
+    assert np.all(dup[~kept] < np.flatnonzero(~kept))
+    assert np.all(kept[dup[~kept]])
+
+
+def _brute_force_clusters(near, threshold):
+    """Composantes de toutes les paires (qui partagent une bande, Jaccard estimé >= threshold)."""
+    n = len(near.has_shingles)
+    docs = np.flatnonzero(near.has_shingles)
+    rows = near.signatures.shape[1] // BANDS
+    bands = near.signatures[docs].reshape(len(docs), BANDS, rows)
+    parent = list(range(n))
+
+    def root(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for a in range(len(docs)):
+        share = (bands[a + 1:] == bands[a]).all(axis=2).any(axis=1)
+        for b in docs[a + 1 + np.flatnonzero(share)].tolist():
+            if near.similarity(np.array([docs[a]]), np.array([b]))[0] >= threshold:
+                parent[max(root(int(docs[a])), root(b))] = min(root(int(docs[a])), root(b))
+    out = np.array([root(x) for x in range(n)])
+    out[out == np.arange(n)] = -1
+    return out
+
+
+@pytest.mark.parametrize("threshold", [0.8, 0.3, 0.1])
+def test_clusters_match_all_pairs(near, threshold):
+    """Groupes par leader dans les buckets = toutes les paires vérifiées, mêmes clusters."""
+    i, j = near.linked_pairs(threshold)
+    assert np.all(i < j)
+    assert np.all(near.similarity(i, j) >= threshold)
+    assert near.duplicate_of(threshold).tolist() == _brute_force_clusters(near, threshold).tolist()
+
+
+def test_many_edited_reposts():
+    """Une offre republiée 300 fois avec une retouche : un cluster, paires ~linéaires."""
+    words = [f"w{k}" for k in range(200)]
+    texts = [" ".join(words)]
+    for k in range(300):
+        edited = list(words)
+        edited[k % 200] = f"x{k}"
+        texts.append(" ".join(edited))
+    near = NearDuplicates.build(texts + ["something else entirely here today"])
+    assert near.duplicate_of().tolist() == [-1] + [0] * 300 + [-1]
+    assert len(near.linked_pairs()[0]) < 300 * BANDS
+
+
+def test_bucket_members_are_paired_with_each_other():
+    """
+    b ~ c, mais ni l'un ni l'autre ~ a, et b / c ne partagent que les
+    bandes de a (a en tête de bucket) : b et c restent reliés.
+    """
+    a = np.arange(16, dtype=np.uint32)
+    b = a.copy()
+    b[8:] += 100          # bandes 0-1 comme a : 8/16 avec a
+    c = b.copy()
+    c[[8, 12]] += 200     # 14/16 avec b, bandes 2-3 différentes de b
+    near = NearDuplicates(np.stack([a, b, c]), np.ones(3, dtype=bool))
+    assert near.similarity(np.array([0, 1, 0]), np.array([1, 2, 2])).tolist() == [0.5, 0.875, 0.5]
+    assert near.duplicate_of(threshold=0.8, bands=4).tolist() == [-1, -1, 1]
+
+
+def test_identical_signatures_form_one_cluster():
+    sig = np.tile(np.arange(32, dtype=np.uint32), (50, 1))
+    near = NearDuplicates(sig, np.ones(50, dtype=bool))
+    i, j = near.linked_pairs(bands=4)
+    assert len(i) == 49 and set(i.tolist()) == {0}
+    assert near.duplicate_of(bands=4).tolist() == [-1] + [0] * 49
+
+
+@pytest.mark.parametrize("mode", ["collapse", "flag"])
+def test_modes(export, tmp_path, mode):
+    src = _write(export, tmp_path / "in.tsv")
+    out = str(tmp_path / "out.tsv")
+    dup = dedupe_scraper_csv(src, out, mode=mode)
+    result = read_scraper_csv(out, dtype=str, keep_default_na=False)
+    if mode == "collapse":
+        assert result["id"].tolist() == export["id"][dup < 0].tolist()
+        assert list(result.columns) == list(export.columns)
+    else:
+        assert result["id"].tolist() == export["id"].tolist()
+        expected = np.where(dup >= 0, export["id"].to_numpy()[np.maximum(dup, 0)], "")
+        assert result["duplicate_of"].tolist() == expected.tolist()
+        assert dict(zip(result["id"], result["duplicate_of"]))["9002"] == "6"
+
+
+@pytest.mark.parametrize("mode", ["collapse", "flag"])
+def test_header_only_and_single_row(tmp_path, mode):
+    empty = pd.DataFrame(columns=HEADER)
+    out = str(tmp_path / "out.tsv")
+    assert len(dedupe_scraper_csv(_write(empty, tmp_path / "empty.tsv"), out, mode=mode)) == 0
+    assert len(read_scraper_csv(out, dtype=str)) == 0
+
+    one = pd.DataFrame([["1", "t", "c", "FR", "Paris", "l", "2025-01-01", "<p>some text here</p>", ""]],
+                       columns=HEADER)
+    assert dedupe_scraper_csv(_write(one, tmp_path / "one.tsv"), out, mode=mode).tolist() == [-1]
+    assert read_scraper_csv(out, dtype=str)["id"].tolist() == ["1"]
+
+
+def test_shingles_of_no_text():
+    hashes, offsets = shingle_hashes([])
+    assert len(hashes) == 0 and offsets.tolist() == [0]
+    hashes, offsets = shingle_hashes(["", None, "a b"])
+    assert offsets.tolist() == [0, 0, 0, 2]
+    assert NearDuplicates.build([]).duplicate_of().tolist() == []
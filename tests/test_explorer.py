@@ -0,0 +1,49 @@
+# Pages de /api/jobs/search telles que les demande templates/explorateur.html
+from urllib.parse import urlencode
+
+import pytest
+
+FILTERS = [
+    {},
+    {"country": "France", "skills": "python"},
+    {"seniority": "junior", "hybrid": "1"},
+    {"text": "python"},
+    {"text": "data analyst", "salary": "40000"},
+]
+
+
+def _search(client, params):
+    resp = client.get(f"/api/jobs/search?{urlencode(params)}")
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pages_cover_the_ranked_ids(client, filters):
+    """Les pages de 50 mises bout à bout = tous les ids classés, sans doublon."""
+    everything = _search(client, {**filters, "ids_only": "1", "page_size": 5000})
+    seen, page = [], 1
+    while True:
+        body = _search(client, {**filters, "page": page, "page_size": 50})
+        assert body["total"] == everything["total"]
+        if not body["results"]:
+            break
+        seen.extend(job["id"] for job in body["results"])
+        page += 1
+    assert seen == everything["ids"]
+
+
+def test_page_has_what_the_cards_and_modal_show(client):
+    job = _search(client, {"page_size": 1})["results"][0]
+    for field in ["title", "company", "location", "country", "salary_value", "link", "source",
+                  "description", "technical_skills", "tools_used", "soft_skills", "benefits",
+                  "hybrid_policy", "visa_sponsorship"]:
+        assert field in job
+    assert isinstance(job["technical_skills"], list)
+
+
+def test_explorer_does_not_download_the_dataset(client):
+    html = client.get("/explorateur").get_data(as_text=True)
+    assert "/api/jobs/search" in html
+    assert "/api/stats-data" not in html
+    assert "ids_only" not in html
@@ -0,0 +1,62 @@
+# Comptes de facettes : popcount numpy 2 et repli numpy < 2, contre un comptage direct
+import numpy as np
+import pytest
+
+import facets
+from facets import FacetIndex, _bitwise_count_unpacked, bitmap_from_positions
+
+N_ROWS = 5000
+
+
+def test_unpacked_popcount_matches_numpy():
+    rng = np.random.default_rng(0)
+    words = rng.integers(0, 2 ** 63, (7, 33), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    assert (_bitwise_count_unpacked(words) == np.bitwise_count(words)).all()
+    assert (_bitwise_count_unpacked(words[2]) == np.bitwise_count(words[2])).all()
+    assert (_bitwise_count_unpacked(words[:, ::3]) == np.bitwise_count(words[:, ::3])).all()
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rng = np.random.default_rng(1)
+    country = rng.choice(["France", "USA", "UK", "Malta"], N_ROWS, p=[0.5, 0.3, 0.195, 0.005])
+    skills = [set(rng.choice(["python", "sql", "excel", "cobol"], rng.integers(0, 3), replace=False))
+              for _ in range(N_ROWS)]
+    return country, skills
+
+
+@pytest.fixture(scope="module")
+def index(rows):
+    country, skills = rows
+    postings = {
+        "country": {c: np.flatnonzero(country == c) for c in np.unique(country)},
+        "skills": {s: np.array([i for i, k in enumerate(skills) if s in k]) for s in ["python", "sql", "excel", "cobol"]},
+    }
+    return FacetIndex.build(postings, {"country": "or", "skills": "and"}, N_ROWS)
+
+
+@pytest.mark.parametrize("popcount", ["numpy", "unpacked"])
+@pytest.mark.parametrize("selected, base", [
+    ({}, None),
+    ({"country": ["France", "Malta"]}, None),
+    ({"skills": ["python"]}, None),
+    ({"country": ["UK"], "skills": ["sql", "excel"]}, range(0, N_ROWS, 3)),
+])
+def test_counts_match_direct_count(rows, index, monkeypatch, popcount, selected, base):
+    if popcount == "unpacked":
+        monkeypatch.setattr(facets, "_bitwise_count", _bitwise_count_unpacked)
+    country, skills = rows
+    keep_base = np.zeros(N_ROWS, dtype=bool)
+    keep_base[list(base) if base is not None else slice(None)] = True
+    by_country = np.isin(country, selected.get("country", [])) if selected.get("country") else np.ones(N_ROWS, bool)
+    by_skills = np.array([set(selected.get("skills", [])) <= k for k in skills])
+
+    out = index.counts(selected, None if base is None else bitmap_from_positions(list(base), N_ROWS))
+    assert out["total"] == int((keep_base & by_country & by_skills).sum())
+    for item in out["facets"]["country"]:
+        # facette en OU : compte sans son propre filtre
+        expected = keep_base & by_skills & (country == item["name"])
+        assert item["count"] == int(expected.sum())
+    for item in out["facets"]["skills"]:
+        expected = keep_base & by_country & by_skills & np.array([item["name"] in k for k in skills])
+        assert item["count"] == int(expected.sum())
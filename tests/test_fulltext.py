@@ -0,0 +1,139 @@
+# FullTextIndex (user-010) contre :
+# - un BM25 calculé ligne par ligne en Python, d'après la définition de
+#   fulltext.py (mêmes lignes, mêmes scores) ;
+# - l'ancien filtre texte (sous-chaîne de title / description, avant
+#   user-010) : le nouveau ne garde que les lignes où la requête commence un mot.
+import math
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fulltext import (BM25_B, BM25_K1, MAX_PREFIX_TERMS, MIN_PREFIX_LEN, STOPWORDS,
+                      FullTextIndex, fold, tokenize)
+
+QUERIES = [
+    "python", "pyth", "sql", "data engineer", "Data  Engineer", "machine learning",
+    "the data", "the", "c++", "d", "données", "aws spark", "python python",
+    "zzzz", "engineer, python!", "ml ops",
+]
+
+
+# RÉFÉRENCE : filtre texte avant user-010 (git show 108744a^:app.py, search_jobs ;
+# templates/explorateur.html faisait le même includes() dans le navigateur)
+def old_text_filter(frame, rows, text):
+    t = text.lower()
+    sub = frame.iloc[rows]
+    mask = (
+        sub["title"].astype(str).str.lower().str.contains(t, regex=False)
+        | sub["description"].astype(str).str.lower().str.contains(t, regex=False)
+    )
+    return rows[mask.to_numpy()]
+
+
+def brute_force_bm25(fields, query):
+    """{ligne: score} : chaque ligne tokenisée à part, sans index."""
+    n_rows = len(next(iter(fields.values()))[0])
+    tf = [Counter() for _ in range(n_rows)]
+    doc_len = [0.0] * n_rows
+    for texts, weight in fields.values():
+        for row, text in enumerate(texts):
+            words = tokenize(text if isinstance(text, str) else "")
+            doc_len[row] += weight * len(words)
+            for w in words:
+                if w not in STOPWORDS:
+                    tf[row][w] += weight
+    df = Counter(w for counts in tf for w in counts)
+    vocab = sorted(df)
+    avg_len = sum(doc_len) / n_rows if n_rows and sum(doc_len) > 0 else 1.0
+
+    def expand(prefix):
+        if len(prefix) < MIN_PREFIX_LEN:
+            return [prefix] if prefix in df else []
+        words = [w for w in vocab if w.startswith(prefix)]
+        if len(words) > MAX_PREFIX_TERMS:
+            top = sorted(words, key=lambda w: -df[w])[:MAX_PREFIX_TERMS]
+            words = [w for w in words if w in top]
+        return words
+
+    tokens = tokenize(query)
+    tokens = [t for t in tokens[:-1] if t not in STOPWORDS] + tokens[-1:]
+    if not tokens:
+        return None
+    total = {}
+    for i, token in enumerate(dict.fromkeys(tokens)):
+        scores = {}
+        for w in expand(token):
+            idf = math.log1p((n_rows - df[w] + 0.5) / (df[w] + 0.5))
+            for row in range(n_rows):
+                f = tf[row][w]
+                if f:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[row] / avg_len)
+                    scores[row] = scores.get(row, 0.0) + idf * f * (BM25_K1 + 1) / (f + norm)
+        total = scores if i == 0 else {r: s + scores[r] for r, s in total.items() if r in scores}
+    return total
+
+
+@pytest.fixture(scope="module", params=["dataset", "messy"])
+def indexed(request, app_module, messy_dataset):
+    """(CompactFrame, index texte, champs indexés)."""
+    stats = app_module.DATA.stats if request.param == "dataset" else messy_dataset.stats
+    fields = {c: (stats.frame[c].tolist(), w) for c, w in app_module.FULLTEXT_FIELDS.items()}
+    return stats, app_module.build_stats_index(stats)["text"], fields
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_bm25_matches_brute_force(indexed, query):
+    _, index, fields = indexed
+    expected = brute_force_bm25(fields, query)
+    ranked = index.search(query)
+    if expected is None:
+        assert ranked is None
+        return
+    rows, scores = ranked
+    assert sorted(rows.tolist()) == sorted(expected)
+    np.testing.assert_allclose(scores, [expected[r] for r in rows.tolist()], rtol=1e-5)
+    # pertinence décroissante, puis ordre du fichier
+    assert all(s0 > s1 or (s0 == s1 and r0 < r1)
+               for (r0, s0), (r1, s1) in zip(zip(rows, scores), zip(rows[1:], scores[1:])))
+
+
+@pytest.mark.parametrize("query", ["python", "pyth", "sql", "engineer", "learning", "spark", "zzzz"])
+def test_word_queries_vs_old_substring_filter(indexed, query):
+    """
+    Mot seul : nouveau = ancien filtre moins les lignes où la requête n'est
+    qu'au milieu d'un mot ("sql" dans "mysql").
+    """
+    stats, index, _ = indexed
+    all_rows = np.arange(len(stats), dtype=np.int64)
+    old = set(old_text_filter(stats.frame, all_rows, query).tolist())
+    new = set(index.search(query)[0].tolist())
+    assert new <= old
+    word_start = re.compile(r"(?<!\w)" + re.escape(fold(query)))
+    for row in old - new:
+        texts = [stats.frame[c].iloc[row] for c in ("title", "description_sans_html")]
+        assert not any(word_start.search(fold(str(t))) for t in texts), (query, row)
+
+
+def test_candidates_restrict_the_results(indexed):
+    stats, index, _ = indexed
+    candidates = np.arange(0, len(stats), 2)
+    rows, scores = index.search("data", candidates=candidates)
+    all_rows, all_scores = index.search("data")
+    keep = np.isin(all_rows, candidates)
+    assert rows.tolist() == all_rows[keep].tolist()
+    assert scores.tolist() == all_scores[keep].tolist()
+
+
+def test_build_is_the_same_for_duplicated_texts():
+    """Textes identiques factorisés au build : mêmes scores que s'ils étaient distincts."""
+    titles = pd.Series(["Data Engineer", "Data Engineer", "Python dev", None, "data"])
+    descs = pd.Series(["python sql", "python sql", "python, python", "sql", ""])
+    index = FullTextIndex.build({"title": (titles, 3), "description_sans_html": (descs, 1)})
+    expected = brute_force_bm25({"title": (titles.tolist(), 3), "description_sans_html": (descs.tolist(), 1)},
+                                "python")
+    rows, scores = index.search("python")
+    assert rows.tolist() == [2, 0, 1]
+    np.testing.assert_allclose(scores, [expected[r] for r in rows.tolist()], rtol=1e-5)
@@ -0,0 +1,67 @@
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from conftest import ROOT
+
+pytestmark = pytest.mark.skipif(shutil.which("gunicorn") is None, reason="gunicorn not installed")
+
+LOAD_LINE = "Stats dataset charged"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise AssertionError("gunicorn never became ready")
+
+
+def _loads(log_path: str) -> int:
+    with open(log_path, encoding="utf-8") as f:
+        return f.read().count(LOAD_LINE)
+
+
+def test_one_start_loads_once_and_hup_reloads(dataset_root, tmp_path):
+    port = _free_port()
+    log_path = tmp_path / "gunicorn.log"
+    pid_path = tmp_path / "gunicorn.pid"
+    env = dict(os.environ, DATA_DIR=os.path.join(dataset_root, "data"), PORT=str(port),
+               WEB_CONCURRENCY="2", WATCH_DATA_FILES="0", PYTHONUNBUFFERED="1")
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--pid", str(pid_path), "app:app"],
+            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        _wait_ready(port)
+        time.sleep(2)  # le HUP de fin de chargement a remplacé les workers
+        assert _loads(log_path) == 1
+
+        # un HUP explicite relit bien les fichiers
+        os.kill(proc.pid, signal.SIGHUP)
+        deadline = time.time() + 30
+        while _loads(log_path) < 2 and time.time() < deadline:
+            time.sleep(0.2)
+        assert _loads(log_path) == 2
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
@@ -0,0 +1,45 @@
+# Phases de /metrics et accès au profilage
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+TILE_ROUTE = "/api/map/tiles/<int:z>/<int:x>/<int:y>"
+
+
+def _phase_count(client, route, phase):
+    prefix = f'http_request_phase_seconds_count{{route="{route}",phase="{phase}"}} '
+    for line in client.get("/metrics").get_data(as_text=True).splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+@pytest.mark.parametrize("url", ["/api/map/tiles/0/0/0", "/api/map/tiles/1/0/0"])
+def test_map_tile_serialization_has_its_own_phase(client, url):
+    before = {p: _phase_count(client, TILE_ROUTE, p) for p in ("query", "records")}
+    client.get(url).close()  # les phases sont enregistrées à la fermeture
+    assert _phase_count(client, TILE_ROUTE, "query") == before["query"] + 1
+    assert _phase_count(client, TILE_ROUTE, "records") == before["records"] + 1
+
+
+def test_profiling_needs_the_admin_token(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "")
+    assert not app_module._profiling_allowed({})
+    assert not app_module._profiling_allowed({"HTTP_X_ADMIN_TOKEN": ""})
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "s3cret")
+    assert not app_module._profiling_allowed({"HTTP_X_ADMIN_TOKEN": "nope"})
+    assert app_module._profiling_allowed({"HTTP_X_ADMIN_TOKEN": "s3cret"})
+
+
+@pytest.mark.parametrize("token, enabled", [("", False), ("s3cret", True)])
+def test_profiling_env_is_ignored_without_admin_token(dataset_root, token, enabled):
+    env = {**os.environ, "PROFILING": "1", "ADMIN_TOKEN": token, "WATCH_DATA_FILES": "0",
+           "DATA_DIR": os.path.join(dataset_root, "data")}
+    out = subprocess.run([sys.executable, "-c", "import app; print('enabled', app.PROFILING)"],
+                         cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert f"enabled {enabled}" in out.stdout, out.stderr
+    assert ("PROFILING=1 ignored" in out.stdout) is not enabled
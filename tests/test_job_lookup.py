@@ -0,0 +1,47 @@
+# /api/job/<id> et /api/jobs/by-ids (backend mémoire) : index id -> position
+import numpy as np
+import pandas as pd
+import pytest
+
+HUGE = 99999999999999999999  # > 2**63 : ne tient pas dans un int64
+
+
+def test_job_by_id(client):
+    job = client.get("/api/job/7").get_json()
+    assert job["id"] == 7
+    assert client.get("/api/job/0").status_code == 404
+    assert client.get("/api/job/401").status_code == 404
+
+
+@pytest.mark.parametrize("job_id", [HUGE, 2 ** 63, 2 ** 63 - 1])
+def test_job_out_of_range_is_not_found(client, job_id):
+    resp = client.get(f"/api/job/{job_id}")
+    assert resp.status_code == 404
+    assert resp.get_json() == {"error": "job not found"}
+
+
+def test_by_ids_keeps_order_and_reports_missing(client):
+    ids = [16, 1, 10, 9999, 13, 1, -3, HUGE, -HUGE, 2 ** 63]
+    body = client.get(f"/api/jobs/by-ids?ids={','.join(map(str, ids))}").get_json()
+    assert [job["id"] for job in body["results"]] == [16, 1, 10, 13, 1]
+    assert body["missing"] == [9999, -3, HUGE, -HUGE, 2 ** 63]
+    assert body["results"][0] == client.get("/api/job/16").get_json()
+
+
+def test_by_ids_rejects_bad_requests(app_module, client):
+    assert client.get("/api/jobs/by-ids?ids=1,x").status_code == 400
+    too_many = ",".join(str(i) for i in range(app_module.MAX_IDS_PER_BATCH + 1))
+    assert client.get(f"/api/jobs/by-ids?ids={too_many}").status_code == 400
+    assert client.get("/api/jobs/by-ids").get_json() == {"results": [], "missing": []}
+
+
+@pytest.mark.parametrize("ids", [[1, 2, 3], [5, 10 ** 12, 7, 5]])
+def test_lookup_positions_dense_and_sparse(app_module, ids):
+    """Ids denses (tableau numpy) ou épars (table pandas) : mêmes réponses."""
+    index = {"id": app_module._build_id_index(pd.Series(ids))}
+    table = index["id"]
+    assert isinstance(table, np.ndarray) == (max(ids) < 1000)
+    queries = ids + [4, -1, HUGE, -HUGE, 2 ** 63 - 1]
+    expected = [ids.index(i) if i in ids else -1 for i in queries]
+    assert app_module.lookup_positions(index, queries).tolist() == expected
+    assert app_module.lookup_positions(index, []).tolist() == []
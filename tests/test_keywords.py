@@ -0,0 +1,93 @@
+# KeywordMatcher (user-021) contre l'ancien find_keywords (une regex
+# \bmot\b par mot), recopié ci-dessous : mêmes mots trouvés pour chaque
+# vocabulaire, sur les descriptions du jeu de test et des textes piégeux
+import os
+import random
+import re
+
+import pandas as pd
+import pytest
+
+import data
+from data import KEYWORD_MATCHER, KeywordMatcher, find_keywords
+
+
+# RÉFÉRENCE : data.py avant user-021 (git show c891e94^:data.py)
+def old_find_keywords(text, words):
+    if not isinstance(text, str):
+        return ""
+    t = text.lower()
+    found = set()
+    for w in words:
+        pattern = rf"\b{re.escape(w)}\b"
+        if re.search(pattern, t):
+            found.add(w)
+    return ", ".join(sorted(found))
+
+
+VOCABULARIES = {
+    "technical_skills": data.TECHNICAL_SKILLS,
+    "tools_used": data.TOOLS_LIST,
+    "soft_skills": data.SOFT_SKILLS,
+    "benefits": data.BENEFITS,
+}
+# mots qui commencent / finissent par une ponctuation, ou n'en contiennent
+# que : \b s'y comporte autrement qu'autour d'un mot
+TRICKY_WORDS = [
+    "c++", "c#", ".net", "node.js", "m.sc", "+", "++", "r", "a b", "ci/cd", "é",
+    "Python", "sql ", " sql", "-", "data-driven", "power bi", "_", "x_y", "3.5",
+]
+TRICKY_TEXTS = [
+    "", "c++", "c++ dev", "C++x", "use c++, c# and .net", ".net", "x.net", "a .net",
+    "node.js/react", "m.sc.", "(m.sc)", "a+b", "+", "++a", "a++", "a  b", "a b", "a\tb",
+    "ci/cd pipelines", "CI / CD", "é", "café", "x_y", "x_yz", "3.5 years", "v3.5",
+    "power  bi", "power bi.", "data-driven", "-data-driven-", "sql", " sql ", "SQL!",
+    "python3 python", "İstanbul python", "ß sql", "c++\n", "\nc#\n",
+]
+
+
+def _fuzz_texts(words, n, seed):
+    """Textes faits de mots du vocabulaire, de bouts de mots et de ponctuation."""
+    rng = random.Random(seed)
+    pieces = list(words) + [w[:2] for w in words if len(w) > 2] + \
+        [" ", "  ", ".", ",", "+", "/", "-", "_", "\n", "é", "x", "(", ")", "#"]
+    return ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+
+
+@pytest.fixture(scope="module")
+def descriptions(dataset_root):
+    raw = pd.read_csv(os.path.join(dataset_root, "master_clean.csv"), sep="\t", dtype=str)
+    return raw["description"].tolist()
+
+
+def _check(texts, vocabularies):
+    matcher = KeywordMatcher(vocabularies)
+    for text in texts:
+        found = matcher.find(text)
+        for name, words in vocabularies.items():
+            assert found[name] == old_find_keywords(text, words), (name, text)
+
+
+def test_pipeline_vocabularies_on_descriptions(descriptions):
+    _check(descriptions, VOCABULARIES)
+    for text in descriptions[:50]:
+        found = KEYWORD_MATCHER.find(text)
+        assert found == {name: old_find_keywords(text, words) for name, words in VOCABULARIES.items()}
+
+
+def test_tricky_words_and_texts():
+    vocabularies = {**VOCABULARIES, "tricky": TRICKY_WORDS}
+    _check(TRICKY_TEXTS + [None, float("nan")], vocabularies)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fuzzed_texts(seed):
+    words = TRICKY_WORDS + data.TECHNICAL_SKILLS + data.TOOLS_LIST
+    _check(_fuzz_texts(words, 2000, seed), {"tricky": TRICKY_WORDS, "skills": data.TECHNICAL_SKILLS,
+                                            "tools": data.TOOLS_LIST})
+
+
+def test_find_keywords_keeps_its_signature(descriptions):
+    for text in descriptions[:100] + TRICKY_TEXTS + [None]:
+        assert find_keywords(text, TRICKY_WORDS) == old_find_keywords(text, TRICKY_WORDS)
+        assert find_keywords(text, data.SOFT_SKILLS) == old_find_keywords(text, data.SOFT_SKILLS)
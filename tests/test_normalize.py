@@ -0,0 +1,127 @@
+# normalize.py (colonne entière) contre les parseurs cellule par cellule
+# d'app.py avant user-004, recopiés tels quels ci-dessous
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from normalize import to_bool_series, to_float_series, to_list_series
+
+# RÉFÉRENCE : app.py avant user-004 (git show 820ff87^:app.py)
+_SPLIT_RE = re.compile(r"[;,\|]")
+
+
+def old_to_bool(v):
+    if v is None or (isinstance(v, float) and pd.isna(v)):
+        return False
+    if isinstance(v, bool):
+        return v
+    s = str(v).strip().lower()
+    return s in {"true", "1", "yes", "y", "oui"}
+
+
+def old_to_float(v):
+    try:
+        if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+def old_to_list(v):
+    if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
+        return []
+    if isinstance(v, list):
+        return [str(x).strip() for x in v if str(x).strip()]
+
+    s = str(v).strip()
+    if not s or s == "[]":
+        return []
+    if (s.startswith("[") and s.endswith("]")) or (s.startswith("(") and s.endswith(")")):
+        try:
+            parsed = ast.literal_eval(s)
+            if isinstance(parsed, (list, tuple)):
+                return [str(x).strip() for x in parsed if str(x).strip()]
+        except Exception:
+            pass
+
+    parts = [p.strip().strip("'").strip('"') for p in _SPLIT_RE.split(s)]
+    return [p for p in parts if p]
+
+
+# CAS
+LIST_CELLS = [
+    "['python', 'sql']", "[]", "", np.nan, None, "a;b|c", "a, b", "('x', 'y')", "(1)",
+    "['unterminated", "[1, 2]", "['a', '']", " [ 'a' ] ", '["q\\"uote"]', "['it''s']",
+    "[\"a\", 'b']", "x", "['a'] extra", "[['nested']]", "\t['tab']\n", "['a',\n'b']",
+    "['a\\\\b']", "['a' , 'b' ,]", "[None, 'x']", "['é', 'naïve']", "[ ]", "()", "'solo'",
+]
+BOOL_CELLS = ["True", "true ", "1", "yes", "Y", "oui", "no", "False", "", "2", " ", np.nan, None]
+FLOAT_CELLS = ["1_000", "1e3", " 12 ", "abc", "", "inf", "-inf", "nan", "0x10", "1,5", "٣",
+               "12.50", "-0", "1e400", np.nan, None]
+
+
+def _fuzz(alphabet, n, seed):
+    rng = np.random.default_rng(seed)
+    chars = np.array(list(alphabet))
+    return ["".join(rng.choice(chars, rng.integers(0, 14))) for _ in range(n)]
+
+
+def _assert_lists(s: pd.Series):
+    new = to_list_series(s)
+    old = s.apply(old_to_list)
+    assert new.tolist() == old.tolist()
+    # chaque ligne a sa propre liste (l'ancien apply en créait une par ligne)
+    assert len({id(x) for x in new}) == len(new)
+
+
+@pytest.mark.parametrize("cells", [
+    LIST_CELLS * 3,
+    _fuzz("[]()'\";,| ab\\\n", 5000, 0),
+    _fuzz("['a', 'b', 'c']", 5000, 1),
+])
+def test_to_list_series_matches_old_apply(cells):
+    _assert_lists(pd.Series(cells, dtype=object))
+
+
+def test_to_list_series_mixed_types():
+    _assert_lists(pd.Series([["a ", "", "b"], "['a']", 3, 2.5, True, None, np.nan], dtype=object))
+
+
+def test_to_list_series_on_dataset_columns(dataset_root):
+    df = pd.read_csv(f"{dataset_root}/data/job_data_clean.csv", escapechar="\\", engine="python")
+    for c in ["technical_skills", "tools_used", "soft_skills", "benefits", "tasks", "domains"]:
+        _assert_lists(df[c])
+
+
+@pytest.mark.parametrize("cells", [
+    BOOL_CELLS * 5,
+    [True, False, None, np.nan],
+    [1, 0, 2, 1.0, np.nan],
+    ["True", 1, 1.0, True, "1", None],   # types mélangés
+    _fuzz("TrueFalsyo1 ", 3000, 2),
+])
+def test_to_bool_series_matches_old_apply(cells):
+    s = pd.Series(cells, dtype=object)
+    assert to_bool_series(s).tolist() == s.apply(old_to_bool).tolist()
+
+
+@pytest.mark.parametrize("cells", [
+    FLOAT_CELLS * 3,
+    [1, 2.5, None, "3"],
+    _fuzz("0123456789.e-_ ,x", 3000, 3),
+])
+def test_to_float_series_matches_old_apply(cells):
+    s = pd.Series(cells, dtype=object)
+    old = pd.Series([np.nan if v is None else v for v in s.apply(old_to_float)], dtype=float)
+    new = to_float_series(s)
+    assert new.dtype == float
+    np.testing.assert_array_equal(new.to_numpy(), old.to_numpy())
+
+
+def test_to_float_series_float_column():
+    s = pd.Series([1.5, np.nan, 3.0])
+    np.testing.assert_array_equal(to_float_series(s).to_numpy(), s.to_numpy())
@@ -0,0 +1,72 @@
+# Payloads pré-sérialisés : ETag / 304 et choix de l'encodage (gzip / brotli)
+import gzip
+import json
+
+import pytest
+
+brotli = pytest.importorskip("brotli")
+
+URLS = ["/api/jobs", "/api/jobs/light", "/api/d3-data"]
+
+
+def _get(client, url, **headers):
+    resp = client.get(url, headers=headers)
+    body = resp.get_data()
+    resp.close()
+    return resp, body
+
+
+@pytest.fixture(scope="module")
+def identity(app_module):
+    client = app_module.app.test_client()
+    out = {}
+    for url in URLS:
+        resp, body = _get(client, url, **{"Accept-Encoding": "identity"})
+        assert resp.status_code == 200 and "Content-Encoding" not in resp.headers
+        out[url] = (resp.headers["ETag"], body)
+    return out
+
+
+@pytest.mark.parametrize("url", URLS)
+@pytest.mark.parametrize("accept, encoding", [
+    ("gzip", "gzip"),
+    ("br", "br"),
+    ("gzip, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("gzip;q=0, br;q=0", None),
+    ("deflate", None),
+    ("", None),
+])
+def test_encoding_negotiation(client, identity, url, accept, encoding):
+    resp, body = _get(client, url, **{"Accept-Encoding": accept})
+    assert resp.status_code == 200
+    assert resp.headers.get("Content-Encoding") == encoding
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    decoded = {"gzip": gzip.decompress, "br": brotli.decompress, None: lambda b: b}[encoding](body)
+    assert decoded == identity[url][1]
+    etag = identity[url][0]
+    assert resp.headers["ETag"] == (etag if encoding is None else f'{etag[:-1]}-{encoding}"')
+
+
+def test_body_is_the_records(app_module, identity):
+    assert json.loads(identity["/api/jobs"][1]) == app_module.DATA.stats.records()
+
+
+@pytest.mark.parametrize("url", URLS)
+@pytest.mark.parametrize("accept", ["identity", "gzip", "br"])
+def test_any_known_etag_answers_304(client, identity, url, accept):
+    etag = identity[url][0]
+    gz = _get(client, url, **{"Accept-Encoding": "gzip"})[0].headers["ETag"]
+    for sent in [etag, gz, f"W/{etag}", f"W/{gz}", f'"other", {etag}', "*"]:
+        resp, body = _get(client, url, **{"Accept-Encoding": accept, "If-None-Match": sent})
+        assert resp.status_code == 304, sent
+        assert body == b""
+        assert resp.headers["ETag"]
+
+
+@pytest.mark.parametrize("sent", ['"other"', 'W/"other"', '"stale-gzip"'])
+def test_unknown_etag_answers_200(client, identity, sent):
+    resp, body = _get(client, "/api/jobs", **{"Accept-Encoding": "identity", "If-None-Match": sent})
+    assert resp.status_code == 200
+    assert body == identity["/api/jobs"][1]
@@ -0,0 +1,160 @@
+# data.py : le mode streaming (user-023) contre le pipeline complet
+# d'avant, recopié ci-dessous, et le mode incrémental (user-024) contre un
+# run complet, sur l'export du scrapper du jeu de test (+ quelques lignes
+# ajoutées : séniorité du scrapper, sans salaire, ligne invalide)
+import csv
+import io
+import os
+
+import pandas as pd
+import pytest
+
+import data
+
+EXTRA_ROWS = [
+    ["9001", "Senior Analyst", "Acme", "France", "Paris", "https://example.com/9001", "2025-05-01",
+     "<p>No salary here, SQL and python.</p>", "Senior"],
+    ["9002", "Intern", "Acme", "France", "Lyon", "https://example.com/9002", "2025-05-02",
+     "Stage: 3+ years, 45k - 50k, visa, equal opportunity", ""],
+    ["9003", "Broken", "Acme", "France", "Lyon", "https://example.com/9003", "2025-05-02",
+     "too many fields", "", "extra"],
+    ["9004", "", "", "", "", "https://example.com/9004", "", "", ""],
+]
+
+
+# RÉFÉRENCE : data.py avant user-023 (git show 12a0fe1^:data.py) ; les
+# extracteurs (FEATURES) n'ont pas changé dans ce commit
+def old_extract_features(texts, seniorities=None):
+    if seniorities is None:
+        seniorities = [None] * len(texts)
+    columns = {name: [] for name in data.FEATURES}
+    extractors = [(columns[name].append, fn) for name, fn in data.FEATURES.items()]
+    for text, seniority in zip(texts, seniorities):
+        row = data.FeatureRow(text, seniority)
+        for append, fn in extractors:
+            append(fn(row))
+    return pd.DataFrame(columns)
+
+
+def old_enrich_linkedin_dataset(input_csv, output_csv):
+    df = pd.read_csv(input_csv, sep="\t", engine="python", encoding="utf-8", on_bad_lines="skip")
+    df["description_sans_html"] = df["description"].apply(data.clean_text)
+    features = old_extract_features(df["description_sans_html"], df.get("seniority_level"))
+    features.index = df.index
+    for name in data.FEATURES:
+        df[name] = features[name]
+    df["salary_type"] = "annual"
+    df["salary_currency"] = "EUR"
+    df.to_csv(output_csv, sep=";", index=False)
+    return df
+
+
+@pytest.fixture(scope="module")
+def scraper_tsv(dataset_root, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("pipeline") / "export.tsv")
+    with open(os.path.join(dataset_root, "master_clean.csv"), encoding="utf-8") as f:
+        text = f.read()
+    out = io.StringIO()
+    csv.writer(out, delimiter="\t", lineterminator="\n").writerows(EXTRA_ROWS)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + out.getvalue())
+    return path
+
+
+@pytest.fixture(scope="module")
+def full_csv(scraper_tsv, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("full") / "data.csv")
+    data.enrich_linkedin_dataset(scraper_tsv, path)
+    return path
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _frame(path):
+    return pd.read_csv(path, sep=";", dtype=str, keep_default_na=False)
+
+
+@pytest.mark.parametrize("chunk_rows,workers", [(1000, 1), (64, 1), (7, 1), (1, 1), (50, 2)])
+def test_chunked_output_is_byte_identical(scraper_tsv, full_csv, tmp_path, chunk_rows, workers):
+    out = str(tmp_path / "data.csv")
+    rows = data.enrich_linkedin_dataset_chunked(scraper_tsv, out, chunk_rows=chunk_rows, workers=workers)
+    assert _read(out) == _read(full_csv)
+    assert rows == len(_frame(full_csv))
+
+
+def test_full_output_matches_old_pipeline(scraper_tsv, full_csv, tmp_path):
+    """Même contenu qu'avant ; seul le format des nombres de FLOAT_FEATURES change (45000 -> 45000.0)."""
+    out = str(tmp_path / "old.csv")
+    old_enrich_linkedin_dataset(scraper_tsv, out)
+    old, new = _frame(out), _frame(full_csv)
+    assert list(new.columns) == list(old.columns)
+    assert len(new) == len(old) == len(pd.read_csv(scraper_tsv, sep="\t", engine="python",
+                                                   on_bad_lines="skip"))
+    assert "9003" not in set(new["id"])
+    for c in old.columns:
+        if c in data.FLOAT_FEATURES:
+            pd.testing.assert_series_equal(pd.to_numeric(new[c]), pd.to_numeric(old[c]), check_names=False)
+        else:
+            assert new[c].tolist() == old[c].tolist(), c
+    assert (new["salary_min"] != "").any()
+
+
+# MODE INCRÉMENTAL (user-024) : même data.csv qu'un run complet de l'entrée
+def _write_tsv(df, path):
+    df.to_csv(path, sep="\t", index=False, quoting=csv.QUOTE_MINIMAL)
+    return path
+
+
+def _fresh(input_tsv, tmp_path):
+    out = str(tmp_path / "fresh.csv")
+    data.enrich_linkedin_dataset_chunked(input_tsv, out, chunk_rows=100, workers=1)
+    return _read(out)
+
+
+@pytest.fixture()
+def raw(scraper_tsv):
+    return data.read_scraper_csv(scraper_tsv, dtype=str)
+
+
+def test_incremental_runs_match_full_runs(raw, tmp_path):
+    out = str(tmp_path / "data.csv")
+    first = _write_tsv(raw, str(tmp_path / "v1.tsv"))
+    assert data.enrich_linkedin_dataset_incremental(first, out) == (len(raw), len(raw))
+    assert _read(out) == _fresh(first, tmp_path)
+
+    assert data.enrich_linkedin_dataset_incremental(first, out) == (len(raw), 0)
+    assert _read(out) == _fresh(first, tmp_path)
+
+    # mois suivant : lignes retirées, modifiées, réordonnées, doublées et nouvelles
+    v2 = raw.drop(index=raw.index[10:40]).copy()
+    v2.loc[v2.index[:5], "description"] = v2["description"].iloc[:5] + " Now with Kubernetes and 5+ years."
+    v2.loc[v2.index[5], "title"] = "Staff Data Engineer"
+    new = raw.iloc[10:13].copy()
+    new["link"] = new["link"] + "?repost"
+    unchanged = v2.iloc[[-1]]
+    v2 = pd.concat([v2.iloc[::-1], new, unchanged])
+    second = _write_tsv(v2, str(tmp_path / "v2.tsv"))
+    assert data.enrich_linkedin_dataset_incremental(second, out) == (len(v2), 5 + 1 + len(new))
+    assert _read(out) == _fresh(second, tmp_path)
+
+
+@pytest.mark.parametrize("change", ["edited_output", "version", "features", "columns"])
+def test_incremental_recomputes_everything_when_stale(raw, tmp_path, monkeypatch, change):
+    out = str(tmp_path / "data.csv")
+    tsv = _write_tsv(raw, str(tmp_path / "in.tsv"))
+    data.enrich_linkedin_dataset_incremental(tsv, out)
+    expected = len(raw)
+    if change == "edited_output":
+        with open(out, "a", encoding="utf-8") as f:
+            f.write("\n")
+    elif change == "version":
+        monkeypatch.setattr(data, "ENRICH_VERSION", data.ENRICH_VERSION + 1)
+    elif change == "features":
+        monkeypatch.setattr(data, "FEATURES", {**data.FEATURES, "extra": lambda row: None})
+    else:
+        tsv = _write_tsv(raw.assign(scraped_at="2025-06-01"), str(tmp_path / "in.tsv"))
+    assert data.enrich_linkedin_dataset_incremental(tsv, out) == (len(raw), expected)
+    assert _read(out) == _fresh(tsv, tmp_path)
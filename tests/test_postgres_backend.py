@@ -0,0 +1,134 @@
+# Backend DATA_BACKEND=postgres contre le backend mémoire, sur le même CSV :
+# ids, recherche, comptes de facettes et agrégats doivent être identiques.
+# Base : TEST_DATABASE_URL (tables jobs / d3_data recréées, base jetable),
+# sinon un serveur pgserver temporaire s'il est installé, sinon skip.
+import io
+import os
+import sys
+from urllib.parse import urlencode
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+SEARCHES = [
+    {},
+    {"country": "France"},
+    {"country": "France,UK"},
+    {"seniority": "senior"},
+    {"seniority": "junior,lead", "country": "USA"},
+    {"skills": "python"},
+    {"skills": "python,sql"},
+    {"domains": "Data,Finance"},
+    {"hybrid": "1"},
+    {"visa": "1", "salary": "60000"},
+    {"salary": "80000", "skills": "sql", "country": "France"},
+]
+TEXT_SEARCHES = [{"text": "python"}, {"text": "data engineer"}, {"text": "python", "country": "France"}]
+
+
+@pytest.fixture(scope="module")
+def pg_url(tmp_path_factory):
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture(scope="module")
+def backends(app_module, messy_root, messy_dataset, pg_url):
+    """(dataset mémoire, dataset postgres) chargés depuis les mêmes fichiers."""
+    # import_csv demande l'URL sur stdin et lit data/*.csv en relatif
+    mp = pytest.MonkeyPatch()
+    mp.setattr(sys, "stdin", io.StringIO(pg_url + "\n"))
+    mp.chdir(messy_root)
+    sys.modules.pop("import_csv", None)
+    import import_csv
+    import_csv.upload_data()
+    mp.undo()
+
+    from pgstore import PostgresStore
+    store = PostgresStore.build(pg_url)
+    yield messy_dataset, app_module.DbDataset(store)
+    store.close()
+
+
+@pytest.fixture()
+def get(app_module, client, backends, monkeypatch):
+    """get(backend, url) -> JSON de l'API servie par ce backend (0 mémoire, 1 postgres)."""
+    def _get(which, url):
+        monkeypatch.setattr(app_module, "DATA", backends[which])
+        resp = client.get(url)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        return resp.get_json()
+    return _get
+
+
+def _all_ids(get, which, params):
+    query = urlencode(params)
+    out = get(which, f"/api/jobs/search?ids_only=1&page_size=5000&{query}")
+    assert len(out["ids"]) == out["total"]
+    return out["ids"]
+
+
+def test_ids_are_the_csv_ids(get):
+    ids = _all_ids(get, 1, {})
+    assert ids == _all_ids(get, 0, {})
+    assert ids[:3] == [10, 13, 16]
+    assert get(1, "/api/job/13") == get(0, "/api/job/13")
+
+
+@pytest.mark.parametrize("params", SEARCHES)
+def test_search_matches_memory(get, params):
+    ids = _all_ids(get, 0, params)
+    assert _all_ids(get, 1, params) == ids
+    query = urlencode(params)
+    assert get(1, f"/api/jobs/search?page_size=20&{query}") == get(0, f"/api/jobs/search?page_size=20&{query}")
+
+
+@pytest.mark.parametrize("params", TEXT_SEARCHES)
+def test_text_search_finds_the_same_jobs(get, params):
+    # ts_rank et le score en mémoire ne classent pas pareil : mêmes jobs seulement
+    assert sorted(_all_ids(get, 1, params)) == sorted(_all_ids(get, 0, params))
+
+
+def test_facet_counts_match_postgres_search(get):
+    """Chaque compte de /api/facets (mémoire) = total de la recherche postgres filtrée."""
+    facets = get(0, "/api/facets?top=5")
+    checked = 0
+    for column, arg in [("country", "country"), ("seniority_level", "seniority"),
+                        ("technical_skills", "skills"), ("domains", "domains")]:
+        for item in facets["facets"][column]:
+            value, count = item["name"], item["count"]
+            assert get(1, f"/api/jobs/search?page_size=1&{urlencode({arg: value})}")["total"] == count, (column, value)
+            checked += 1
+    assert checked
+
+
+def test_by_ids_matches_memory(get):
+    url = f"/api/jobs/by-ids?ids=16,1,10,9999,13,{2 ** 63},-{10 ** 20}"
+    out = get(1, url)
+    assert out == get(0, url)
+    assert out["missing"] == [1, 9999, 2 ** 63, -10 ** 20]
+
+
+def test_aggregates_match_memory(get):
+    assert get(1, "/api/aggregates") == get(0, "/api/aggregates")
+
+
+def test_busy_pool_answers_503(app_module, client, pg_url, monkeypatch):
+    from pgstore import PostgresStore
+    store = PostgresStore.build(pg_url, max_connections=1, acquire_timeout_s=0.2)
+    try:
+        monkeypatch.setattr(app_module, "DATA", app_module.DbDataset(store))
+        with store.cursor():
+            resp = client.get("/api/job/10")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+        assert client.get("/api/job/10").status_code == 200
+    finally:
+        store.close()
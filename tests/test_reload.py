@@ -0,0 +1,121 @@
+# Rechargement à chaud : swap atomique de DATA, ancien snapshot gardé en cas
+# d'échec, jeton de POST /api/admin/reload, watcher des CSV
+import os
+import shutil
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture()
+def data_dir(app_module, dataset_root, tmp_path, monkeypatch):
+    """Copie des CSV de test ; DATA chargé depuis cette copie (restauré après)."""
+    data_dir = str(tmp_path / "data")
+    shutil.copytree(os.path.join(dataset_root, "data"), data_dir)
+    monkeypatch.setattr(app_module, "STATS_PATH", os.path.join(data_dir, "job_data_clean.csv"))
+    monkeypatch.setattr(app_module, "D3_PATH", os.path.join(data_dir, "jobs_for_d3.csv"))
+    monkeypatch.setattr(app_module, "CACHE_DIR", os.path.join(data_dir, ".cache"))
+    monkeypatch.setattr(app_module, "DATA", app_module.load_dataset())
+    return data_dir
+
+
+def _truncate_stats(data_dir, n):
+    path = os.path.join(data_dir, "job_data_clean.csv")
+    df = pd.read_csv(path, escapechar="\\", engine="python", dtype=str, keep_default_na=False)
+    df.iloc[:n].to_csv(path, index=False, escapechar="\\")
+
+
+def test_reload_swaps_snapshot(app_module, client, data_dir):
+    old = app_module.DATA
+    _truncate_stats(data_dir, 50)
+    assert app_module.reload_data()
+    new = app_module.DATA
+    assert new is not old
+    assert new.signature == app_module._files_signature()
+    assert new.rows["stats"] == 50
+    # l'ancien snapshot reste entier pour les requêtes qui le tiennent encore
+    assert old.rows["stats"] == 400
+    assert len(client.get("/api/jobs").get_json()) == 50
+
+
+def test_failed_reload_keeps_current_data(app_module, client, data_dir):
+    old = app_module.DATA
+    os.remove(os.path.join(data_dir, "job_data_clean.csv"))
+    assert not app_module.reload_data()
+    assert app_module.DATA is old
+    assert len(client.get("/api/jobs").get_json()) == 400
+
+
+def test_reload_already_running(app_module, data_dir, monkeypatch):
+    old = app_module.DATA
+    with app_module._RELOAD_LOCK:
+        assert not app_module.reload_data()
+    assert app_module.DATA is old
+    monkeypatch.setattr(app_module, "DATA", None)
+    assert not app_module.reload_data()
+
+
+@pytest.fixture()
+def reloads(app_module, monkeypatch):
+    """request_reload remplacé : enregistre les appels sans recharger."""
+    calls = threading.Semaphore(0)
+    monkeypatch.setattr(app_module, "request_reload", calls.release)
+    return calls
+
+
+@pytest.mark.parametrize("configured, sent", [
+    ("", None),
+    ("", ""),
+    (TOKEN, None),
+    (TOKEN, ""),
+    (TOKEN, "wrong"),
+    (TOKEN, TOKEN + "x"),
+    (TOKEN, TOKEN.upper()),
+    (TOKEN, "é"),
+])
+def test_admin_reload_rejects_bad_token(app_module, client, reloads, monkeypatch, configured, sent):
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", configured)
+    headers = {} if sent is None else {"X-Admin-Token": sent}
+    resp = client.post("/api/admin/reload", headers=headers)
+    assert resp.status_code == 403
+    assert not reloads.acquire(timeout=0.1)
+
+
+def test_admin_reload_accepts_token(app_module, client, reloads, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", TOKEN)
+    resp = client.post("/api/admin/reload", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 202
+    assert resp.get_json() == {"status": "reloading", "current_loaded_at": app_module.DATA.loaded_at}
+    assert reloads.acquire(timeout=5)
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_watcher_waits_for_stable_signature(app_module, monkeypatch):
+    """Reload après deux passages identiques ; pas de nouvel essai sur une signature en échec."""
+    new, newer = ((1, 1), (1, 1)), ((2, 2), (2, 2))
+    passes = [app_module.DATA.signature, new, new, new, (None, (1, 1)), newer, newer]
+    seen = []
+
+    def sleep(_):
+        if len(seen) == len(passes):
+            raise _Stop
+
+    def signature():
+        seen.append(passes[len(seen)])
+        return seen[-1]
+
+    calls = []
+    monkeypatch.setattr(app_module, "time", SimpleNamespace(sleep=sleep))
+    monkeypatch.setattr(app_module, "_files_signature", signature)
+    monkeypatch.setattr(app_module, "request_reload", lambda: calls.append(len(seen)))
+    with pytest.raises(_Stop):
+        app_module._watch_data_files()
+    # 3e passage : `new` stable, échec ; 4e : `new` ignoré ; 7e : `newer` stable
+    assert calls == [3, 7]
@@ -0,0 +1,37 @@
+# /api/salary/estimate ne mélange pas les devises ni les salaires non annuels
+import numpy as np
+import pytest
+
+
+def _usd_annual(frame):
+    salary = frame["salary_value"].to_numpy(dtype=float)
+    keep = ((frame["salary_type"] == "annual") & (frame["salary_currency"] == "USD")).to_numpy()
+    return frame, salary, keep & np.isfinite(salary) & (salary >= 1)
+
+
+def test_dataset_mixes_currencies(app_module):
+    frame = app_module.DATA.stats.frame
+    assert set(frame["salary_currency"]) - {"USD", ""}
+
+
+@pytest.mark.parametrize("params", [{}, {"country": "USA"}, {"seniority": "senior", "country": "USA"}])
+def test_estimate_uses_usd_annual_salaries(app_module, client, params):
+    frame, salary, keep = _usd_annual(app_module.DATA.stats.frame)
+    if "country" in params:
+        keep &= (frame["country"].str.strip() == params["country"]).to_numpy()
+    if "seniority" in params:
+        keep &= (frame["seniority_level"].str.strip() == params["seniority"]).to_numpy()
+    out = client.get("/api/salary/estimate", query_string={**params, "q": "0.5"}).get_json()
+    assert out["count"] == int(keep.sum())
+    assert out["mean"] == pytest.approx(salary[keep].mean())
+    median = np.sort(salary[keep])[(keep.sum() - 1) // 2]
+    assert out["quantiles"]["0.5"] == pytest.approx(median, rel=0.011)
+
+
+def test_no_estimate_from_other_currencies(app_module, client):
+    frame = app_module.DATA.stats.frame
+    france = frame["country"].str.strip() == "France"
+    assert frame.loc[france, "salary_value"].notna().any()
+    assert (frame.loc[france, "salary_currency"] != "USD").all()
+    out = client.get("/api/salary/estimate", query_string={"country": "France"}).get_json()
+    assert out["count"] == 0
@@ -0,0 +1,53 @@
+# Tuiles de la carte UMAP : jamais plus de TILE_POINT_LIMIT éléments
+import numpy as np
+import pandas as pd
+
+from spatial import MAX_ZOOM, TILE_POINT_LIMIT, SpatialIndex
+
+
+def _index(x, y):
+    return SpatialIndex.build(pd.Series(x), pd.Series(y))
+
+
+def test_clusters_stay_under_the_limit():
+    rng = np.random.default_rng(0)
+    index = _index(rng.random(200_000), rng.random(200_000))
+    for z, tx, ty in [(0, 0, 0), (1, 1, 0), (2, 3, 3)]:
+        count, rows, cells = index.tile(z, tx, ty)
+        assert rows is None
+        assert 0 < len(cells["count"]) <= TILE_POINT_LIMIT
+        assert cells["count"].sum() == count
+
+
+def test_sparse_tile_keeps_the_fine_grid():
+    # peu de cases non vides : pas de regroupement
+    rng = np.random.default_rng(1)
+    centers = rng.random((50, 2))
+    x = np.repeat(centers[:, 0], 100)
+    y = np.repeat(centers[:, 1], 100)
+    _, rows, cells = _index(x, y).tile(0, 0, 0)
+    assert rows is None
+    assert len(cells["count"]) == 50
+
+
+def test_max_zoom_points_are_paged():
+    n = 2 * TILE_POINT_LIMIT + 17
+    index = _index(np.full(n, 0.5), np.full(n, 0.5))
+    seen, offset = [], 0
+    while True:
+        count, rows, cells = index.tile(MAX_ZOOM, 0, 0, offset)
+        assert count == n and cells is None
+        assert len(rows) <= TILE_POINT_LIMIT
+        if not len(rows):
+            break
+        seen.extend(rows.tolist())
+        offset += len(rows)
+    assert sorted(seen) == list(range(n))
+
+
+def test_tile_api_next_offset(client):
+    body = client.get("/api/map/tiles/0/0/0").get_json()
+    assert body["count"] == len(body["points"])
+    assert body["next_offset"] is None
+    body = client.get("/api/map/tiles/0/0/0?offset=150").get_json()
+    assert len(body["points"]) == body["count"] - 150
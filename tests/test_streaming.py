@@ -0,0 +1,79 @@
+# ?stream=ndjson / ?stream=json : mêmes lignes que le payload pré-sérialisé,
+# quel que soit le découpage en lots (STREAM_BATCH_ROWS)
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from compact import CompactFrame
+
+URLS = ["/api/jobs", "/api/jobs/light", "/api/d3-data"]
+
+
+def _body(client, url, **headers):
+    resp = client.get(url, headers=headers)
+    assert resp.status_code == 200
+    body = resp.get_data(as_text=True)
+    mimetype = resp.mimetype
+    resp.close()
+    return body, mimetype
+
+
+def _ndjson(body):
+    assert body == "" or body.endswith("\n")
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.fixture(scope="module")
+def full(app_module):
+    client = app_module.app.test_client()
+    return {url: json.loads(_body(client, url)[0]) for url in URLS}
+
+
+@pytest.mark.parametrize("url", URLS)
+@pytest.mark.parametrize("batch_rows", [3, 7, 399, 400, 401, 1000])
+def test_streams_match_payload(app_module, client, full, monkeypatch, url, batch_rows):
+    # le jeu de test a 400 lignes : lots plus petits, égaux et plus grands
+    assert len(full[url]) == 400
+    monkeypatch.setattr(app_module, "STREAM_BATCH_ROWS", batch_rows)
+    body, mimetype = _body(client, f"{url}?stream=ndjson")
+    assert mimetype == app_module.NDJSON_MIMETYPE
+    assert _ndjson(body) == full[url]
+    body, mimetype = _body(client, f"{url}?stream=json")
+    assert mimetype == "application/json"
+    assert json.loads(body) == full[url]
+
+
+def test_accept_header_selects_ndjson(app_module, client, full):
+    body, mimetype = _body(client, "/api/jobs", Accept=app_module.NDJSON_MIMETYPE)
+    assert mimetype == app_module.NDJSON_MIMETYPE
+    assert _ndjson(body) == full["/api/jobs"]
+
+
+def test_stream_array_is_chunked(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "STREAM_BATCH_ROWS", 100)
+    resp = client.get("/api/jobs?stream=json")
+    chunks = list(resp.response)
+    resp.close()
+    # "[" + 4 lots + "]" : rien n'est sérialisé d'un bloc
+    assert len(chunks) == 6
+    assert chunks[0] == b"[" and chunks[-1] == b"]"
+
+
+@pytest.fixture()
+def empty_data(app_module, monkeypatch):
+    data = app_module.DATA
+    stats = CompactFrame.from_frame(app_module._read_stats_csv().iloc[:0], app_module.STATS_LIST_COLS,
+                                    app_module.STATS_CATEGORY_COLS)
+    empty = SimpleNamespace(backend="memory", stats=stats, d3_df=data.d3_df.iloc[:0],
+                            payloads={}, payloads_lock=threading.Lock())
+    monkeypatch.setattr(app_module, "DATA", empty)
+    return empty
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_empty_dataset(client, empty_data, url):
+    assert json.loads(_body(client, url)[0]) == []
+    assert _body(client, f"{url}?stream=ndjson")[0] == ""
+    assert _body(client, f"{url}?stream=json")[0] == "[]"